@@ -1,12 +1,41 @@
 __version__ = "1.13.0"
 
 def setup(app):
-    from .doxylink import setup_doxylink_roles
-    app.add_config_value('doxylink', {}, 'env')
+    from .doxylink import (setup_doxylink_roles, merge_doxylink_cache, report_cache_statistics,
+                           build_symbol_maps_before_forking, finish_warm_up, merge_doxylink_links,
+                           purge_doxylink_links, find_outdated_documents, find_documents_to_rewrite,
+                           save_doxylink_cache, ResolveDoxylinkReferences)
+    from .parsing import DEFAULT_NORMALISE_CACHE_SIZE
+    from .remote import DEFAULT_FETCH_RETRIES, DEFAULT_FETCH_TIMEOUT
+    from .shared import DEFAULT_MAX_AGE, DEFAULT_MAX_SIZE
+    # Documents are read again by find_outdated_documents when a change to the roles affects them
+    app.add_config_value('doxylink', {}, '')
     app.add_config_value('doxylink_pdf_files', {}, 'env')
     app.add_config_value('doxylink_parse_error_ignore_regexes',
                          default=[], types=[str], rebuild='env')
+    app.add_config_value('doxylink_parse_jobs', 1, '', types=[int, str])
+    app.add_config_value('doxylink_cache_invalidation', 'mtime', '', types=[str])
+    app.add_config_value('doxylink_backends', {}, '', types=[dict])
+    app.add_config_value('doxylink_warm_up', False, '', types=[bool])
+    app.add_config_value('doxylink_write_time_urls', False, '', types=[bool])
+    app.add_config_value('doxylink_build_jobs', 1, '', types=[int, str])
+    app.add_config_value('doxylink_shared_cache', '', '', types=[str])
+    app.add_config_value('doxylink_shared_cache_max_size', DEFAULT_MAX_SIZE, '', types=[int])
+    app.add_config_value('doxylink_shared_cache_max_age', DEFAULT_MAX_AGE, '', types=[int, float])
+    app.add_config_value('doxylink_normalise_cache_size', DEFAULT_NORMALISE_CACHE_SIZE, '', types=[int])
+    app.add_config_value('doxylink_fetch_timeout', DEFAULT_FETCH_TIMEOUT, '', types=[int, float])
+    app.add_config_value('doxylink_fetch_retries', DEFAULT_FETCH_RETRIES, '', types=[int])
+    app.add_post_transform(ResolveDoxylinkReferences)
     app.connect('builder-inited', setup_doxylink_roles)
+    app.connect('env-get-outdated', find_outdated_documents)
+    app.connect('env-purge-doc', purge_doxylink_links)
+    app.connect('env-before-read-docs', build_symbol_maps_before_forking)
+    app.connect('env-merge-info', merge_doxylink_cache)
+    app.connect('env-merge-info', merge_doxylink_links)
+    app.connect('env-updated', finish_warm_up)
+    app.connect('env-updated', save_doxylink_cache)
+    app.connect('env-updated', find_documents_to_rewrite)
+    app.connect('build-finished', report_cache_statistics)
 
     return {
         "version": __version__,
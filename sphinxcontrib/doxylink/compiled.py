@@ -0,0 +1,407 @@
+"""
+A compiled on-disk format for symbol maps, which is queried through a memory map.
+
+Unpickling the symbol map of a large tag file creates every :class:`~.doxylink.Entry` and every
+bucket up front, in every process which needs it. A compiled index instead keeps the tables of a
+:class:`~.doxylink.SymbolMap` as flat arrays of numbers which are read in place, so opening one
+takes constant time, a lookup only creates the entries it looks at, and processes which open the
+same index share the pages the operating system cached for it.
+
+The file starts with a header::
+
+    magic (8 bytes) | format revision (u32) | byte order (1 byte) | padding (3 bytes)
+    | fingerprint size (u32) | number of sections (u32)
+    | doxylink version (u32 length + UTF-8) | source digest (u32 length + UTF-8)
+    | offset and length of each section (2 x u64 each)
+
+followed by the sections, each aligned to 8 bytes. All strings are stored once in a pool and
+referred to by their number. Tables of keys are sorted, so that they can be bisected, and the
+entries belonging to a key are a range of an array of entry numbers, given by a table of starts.
+Numbers are stored in the byte order of the machine which wrote the index; an index written on a
+machine with the other byte order is treated as unusable and built again.
+"""
+
+import contextlib
+import gc
+import itertools
+import mmap
+import struct
+import sys
+from array import array
+from typing import IO, Callable, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+
+from .doxylink import Entry, SymbolMap
+
+#: Identifies a compiled doxylink index
+MAGIC = b'DXLINDEX'
+#: Revision of the layout described above. It has to be bumped whenever the layout changes.
+FORMAT_REVISION = 1
+#: Stands in for the number of a string which is ``None`` or of an entry which doesn't exist
+MISSING = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<8sIc3xII')
+_LENGTH = struct.Struct('<I')
+_SECTION = struct.Struct('<QQ')
+_BYTE_ORDER = sys.byteorder[0].encode()
+
+#: Array types of the sections of numbers
+_TypeCode = Literal['I', 'Q']
+
+#: The sections of a compiled index in the order they are written, with the array type of each.
+#: ``None`` marks raw bytes.
+SECTIONS: Tuple[Tuple[str, Optional[_TypeCode]], ...] = (
+    ('string_starts', 'Q'),         # start of each string in the pool, followed by the end of the pool
+    ('strings', None),              # UTF-8 encoded strings
+    ('entries', 'I'),               # name, kind, anchorfile, anchor and arglist of each entry, sorted by reversed name
+    ('bucket_keys', 'I'),           # last component of each bucket, sorted
+    ('bucket_starts', 'I'),         # start of each bucket in bucket_entries
+    ('bucket_entries', 'I'),
+    ('sub_bucket_keys', 'I'),       # last component of each bucket with sub-buckets, sorted
+    ('sub_bucket_starts', 'I'),     # start of the words of each of them in word_keys
+    ('word_keys', 'I'),             # previous word of each sub-bucket, sorted within its bucket
+    ('word_starts', 'I'),           # start of each sub-bucket in word_entries
+    ('word_entries', 'I'),
+    ('overload_keys', 'I'),         # name and arglist of each overload, sorted
+    ('overload_entries', 'I'),
+    ('resolved_keys', 'I'),         # ambiguous symbols, sorted
+    ('resolved_entries', 'I'),      # the entry each of them resolves to, or MISSING
+    ('fingerprints', None),         # fingerprint of each compound of the tag file, if they are known
+    ('compound_starts', 'I'),       # start of the entries of each compound in compound_entries
+    ('compound_entries', 'I'),
+)
+
+
+class IndexFormatError(ValueError):
+    """Raised when a file is not a compiled index which this version of doxylink can read."""
+
+
+def write_compiled_index(mapping: SymbolMap, file: IO[bytes], version: str, source_digest: str) -> None:
+    """
+    Writes the tables of ``mapping`` to ``file`` in the compiled format.
+
+    Args:
+        mapping: the symbol map to write
+        file: binary file to write to
+        version: version of doxylink, which :class:`CompiledSymbolMap` checks before it is used
+        source_digest: digest of the tag file the symbol map was built from
+    """
+    with _garbage_collection_paused():
+        contents, fingerprint_size = _compile_sections(mapping)
+
+    encoded_version, encoded_digest = version.encode('utf-8'), source_digest.encode('utf-8')
+    header = b''.join((_HEADER.pack(MAGIC, FORMAT_REVISION, _BYTE_ORDER, fingerprint_size, len(SECTIONS)),
+                       _LENGTH.pack(len(encoded_version)), encoded_version,
+                       _LENGTH.pack(len(encoded_digest)), encoded_digest))
+    offset = _align(len(header) + _SECTION.size * len(SECTIONS))
+    table = []
+    for content in contents:
+        table.append(_SECTION.pack(offset, len(content)))
+        offset = _align(offset + len(content))
+
+    file.write(header)
+    file.write(b''.join(table))
+    written = len(header) + _SECTION.size * len(SECTIONS)
+    for content in contents:
+        file.write(b'\0' * (_align(written) - written))
+        file.write(content)
+        written = _align(written) + len(content)
+
+
+def _compile_sections(mapping: SymbolMap) -> Tuple[List[bytes], int]:
+    """Returns the content of each section for :func:`write_compiled_index` and the size of the fingerprints."""
+    # Strings are numbered in the order they are first seen, which is the order of the dictionary
+    string_numbers: Dict[str, int] = {}
+    number_string = string_numbers.setdefault
+
+    def numbers(values: Sequence[Optional[str]]) -> List[int]:
+        return [MISSING if value is None else number_string(value, len(string_numbers)) for value in values]
+
+    sections: Dict[str, List[int]] = {}
+
+    entries = mapping._entries
+    entry_numbers = {id(entry): position for position, entry in enumerate(entries)}
+
+    def table(prefix: str, keys: List[str], buckets: List[List[Entry]]) -> None:
+        """Fills the sections of a table whose keys have a range of entries each"""
+        sections[f'{prefix}_keys'] = numbers(keys)
+        sections[f'{prefix}_starts'] = [0, *itertools.accumulate(map(len, buckets))]
+        sections[f'{prefix}_entries'] = [entry_numbers[id(entry)] for bucket in buckets for entry in bucket]
+
+    fields = (numbers([entry.name for entry in entries]), numbers([entry.kind for entry in entries]),
+              numbers([entry.anchorfile for entry in entries]), numbers([entry.anchor for entry in entries]),
+              numbers([entry.arglist for entry in entries]))
+    sections['entries'] = list(itertools.chain.from_iterable(zip(*fields)))
+
+    buckets, all_sub_buckets, overloads, resolved = mapping._dictionaries()
+    components = sorted(buckets)
+    table('bucket', components, [buckets[component] for component in components])
+
+    # The sub-buckets of all the buckets are one table, sorted by word within each bucket
+    components = sorted(all_sub_buckets)
+    words = [sorted(all_sub_buckets[component]) for component in components]
+    sections['sub_bucket_keys'] = numbers(components)
+    sections['sub_bucket_starts'] = [0, *itertools.accumulate(map(len, words))]
+    table('word', list(itertools.chain.from_iterable(words)),
+          [all_sub_buckets[component][word] for component, component_words in zip(components, words)
+           for word in component_words])
+
+    overload_keys = sorted(overloads)
+    sections['overload_keys'] = numbers(list(itertools.chain.from_iterable(overload_keys)))
+    sections['overload_entries'] = [entry_numbers[id(overloads[key])] for key in overload_keys]
+
+    symbols = sorted(resolved)
+    sections['resolved_keys'] = numbers(symbols)
+    sections['resolved_entries'] = [MISSING if resolved[symbol] is None
+                                    else entry_numbers[id(resolved[symbol])] for symbol in symbols]
+
+    compounds = mapping._compounds or []
+    fingerprint_size = len(compounds[0][0]) if compounds else 0
+    if any(len(fingerprint) != fingerprint_size for fingerprint, _ in compounds):
+        raise ValueError('Compound fingerprints must all have the same size')
+    sections['compound_starts'] = [0, *itertools.accumulate(len(compound) for _, compound in compounds)]
+    sections['compound_entries'] = [entry_numbers[id(entry)] for _, compound in compounds for entry in compound]
+
+    strings = [value.encode('utf-8') for value in string_numbers]
+    sections['string_starts'] = [0, *itertools.accumulate(map(len, strings))]
+
+    raw = {'strings': b''.join(strings), 'fingerprints': b''.join(fingerprint for fingerprint, _ in compounds)}
+    contents = [raw[name] if typecode is None else array(typecode, sections[name]).tobytes()
+                for name, typecode in SECTIONS]
+    return contents, fingerprint_size
+
+
+
+@contextlib.contextmanager
+def _garbage_collection_paused() -> Iterator[None]:
+    """
+    Pauses the cyclic garbage collector while millions of objects are created, none of which are
+    garbage, as it would otherwise scan all of them again and again.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class CompiledSymbolMap(SymbolMap):
+    """
+    A symbol map which is read from a compiled index through a memory map.
+
+    It answers lookups exactly like the :class:`~.doxylink.SymbolMap` it was compiled from, with the
+    same :meth:`_find_entries` and :meth:`_disambiguate`, but its buckets and tables only create
+    :class:`~.doxylink.Entry` objects for the entries a lookup looks at. It can't be updated; use
+    :meth:`to_symbol_map` to get a symbol map which can.
+
+    Args:
+        path (str): path of the compiled index
+
+    Raises:
+        IndexFormatError: if the file isn't a compiled index in the format of this version of doxylink
+        OSError: if the file can't be read
+    """
+
+    def __init__(self, path: str) -> None:  # pylint: disable=super-init-not-called
+        self.path = path
+        with open(path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # an empty file can't be mapped
+                raise IndexFormatError(f'{path} is empty') from error
+        view = memoryview(self._mmap)
+
+        try:
+            magic, revision, byte_order, self._fingerprint_size, section_count = _HEADER.unpack_from(view)
+            if magic != MAGIC or revision != FORMAT_REVISION or byte_order != _BYTE_ORDER or section_count != len(SECTIONS):
+                raise IndexFormatError(f'{path} is not a compiled index of revision {FORMAT_REVISION}')
+            offset = _HEADER.size
+            (length,) = _LENGTH.unpack_from(view, offset)
+            #: Version of doxylink which wrote the index
+            self.version = str(view[offset + 4:offset + 4 + length], 'utf-8')
+            offset += 4 + length
+            (length,) = _LENGTH.unpack_from(view, offset)
+            #: Digest of the tag file the index was built from
+            self.source_digest = str(view[offset + 4:offset + 4 + length], 'utf-8')
+            offset += 4 + length
+            self._sections: Dict[str, memoryview] = {}
+            for name, typecode in SECTIONS:
+                start, length = _SECTION.unpack_from(view, offset)
+                offset += _SECTION.size
+                if start + length > len(view):
+                    raise IndexFormatError(f'{path} is truncated')
+                section = view[start:start + length]
+                self._sections[name] = section.cast(typecode) if typecode else section
+                if name == 'strings':
+                    start_of_strings = start
+        except struct.error as error:
+            raise IndexFormatError(f'{path} is truncated') from error
+
+        self._string_starts = self._sections['string_starts']
+        self._strings_offset = start_of_strings
+        self._entry_fields = self._sections['entries']
+        self._materialised: Dict[int, Entry] = {}
+        self._compounds = None
+
+        self._buckets = _Table(self, 'bucket', self._entry_list)
+        self._sub_buckets = _Table(self, 'sub_bucket', self._word_table)
+        self._overloads = _Table(self, 'overload', self._entry, width=2)
+        self._resolved = _Table(self, 'resolved', self._resolution)
+
+    def __reduce__(self):
+        # Other processes map the same file rather than receive a copy of it
+        return CompiledSymbolMap, (self.path,)
+
+    @property
+    def _entries(self) -> List[Entry]:  # type: ignore[override]
+        return [self._entry(number) for number in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self._entry_fields) // 5
+
+    def _bytes(self, number: int) -> bytes:
+        """Returns a string of the pool still encoded. UTF-8 sorts like the strings themselves."""
+        start = self._strings_offset
+        return self._mmap[start + self._string_starts[number]:start + self._string_starts[number + 1]]
+
+    def _string(self, number: int) -> Optional[str]:
+        if number == MISSING:
+            return None
+        return self._bytes(number).decode('utf-8')
+
+    def _entry(self, number: int) -> Entry:
+        entry = self._materialised.get(number)
+        if entry is None:
+            name, kind, anchorfile, anchor, arglist = self._entry_fields[number * 5:number * 5 + 5]
+            entry = self._materialised[number] = Entry(self._bytes(name).decode('utf-8'), self._string(kind),
+                                                       self._bytes(anchorfile).decode('utf-8'),
+                                                       self._string(arglist), self._string(anchor))
+        return entry
+
+    def _resolution(self, number: int) -> Optional[Entry]:
+        """Returns the entry an ambiguous symbol resolves to, if any"""
+        return None if number == MISSING else self._entry(number)
+
+    def _entry_list(self, start: int, end: int, section: str = 'bucket_entries') -> List[Entry]:
+        return [self._entry(number) for number in self._sections[section][start:end]]
+
+    def _word_table(self, start: int, end: int) -> '_Table':
+        return _Table(self, 'word', lambda first, last: self._entry_list(first, last, 'word_entries'), start, end)
+
+    def to_symbol_map(self) -> SymbolMap:
+        """Reads the whole index into a :class:`~.doxylink.SymbolMap`, which can be updated."""
+        with _garbage_collection_paused():
+            return self._read_symbol_map()
+
+    def _read_symbol_map(self) -> SymbolMap:
+        pool = bytes(self._sections['strings'])
+        starts = self._string_starts.tolist()
+        strings: List[str] = [pool[start:end].decode('utf-8') for start, end in zip(starts, starts[1:])]
+
+        def string(number: int) -> Optional[str]:
+            return None if number == MISSING else strings[number]
+
+        fields = self._entry_fields.tolist()
+        entries = [Entry(strings[name], string(kind), strings[anchorfile], string(arglist), string(anchor))
+                   for name, kind, anchorfile, anchor, arglist in zip(*[iter(fields)] * 5)]
+
+        sections = {name: self._sections[name].tolist() for name, typecode in SECTIONS if typecode}
+
+        def table(prefix: str, first: int = 0, last: Optional[int] = None) -> Dict[str, List[Entry]]:
+            keys, starts, numbers = (sections[f'{prefix}_{part}'] for part in ('keys', 'starts', 'entries'))
+            return {strings[keys[position]]: [entries[number] for number in numbers[starts[position]:starts[position + 1]]]
+                    for position in range(first, len(keys) if last is None else last)}
+
+        mapping = SymbolMap.__new__(SymbolMap)
+        mapping._entries = entries
+        mapping._buckets = table('bucket')
+        sub_bucket_starts = sections['sub_bucket_starts']
+        mapping._sub_buckets = {strings[key]: table('word', sub_bucket_starts[position], sub_bucket_starts[position + 1])
+                                for position, key in enumerate(sections['sub_bucket_keys'])}
+        overload_keys = sections['overload_keys']
+        mapping._overloads = {(strings[name], strings[arglist]): entries[number] for name, arglist, number
+                              in zip(overload_keys[::2], overload_keys[1::2], sections['overload_entries'])}
+        mapping._resolved = {strings[key]: None if number == MISSING else entries[number] for key, number
+                             in zip(sections['resolved_keys'], sections['resolved_entries'])}
+
+        fingerprints = bytes(self._sections['fingerprints'])
+        size = self._fingerprint_size
+        compound_starts, compound_entries = sections['compound_starts'], sections['compound_entries']
+        mapping._compounds = [
+            (fingerprints[position * size:(position + 1) * size],
+             [entries[number] for number in compound_entries[compound_starts[position]:compound_starts[position + 1]]])
+            for position in range(len(compound_starts) - 1)
+        ] or None
+        return mapping
+
+
+class _Table:
+    """
+    A sorted table of a compiled index, which stands in for one of the dictionaries of
+    :class:`~.doxylink.SymbolMap`. Keys are found by bisecting the table, and the value of a key
+    is made from the range of the key's entries by ``value``.
+
+    Tables with a ``width`` of 2 have pairs of strings as keys. Tables which have no starts,
+    like the overloads, have a single entry per key, whose number is passed to ``value``.
+    """
+
+    def __init__(self, index: CompiledSymbolMap, prefix: str, value: Callable, start: int = 0,
+                 end: Optional[int] = None, width: int = 1) -> None:
+        self._index = index
+        self._keys = index._sections[f'{prefix}_keys']
+        starts = index._sections.get(f'{prefix}_starts')
+        self._single = starts is None
+        self._numbers = index._sections[f'{prefix}_entries'] if starts is None else starts
+        self._value = value
+        self._width = width
+        self._start = start
+        self._end = len(self._keys) // width if end is None else end
+        # SymbolMap asks whether a symbol is resolved and then for what it resolves to
+        self._last: Tuple[object, int] = (None, -1)
+
+    def _key(self, position: int):
+        if self._width == 1:
+            return self._index._bytes(self._keys[position])
+        return tuple(self._index._bytes(number) for number in self._keys[position * self._width:(position + 1) * self._width])
+
+    def _find(self, key) -> int:
+        last_key, last_position = self._last
+        if last_key == key:
+            return last_position
+        encoded = key.encode('utf-8') if isinstance(key, str) else tuple(part.encode('utf-8') for part in key)
+        low, high = self._start, self._end
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        position = low if low < self._end and self._key(low) == encoded else -1
+        self._last = (key, position)
+        return position
+
+    def _at(self, position: int):
+        if self._single:
+            return self._value(self._numbers[position])
+        return self._value(self._numbers[position], self._numbers[position + 1])
+
+    def get(self, key, default=None):
+        position = self._find(key)
+        return default if position < 0 else self._at(position)
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) >= 0
+
+    def __getitem__(self, key):
+        position = self._find(key)
+        if position < 0:
+            raise KeyError(key)
+        return self._at(position)
+
+    def __len__(self) -> int:
+        return self._end - self._start
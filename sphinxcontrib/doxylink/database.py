@@ -0,0 +1,250 @@
+"""
+Symbol maps which are kept in an SQLite database instead of in memory.
+
+Projects which link against many large tag files can have more entries than fit into memory as
+Python objects. With the ``'sqlite'`` backend, see ``doxylink_backends``, the entries of a tag file
+are written to a database as they are parsed, and every lookup is an indexed query which only
+creates the entries it returns.
+
+The entries are numbered in the order of :attr:`SymbolMap._entries <.doxylink.SymbolMap>`, i.e. by
+reversed name, so ordering by that number gives candidates in the order the in-memory symbol map
+has them. They are indexed by their last component and previous word, which is how
+:class:`~.doxylink.SymbolMap` buckets them, and by name and argument list for the overloads.
+The symbols which are resolved up front are stored in a table of their own.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import urllib.request
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .compiled import IndexFormatError
+from .doxylink import Entry, SymbolMap, split_name
+
+#: Revision of the tables below. It has to be bumped whenever they change.
+SCHEMA_REVISION = 2
+
+_SCHEMA = '''
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,  -- position in the order of SymbolMap._entries
+    name TEXT NOT NULL,
+    kind TEXT,  -- members of a tag file don't always have one
+    anchorfile TEXT NOT NULL,
+    anchor TEXT,
+    arglist TEXT,
+    component TEXT NOT NULL,  -- the last component of the name
+    word TEXT NOT NULL  -- the word in front of it
+);
+CREATE TABLE resolved (symbol TEXT PRIMARY KEY, entry INTEGER REFERENCES entries (id)) WITHOUT ROWID;
+CREATE TEMPORARY TABLE parsed (
+    position INTEGER PRIMARY KEY, name TEXT, kind TEXT, anchorfile TEXT, anchor TEXT, arglist TEXT,
+    reversed_name TEXT, component TEXT, word TEXT
+);
+'''
+
+_INDEXES = '''
+CREATE INDEX entries_by_component ON entries (component, word, id);
+CREATE INDEX entries_by_signature ON entries (name, arglist, kind, id);
+'''
+
+_COLUMNS = 'id, name, kind, anchorfile, anchor, arglist'
+
+
+def write_database(path: str, entries: Iterable[Entry], version: str, source_digest: str) -> None:
+    """
+    Writes ``entries`` to a new SQLite database at ``path``.
+
+    The entries are streamed into the database, and the ambiguous symbols are resolved one bucket
+    at a time, so only the entries of the largest bucket are held in memory at once.
+
+    Args:
+        path: path of the database, which must not exist yet
+        entries: the entries of a tag file in the order of the tag file
+        version: version of doxylink, which :class:`SqliteSymbolMap` checks before it is used
+        source_digest: digest of the tag file the entries were read from
+    """
+    connection = sqlite3.connect(path)
+    try:
+        # The database is written under a temporary name and only renamed when it is complete,
+        # so it doesn't need a journal
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.executescript(_SCHEMA)
+        connection.executemany(
+            'INSERT INTO metadata VALUES (?, ?)',
+            [('schema', str(SCHEMA_REVISION)), ('version', version), ('source_digest', source_digest)])
+        connection.executemany(
+            'INSERT INTO parsed (name, kind, anchorfile, anchor, arglist, reversed_name, component, word) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            ((entry.name, entry.kind, entry.anchorfile, entry.anchor, entry.arglist, entry.name[::-1],
+              *split_name(entry.name)) for entry in entries))
+        # Number the entries like SymbolMap sorts them: by reversed name, keeping the order of the
+        # tag file for equal names. UTF-8 strings compare like Python strings. They are numbered
+        # here rather than with row_number(), which SQLite only has since 3.25.
+        rows = connection.execute('SELECT name, kind, anchorfile, anchor, arglist, component, word FROM parsed '
+                                  'ORDER BY reversed_name, position')
+        connection.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               ((number, *row) for number, row in enumerate(rows)))
+        connection.execute('DROP TABLE parsed')
+        connection.executescript(_INDEXES)
+
+        connection.executemany('INSERT INTO resolved VALUES (?, ?)', _resolve_ambiguous_symbols(connection))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _resolve_ambiguous_symbols(connection: sqlite3.Connection) -> Iterable[Tuple[str, Optional[int]]]:
+    """
+    Resolves the symbols which :meth:`SymbolMap._resolve_ambiguous_symbols` resolves up front.
+    Every candidate of a symbol is in the bucket of its last component, so the buckets can be
+    resolved one at a time, each by a symbol map of its own.
+    """
+    rows = connection.execute(f'SELECT component, {_COLUMNS} FROM entries ORDER BY component, id')
+    for _, bucket in itertools.groupby(rows, key=lambda row: row[0]):
+        bucket_rows = list(bucket)
+        if len(bucket_rows) < 2:
+            continue
+        numbers: Dict[int, int] = {}
+        entries = []
+        for row in bucket_rows:
+            entry = _entry(row[1:])
+            numbers[id(entry)] = row[1]
+            entries.append(entry)
+        _, _, _, resolutions = SymbolMap(entries)._dictionaries()
+        for symbol, resolved in resolutions.items():
+            yield symbol, None if resolved is None else numbers[id(resolved)]
+
+
+def _entry(row: tuple) -> Entry:
+    _, name, kind, anchorfile, anchor, arglist = row
+    return Entry(name, kind, anchorfile, arglist, anchor)
+
+
+class SqliteSymbolMap(SymbolMap):
+    """
+    A symbol map which queries an SQLite database written by :func:`write_database`.
+
+    Like :class:`~.compiled.CompiledSymbolMap`, it answers lookups exactly like an in-memory
+    :class:`~.doxylink.SymbolMap` with the same :meth:`_find_entries` and :meth:`_disambiguate`,
+    but each of its dictionaries is a query. It can't be updated.
+
+    Args:
+        path (str): path of the database
+
+    Raises:
+        IndexFormatError: if the file isn't a database written by this version of doxylink
+    """
+
+    def __init__(self, path: str) -> None:  # pylint: disable=super-init-not-called
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._materialised: Dict[int, Entry] = {}
+        self._compounds = None
+
+        try:
+            metadata = dict(self._query('SELECT key, value FROM metadata'))
+        except sqlite3.DatabaseError as error:
+            raise IndexFormatError(f'{path} is not a doxylink database: {error}') from error
+        if metadata.get('schema') != str(SCHEMA_REVISION):
+            raise IndexFormatError(f'{path} is not a doxylink database of revision {SCHEMA_REVISION}')
+        #: Version of doxylink which wrote the database
+        self.version = metadata.get('version')
+        #: Digest of the tag file the database was built from
+        self.source_digest = metadata.get('source_digest')
+
+        self._buckets = _Query(self._bucket)
+        # Entries in the database are indexed by their previous word too, so every bucket can be narrowed down by it
+        self._sub_buckets = _Query(lambda component: (True, _Query(lambda word: self._sub_bucket(component, word))))
+        self._overloads = _Query(self._overload)
+        self._resolved = _Query(self._resolution)
+
+    def __reduce__(self):
+        return SqliteSymbolMap, (self.path,)
+
+    def _query(self, sql: str, *parameters) -> List[tuple]:
+        with self._lock:
+            # Connections can't be used by a process forked from the one which opened them
+            if self._connection is None or self._connection_pid != os.getpid():
+                uri = 'file:' + urllib.request.pathname2url(os.path.abspath(self.path)) + '?mode=ro'
+                self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                self._connection_pid = os.getpid()
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _entries_of(self, rows: List[tuple]) -> List[Entry]:
+        entries = []
+        for row in rows:
+            entry = self._materialised.get(row[0])
+            if entry is None:
+                entry = self._materialised[row[0]] = _entry(row)
+            entries.append(entry)
+        return entries
+
+    @property
+    def _entries(self) -> List[Entry]:  # type: ignore[override]
+        return self._entries_of(self._query(f'SELECT {_COLUMNS} FROM entries ORDER BY id'))
+
+    def __len__(self) -> int:
+        return self._query('SELECT count(*) FROM entries')[0][0]
+
+    def _bucket(self, component: str) -> Tuple[bool, List[Entry]]:
+        entries = self._entries_of(self._query(f'SELECT {_COLUMNS} FROM entries WHERE component = ? ORDER BY id',
+                                               component))
+        return bool(entries), entries
+
+    def _sub_bucket(self, component: str, word: str) -> Tuple[bool, List[Entry]]:
+        entries = self._entries_of(self._query(
+            f'SELECT {_COLUMNS} FROM entries WHERE component = ? AND word = ? ORDER BY id', component, word))
+        return bool(entries), entries
+
+    def _overload(self, signature: Tuple[str, str]) -> Tuple[bool, Optional[Entry]]:
+        rows = self._query(f'SELECT {_COLUMNS} FROM entries WHERE name = ? AND arglist = ? AND kind = \'function\' '
+                           'ORDER BY id LIMIT 1', *signature)
+        return bool(rows), self._entries_of(rows)[0] if rows else None
+
+    def _resolution(self, symbol: str) -> Tuple[bool, Optional[Entry]]:
+        rows = self._query('SELECT resolved.entry, name, kind, anchorfile, anchor, arglist '
+                           'FROM resolved LEFT JOIN entries ON entries.id = resolved.entry WHERE symbol = ?', symbol)
+        if not rows:
+            return False, None
+        if rows[0][0] is None:
+            return True, None
+        return True, self._entries_of(rows)[0]
+
+
+class _Query:
+    """
+    Stands in for one of the dictionaries of :class:`~.doxylink.SymbolMap` as a
+    :class:`~.doxylink.Lookup`. ``find`` returns whether there is a value for a key and the value.
+    The last answer is remembered, as the symbol map asks whether a symbol is resolved before
+    asking what it resolves to.
+    """
+
+    def __init__(self, find: Callable[..., Tuple[bool, object]]) -> None:
+        self._find = find
+        self._last: Tuple[object, Tuple[bool, object]] = (None, (False, None))
+
+    def _answer(self, key) -> Tuple[bool, object]:
+        last_key, answer = self._last
+        if last_key != key:
+            answer = self._find(key)
+            self._last = (key, answer)
+        return answer
+
+    def get(self, key, default=None):
+        found, value = self._answer(key)
+        return value if found else default
+
+    def __contains__(self, key) -> bool:
+        return self._answer(key)[0]
+
+    def __getitem__(self, key):
+        found, value = self._answer(key)
+        if not found:
+            raise KeyError(key)
+        return value
@@ -1,16 +1,28 @@
 import bisect
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import json
+import mmap
 import os
 import re
 import requests
 import shutil
+import string
+import sys
+import threading
 import time
 import xml.etree.ElementTree as ET
 import urllib.parse
 from collections import namedtuple
-from typing import List, Optional, Union
+from typing import (Callable, Deque, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, TypeVar, Union,
+                    cast)
 
 from dateutil.parser import parse as parsedate
 from docutils import nodes, utils
+from sphinx.transforms.post_transforms import SphinxPostTransform
 from sphinx.util.nodes import split_explicit_title
 from sphinx.util.console import bold, standout  # type: ignore  # These are not explicitly exported as functions
 from sphinx import __version__ as sphinx_version
@@ -19,11 +31,80 @@ if sphinx_version >= '1.6.0':
     from sphinx.util.logging import getLogger
 
 from . import __version__
-from .parsing import normalise, ParseException
+from .remote import MAX_CONCURRENT_FETCHES, Readable, RemoteFile, create_session, download_file, fetch_remote_file
+from .parsing import normalise, normalise_cache_info, set_normalise_cache_size, ParseException
 
 
-class Entry(namedtuple('_Entry', ['name', 'kind', 'file', 'arglist'])):
-    '''Represents a documentation entry produced by Doxygen.'''
+#: Revision of the layout of the cached :class:`SymbolMap`. It is stored alongside the extension
+#: version and has to be bumped whenever the attributes of SymbolMap or Entry change, so that
+#: caches saved by an earlier revision of the same release are rebuilt rather than misread.
+CACHE_SCHEMA = 7
+
+#: Values of ``doxylink_cache_invalidation``: whether a local tag file counts as changed when its
+#: modification time is newer than the cached one or when the digest of its content differs
+CACHE_INVALIDATION_MODES = ('mtime', 'digest')
+
+#: Values of ``doxylink_backends``: whether the symbol map of a tag file is kept in memory, backed by a
+#: memory-mapped index file, or in an SQLite database, see :mod:`.database`
+BACKENDS = ('memory', 'sqlite')
+
+
+class Entry:
+    '''
+    Represents a documentation entry produced by Doxygen.
+
+    Tag files describe millions of members, so entries are kept small: they use ``__slots__``,
+    the kind and the HTML file are interned so that all the members of a compound share them,
+    and the anchor is only joined onto the file when :attr:`file` is asked for.
+
+    Args:
+        name (str): fully qualified symbol name
+        kind (Optional[str]): Doxygen kind, e.g. ``"class"`` or ``"function"``, if the tag file has one
+        file (str): HTML file documenting the symbol, optionally followed by ``#anchor``
+        arglist (Optional[str]): normalised argument list of functions
+        anchor (Optional[str]): anchor within ``file``
+    '''
+
+    __slots__ = ('name', 'kind', 'anchorfile', 'anchor', 'arglist')
+
+    def __init__(self, name: str, kind: Optional[str], file: str, arglist: Optional[str] = None,
+                 anchor: Optional[str] = None) -> None:
+        if anchor is None:
+            file, separator, anchor = file.partition('#')
+            if not separator:
+                anchor = None
+        self.name = name
+        self.kind = kind if kind is None else sys.intern(kind)
+        self.anchorfile = sys.intern(file)
+        self.anchor = anchor
+        self.arglist = arglist
+
+    @property
+    def file(self) -> str:
+        '''The HTML file documenting the symbol, including the anchor if there is one'''
+        if self.anchor is None:
+            return self.anchorfile
+        return self.anchorfile + '#' + self.anchor
+
+    def _key(self) -> tuple:
+        return self.name, self.kind, self.anchorfile, self.anchor, self.arglist
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Entry):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return iter((self.name, self.kind, self.file, self.arglist))
+
+    def __repr__(self) -> str:
+        return f'Entry(name={self.name!r}, kind={self.kind!r}, file={self.file!r}, arglist={self.arglist!r})'
+
+    def __reduce__(self):
+        return Entry, self._key()[:3] + (self.arglist, self.anchor)
 
     def matches(self, name: str, kind: Optional[str], arglist: Optional[str]) -> bool:
         '''
@@ -55,7 +136,7 @@ class Entry(namedtuple('_Entry', ['name', 'kind', 'file', 'arglist'])):
         return self.arglist == arglist
 
 
-    def __lt__(self, other: Union["Entry", str]) -> bool:  # type:ignore
+    def __lt__(self, other: Union["Entry", str]) -> bool:
         '''
         Compares entries for sorting by reverse name. This allows `SymbolMap` to
         match "foo::bar" when searching for "bar".
@@ -78,6 +159,10 @@ class Entry(namedtuple('_Entry', ['name', 'kind', 'file', 'arglist'])):
         return '<' in self.name
 
 
+#: Messages reported by a thread which defers them, see :class:`WarmUp`
+_deferred = threading.local()
+
+
 def report_info(env, msg, docname=None, lineno=None):
     '''Convenience function for logging an informational
 
@@ -86,6 +171,9 @@ def report_info(env, msg, docname=None, lineno=None):
         docname (str): Name of the document on which the error occured
         lineno (str): Line number in the document on which the error occured
     '''
+    if getattr(_deferred, 'messages', None) is not None:
+        _deferred.messages.append((report_info, env, msg, docname, lineno))
+        return
     if sphinx_version >= '1.6.0':
         logger = getLogger(__name__)
         if lineno is not None:
@@ -104,6 +192,9 @@ def report_warning(env, msg, docname=None, lineno=None):
         docname (str): Name of the document on which the error occured
         lineno (str): Line number in the document on which the error occured
     '''
+    if getattr(_deferred, 'messages', None) is not None:
+        _deferred.messages.append((report_warning, env, msg, docname, lineno))
+        return
     if sphinx_version >= '1.6.0':
         logger = getLogger(__name__)
         if lineno is not None:
@@ -113,6 +204,69 @@ def report_warning(env, msg, docname=None, lineno=None):
     else:
         env.warn(docname, msg, lineno=lineno)
 
+_WORD_CHARACTERS = string.ascii_letters + string.digits + '_'
+_NON_WORD_CHARACTERS = ''.join(chr(code) for code in range(128) if chr(code) not in _WORD_CHARACTERS)
+
+
+def _is_word_character(character: str) -> bool:
+    """Whether ``character`` can't precede a symbol, in the sense of :meth:`Entry.matches`"""
+    return character.isidentifier() or character.isnumeric()
+
+
+def last_component(name: str) -> str:
+    """
+    Returns the shortest suffix of ``name`` which :meth:`Entry.matches` would accept as a symbol.
+
+    For a C++ name that is the part after the last ``::``, e.g. ``bar`` for ``foo::bar``.
+    Every symbol matching an entry ends with the same last component as the entry's name.
+
+    Args:
+        name (str): symbol name
+
+    Returns:
+        str: the last component of the name
+    """
+    return split_name(name)[0]
+
+
+def previous_word(name: str) -> str:
+    """
+    Returns the word in front of the last component of ``name``, e.g. ``foo`` for ``ns::foo::bar``.
+
+    Every symbol matching an entry which has a previous word has the same previous word
+    as the entry's name, or none at all.
+
+    Args:
+        name (str): symbol name
+
+    Returns:
+        str: the previous word or an empty string if there is none
+    """
+    return split_name(name)[1]
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """Returns both the :func:`last_component` and the :func:`previous_word` of ``name``"""
+    if name.isascii():
+        # The last component starts after the last non-word character before the final character
+        start = len(name[:-1].rstrip(_WORD_CHARACTERS))
+        # Skip the separator in front of it and then take the word before that
+        end = len(name[:start].rstrip(_NON_WORD_CHARACTERS))
+        return name[start:], name[len(name[:end].rstrip(_WORD_CHARACTERS)):end]
+
+    start = len(name) - 1
+    while start > 0 and _is_word_character(name[start - 1]):
+        start -= 1
+    start = max(start, 0)
+    end = start
+    while end and not _is_word_character(name[end - 1]):
+        end -= 1
+    word_start = end
+    while word_start and _is_word_character(name[word_start - 1]):
+        word_start -= 1
+    return name[start:], name[word_start:end]
+
+
 def is_url(str_to_validate: str) -> bool:
     ''' Helper function to check if string contains URL
 
@@ -132,13 +286,307 @@ def is_url(str_to_validate: str) -> bool:
     return bool(re.match(regex, str_to_validate))
 
 
+#: Number of entries sharing a last component above which :class:`SymbolMap` indexes them by their previous word
+SUB_BUCKET_THRESHOLD = 16
+
+
+#: The fingerprint of a ``<compound>`` element of a tag file and the entries it produced
+Compound = Tuple[bytes, List[Entry]]
+
+_Key = TypeVar('_Key', contravariant=True)
+_Value = TypeVar('_Value', covariant=True)
+_Default = TypeVar('_Default')
+
+
+class Lookup(Protocol[_Key, _Value]):
+    """
+    The read-only part of a dictionary, which is all :class:`SymbolMap` needs of its tables to
+    look symbols up. Symbol maps which are read from an index implement it by querying the index.
+    """
+
+    def get(self, __key: _Key, __default: _Default) -> Union[_Value, _Default]: ...
+    def __contains__(self, __key: object) -> bool: ...
+    def __getitem__(self, __key: _Key) -> _Value: ...
+
+
+#: The tables of a :class:`SymbolMap` built from entries: buckets, sub-buckets, overloads and resolved symbols
+_Dictionaries = Tuple[Dict[str, List[Entry]], Dict[str, Dict[str, List[Entry]]],
+                      Dict[Tuple[str, str], Entry], Dict[str, Optional[Entry]]]
+
+
 class SymbolMap:
-    """A SymbolMap maps symbols to Entries."""
-    def __init__(self, xml_doc: ET.ElementTree, parse_error_ignore_regexes: Optional[List[str]] = None) -> None:
-        entries = parse_tag_file(xml_doc, parse_error_ignore_regexes)
+    """A SymbolMap maps symbols to Entries.
+
+    It can be built either from a parsed tag file or directly from an iterable of
+    entries such as the one returned by :func:`iter_tag_file`.
+    """
+
+    _entries: List[Entry]
+    _buckets: Lookup[str, List[Entry]]
+    _sub_buckets: Lookup[str, Lookup[str, List[Entry]]]
+    _overloads: Lookup[Tuple[str, str], Entry]
+    _resolved: Lookup[str, Optional[Entry]]
 
-        # Sort the entry list for use with bisect
-        self._entries = sorted(entries)
+    def __init__(self, xml_doc: Union[ET.ElementTree, Iterable[Entry]],
+                 parse_error_ignore_regexes: Optional[List[str]] = None) -> None:
+        if isinstance(xml_doc, ET.ElementTree):
+            entries: Iterable[Entry] = parse_tag_file(xml_doc, parse_error_ignore_regexes)
+        else:
+            entries = xml_doc
+
+        #: The entries of each compound with its fingerprint, in the order of the tag file, if known.
+        #: They allow :meth:`update` to only parse the compounds which changed.
+        self._compounds: Optional[List[Compound]] = None
+        self._build_index(entries)
+
+
+    @classmethod
+    def from_compounds(cls, compounds: Iterable[Compound]) -> 'SymbolMap':
+        """
+        Builds a symbol map from the fingerprinted compounds returned by :func:`iter_tag_file_compounds`,
+        which it remembers so that it can later be updated with :meth:`update`.
+        """
+        compounds = list(compounds)
+        mapping = cls(entry for _, entries in compounds for entry in entries)
+        mapping._compounds = compounds
+        return mapping
+
+
+    def _build_index(self, entries: Iterable[Entry]) -> None:
+        # Sort by reversed name once, computing each key a single time. Everything
+        # below keeps this order so that ties are broken like they always were.
+        self._entries = sorted(entries, key=lambda entry: entry.name[::-1])
+
+        # Group the entries by the last component of their name. Any symbol an entry
+        # matches has the same last component, so a lookup only needs to look at one group.
+        buckets: Dict[str, List[Entry]] = {}
+        words: Dict[int, str] = {}
+        for entry in self._entries:
+            component, words[id(entry)] = split_name(entry.name)
+            buckets.setdefault(component, []).append(entry)
+        self._buckets = buckets
+
+        # Large groups, like all the ``size`` methods, are split up once more by the word
+        # in front of the last component, so that ``QString::size`` doesn't need to look
+        # at every ``size``.
+        all_sub_buckets: Dict[str, Dict[str, List[Entry]]] = {}
+        for component, bucket in buckets.items():
+            if len(bucket) > SUB_BUCKET_THRESHOLD:
+                sub_buckets: Dict[str, List[Entry]] = {}
+                for entry in bucket:
+                    sub_buckets.setdefault(words[id(entry)], []).append(entry)
+                all_sub_buckets[component] = sub_buckets
+        self._sub_buckets = all_sub_buckets
+
+        # Fully qualified function signatures, including whether they are const, map
+        # straight to their entry. The first one wins like it does in _disambiguate.
+        overloads: Dict[Tuple[str, str], Entry] = {}
+        for entry in self._entries:
+            if entry.kind == 'function' and entry.arglist:
+                overloads.setdefault((entry.name, entry.arglist), entry)
+        self._overloads = overloads
+
+        # Resolve the ambiguous symbols without an argument list up front, so that
+        # looking them up doesn't have to pick the best candidate every time
+        self._resolved = self._resolve_ambiguous_symbols(buckets)
+
+
+    def _dictionaries(self) -> _Dictionaries:
+        """Returns the tables as the dictionaries they are in symbol maps built from entries, for updating them."""
+        return cast(_Dictionaries, (self._buckets, self._sub_buckets, self._overloads, self._resolved))
+
+
+    def _split_bucket(self, component: str, bucket: List[Entry]) -> None:
+        """Recreates the sub-buckets of a bucket which changed, if it is big enough to need them."""
+        _, all_sub_buckets, _, _ = self._dictionaries()
+        all_sub_buckets.pop(component, None)
+        if len(bucket) > SUB_BUCKET_THRESHOLD:
+            sub_buckets: Dict[str, List[Entry]] = {}
+            for entry in bucket:
+                sub_buckets.setdefault(previous_word(entry.name), []).append(entry)
+            all_sub_buckets[component] = sub_buckets
+
+
+    def update(self, compounds: Iterable[Compound]) -> bool:
+        """
+        Brings the symbol map up to date with a new version of its tag file.
+
+        ``compounds`` are the fingerprinted compounds of the new version, as returned by
+        :func:`iter_tag_file_compounds` when given :meth:`known_compounds`, so the entries of
+        unchanged compounds are the very same objects. Only the entries of compounds which were
+        removed or added are taken out of or put into the index.
+
+        If that would order entries differently than building the map from scratch does, e.g.
+        because a new entry has the same name as one from another compound, the whole index is
+        built again from the entries instead.
+
+        Returns:
+            bool: whether the index was updated in place rather than built again
+        """
+
+        compounds = list(compounds)
+        if self._compounds is None:
+            self._compounds = compounds
+            self._build_index(entry for _, entries in compounds for entry in entries)
+            return False
+
+        old_positions = {id(entries): position for position, (_, entries) in enumerate(self._compounds)}
+        new_ids = {id(entries) for _, entries in compounds}
+        removed = [entry for _, entries in self._compounds if id(entries) not in new_ids for entry in entries]
+        added = [entry for _, entries in compounds if id(entries) not in old_positions for entry in entries]
+        kept_positions = [old_positions[id(entries)] for _, entries in compounds if id(entries) in old_positions]
+        self._compounds = compounds
+
+        in_order = all(earlier < later for earlier, later in zip(kept_positions, kept_positions[1:]))
+        if not in_order or not self._splice(removed, added):
+            self._build_index(entry for _, entries in compounds for entry in entries)
+            return False
+        return True
+
+
+    def _splice(self, removed: List[Entry], added: List[Entry]) -> bool:
+        """
+        Takes ``removed`` out of the index and puts ``added``, in the order of the tag file, into it.
+
+        Returns:
+            bool: False if that can't keep the order of entries with the same name, in which case
+            the index is left inconsistent and has to be built again
+        """
+
+        buckets, all_sub_buckets, overloads, _ = self._dictionaries()
+        # Entries compare by their reversed names, so the sorted lists can be bisected directly
+        for entry in removed:
+            component, word = split_name(entry.name)
+            _remove_sorted(self._entries, entry)
+            _remove_sorted(buckets[component], entry)
+            if component in all_sub_buckets:
+                _remove_sorted(all_sub_buckets[component][word], entry)
+
+        added_ids = {id(entry) for entry in added}
+        for entry in added:
+            component, word = split_name(entry.name)
+            bucket = buckets.setdefault(component, [])
+            position = bisect.bisect_right(bucket, entry)
+            # Entries with the same name keep the order of the tag file, which is only
+            # known here if all of them were added
+            if any(id(other) not in added_ids for other in bucket[bisect.bisect_left(bucket, entry):position]):
+                return False
+            bucket.insert(position, entry)
+            bisect.insort_right(self._entries, entry)
+            if component in all_sub_buckets:
+                bisect.insort_right(all_sub_buckets[component].setdefault(word, []), entry)
+
+        changed = list(itertools.chain(removed, added))
+        for component in {last_component(entry.name) for entry in changed}:
+            bucket = buckets[component]
+            if not bucket:
+                del buckets[component]
+            if len(bucket) <= SUB_BUCKET_THRESHOLD:
+                all_sub_buckets.pop(component, None)
+            elif component not in all_sub_buckets:
+                self._split_bucket(component, bucket)
+            else:
+                sub_buckets = all_sub_buckets[component]
+                for word in [word for word, entries in sub_buckets.items() if not entries]:
+                    del sub_buckets[word]
+
+        # Only the symbols which are suffixes of a changed name can resolve differently
+        symbols = set()
+        for entry in changed:
+            start = 0
+            while start != -1:
+                symbols.add(entry.name[start:])
+                start = entry.name.find('::', start)
+                if start != -1:
+                    start += 2
+        for symbol in symbols:
+            self._resolve_symbol(symbol)
+
+        for name, arglist in {(entry.name, entry.arglist) for entry in changed
+                              if entry.kind == 'function' and entry.arglist}:
+            first = next((entry for entry in buckets.get(last_component(name), [])
+                          if entry.kind == 'function' and entry.name == name and entry.arglist == arglist), None)
+            if first is None:
+                overloads.pop((name, arglist), None)
+            else:
+                overloads[(name, arglist)] = first
+
+        return True
+
+
+    def _resolve_symbol(self, symbol: str) -> None:
+        """Updates what ``symbol`` resolves to in the table of :meth:`_resolve_ambiguous_symbols`"""
+        candidates = self._find_entries(symbol, None, None)
+        # Like there, only symbols which are ``::``-separated suffixes of several names are resolved up front
+        suffix = '::' + symbol
+        holders = (candidate for candidate in candidates if candidate.name == symbol or candidate.name.endswith(suffix))
+        _, _, _, resolved = self._dictionaries()
+        if len(list(itertools.islice(holders, 2))) < 2:
+            resolved.pop(symbol, None)
+            return
+        try:
+            resolved[symbol] = self._disambiguate(symbol, candidates)
+        except LookupError:
+            resolved[symbol] = None
+
+
+    def known_compounds(self) -> Dict[bytes, Deque[List[Entry]]]:
+        """Returns the entries of each compound by fingerprint, for :func:`iter_tag_file_compounds` to reuse."""
+        known: Dict[bytes, Deque[List[Entry]]] = {}
+        for fingerprint, entries in self._compounds or []:
+            known.setdefault(fingerprint, collections.deque()).append(entries)
+        return known
+
+
+    def _resolve_ambiguous_symbols(self, buckets: Dict[str, List[Entry]]) -> Dict[str, Optional[Entry]]:
+        '''
+        Picks the best entry for every symbol which is a ``::``-separated suffix of
+        more than one entry's name, like ``MyClass`` matching both a class and its
+        constructor, or the name of an overloaded function.
+
+        Args:
+            buckets (dict[str, list[Entry]]): the entries of the symbol map by the last component of their name
+
+        Returns:
+            dict[str, Optional[Entry]]: the entry ``_disambiguate`` picks for each symbol,
+            or None if it finds none
+        '''
+
+        resolved: Dict[str, Optional[Entry]] = {}
+        for bucket in buckets.values():
+            resolved.update(self._resolve_bucket(bucket))
+        return resolved
+
+
+    def _resolve_bucket(self, bucket: List[Entry]) -> Dict[str, Optional[Entry]]:
+        '''Resolves the ambiguous symbols of a single bucket for :meth:`_resolve_ambiguous_symbols`'''
+
+        resolved: Dict[str, Optional[Entry]] = {}
+        if len(bucket) < 2:
+            return resolved
+
+        # All suffixes of names in the bucket share its last component, so
+        # counting them per bucket finds every suffix shared by several names
+        counts: Dict[str, int] = {}
+        for entry in bucket:
+            name = entry.name
+            start = 0
+            while start != -1:
+                suffix = name[start:]
+                counts[suffix] = counts.get(suffix, 0) + 1
+                start = name.find('::', start)
+                if start != -1:
+                    start += 2
+
+        for symbol, count in counts.items():
+            if count < 2:
+                continue
+            try:
+                resolved[symbol] = self._disambiguate(symbol, self._find_entries(symbol, None, None))
+            except LookupError:
+                resolved[symbol] = None
+
+        return resolved
 
 
     def _find_entries(self, name: str, kind: Optional[str], arglist: Optional[str]) -> List[Entry]:
@@ -154,21 +602,18 @@ class SymbolMap:
             list[Entry]: all entries whose name ends with 'name'
         '''
 
-        matches = []
-
-        # Thanks to the sorting, all we need to do is iterate from the first to
-        # the last matching entry.
-        start = bisect.bisect_left(self._entries, name[::-1])  # type:ignore
-        for candidate in self._entries[start:]:
-            if not candidate.name.endswith(name):
-                # Reached the end of entries that end in 'name'
-                break
-
-            if candidate.matches(name, kind, arglist):
-                # Found one
-                matches.append(candidate)
+        if not name:
+            candidates = self._entries
+        else:
+            # Only entries sharing the last component of 'name' can match it, and
+            # only those with the same previous word if 'name' has one
+            component, word = split_name(name)
+            if word and component in self._sub_buckets:
+                candidates = self._sub_buckets[component].get(word, [])
+            else:
+                candidates = self._buckets.get(component, [])
 
-        return matches
+        return [candidate for candidate in candidates if candidate.matches(name, kind, arglist)]
 
 
     def _disambiguate(self, name: str, candidates: List[Entry]) -> Entry:
@@ -219,12 +664,84 @@ class SymbolMap:
     def __getitem__(self, item: str) -> Entry:
         symbol, normalised_arglist = normalise(item)
 
+        if normalised_arglist:
+            overload = self._overloads.get((symbol, normalised_arglist), None)
+            if overload is not None:
+                return overload
+        elif symbol in self._resolved:
+            resolved = self._resolved[symbol]
+            if resolved is None:
+                raise LookupError('Could not find a match')
+            return resolved
+
         # Restrict to functions when given an argument list
         kind = 'function' if normalised_arglist else None
         candidates = self._find_entries(symbol, kind, normalised_arglist)
         return self._disambiguate(symbol, candidates)
 
 
+def _remove_sorted(entries: List[Entry], entry: Entry) -> None:
+    """Removes ``entry`` itself, not just an equal one, from a list sorted by reversed name."""
+    position = bisect.bisect_left(entries, entry)
+    while entries[position] is not entry:
+        position += 1
+    del entries[position]
+
+
+class LinkCache:
+    """
+    Remembers what the targets of a role resolved to during a build.
+
+    Failed lookups are remembered too, so that a target which can't be resolved is
+    rejected straight away the next time it is used. The cache only holds what
+    :class:`SymbolMap` returned or raised; the caller still reports a warning at
+    every location.
+    """
+
+    def __init__(self) -> None:
+        self._resolved: Dict[str, Entry] = {}
+        self._failed: Dict[str, Exception] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, mapping: SymbolMap, target: str) -> Entry:
+        """
+        Returns ``mapping[target]``, from the cache if it was looked up before.
+
+        Raises:
+            LookupError: if there is no entry for the target
+            ParseException: if the target is not a well-formed symbol
+        """
+        entry = self._resolved.get(target)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        failure: Optional[Exception] = self._failed.get(target)
+        if failure is not None:
+            self.hits += 1
+            raise failure.with_traceback(None)
+
+        self.misses += 1
+        try:
+            entry = mapping[target]
+        except (LookupError, ParseException) as error:
+            self._failed[target] = error
+            raise
+        self._resolved[target] = entry
+        return entry
+
+    @property
+    def failures(self) -> int:
+        """Number of distinct targets which could not be resolved"""
+        return len(self._failed)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
 def parse_tag_file(doc: ET.ElementTree, parse_error_ignore_regexes: Optional[List[str]]) -> List[Entry]:
     """
     Takes in an XML tree from a Doxygen tag file and returns a list that looks something like:
@@ -249,76 +766,765 @@ def parse_tag_file(doc: ET.ElementTree, parse_error_ignore_regexes: Optional[Lis
 
     entries: List[Entry] = []
     for compound in doc.findall('./compound'):
-        compound_kind = compound.get('kind')
-        if compound_kind not in {'namespace', 'class', 'struct', 'file', 'define', 'group', 'page'}:
+        entries.extend(parse_compound(compound, parse_error_ignore_regexes))
+
+    return entries
+
+
+#: A member of a compound as read from the tag file: ``(kind, symbol, anchorfile, anchor, arglist)``
+RawMember = Tuple[Optional[str], str, str, Optional[str], Optional[str]]
+#: A compound as read from the tag file: ``(kind, name, filename, members)``
+RawCompound = Tuple[str, str, str, List[RawMember]]
+
+
+def iter_tag_file(source: Union[str, Readable], parse_error_ignore_regexes: Optional[List[str]] = None,
+                  jobs: int = 1) -> Iterator[Entry]:
+    """
+    Incrementally parses a Doxygen tag file and yields its entries compound by compound.
+
+    Unlike :func:`parse_tag_file` the whole XML tree is never held in memory. Each
+    top-level ``<compound>`` element is discarded as soon as its entries have been
+    produced, so memory use is bounded by the largest compound rather than by the
+    size of the file.
+
+    With ``jobs`` greater than one, the compounds are sharded across a pool of worker
+    processes which normalise the argument lists in parallel. The entries and the
+    reported parse errors are the same, and come in the same order, as when parsing
+    serially.
+
+    :Parameters:
+        source : str or file object
+            Path to the tag file or a binary file object to read it from
+        parse_error_ignore_regexes : list of str
+            Patterns of parse errors which should not be reported
+        jobs : int
+            Number of worker processes to normalise argument lists with
+
+    :return: an iterator over the same entries :func:`parse_tag_file` would return
+    """
+
+    compounds = (read_compound(compound) for compound in _iter_compound_elements(source))
+    if jobs > 1:
+        results = _parse_compounds_in_pool(compounds, parse_error_ignore_regexes, jobs)
+    else:
+        results = (_compound_entries(compound, parse_error_ignore_regexes) for compound in compounds)
+
+    for entries, messages in results:
+        for message in messages:
+            report_warning(None, message)  # Use None as env since we don't have access to it here
+        yield from entries
+
+
+def _iter_compound_elements(source: Union[str, Readable]) -> Iterator[ET.Element]:
+    """Yields the top-level ``<compound>`` elements of a tag file, discarding each one afterwards."""
+
+    events = ET.iterparse(source, events=('start', 'end'))
+    # A source without any element raises ParseError rather than StopIteration
+    _, root = next(events)
+    if root.tag != 'tagfile':
+        raise ET.ParseError(f'Expected a <tagfile> element, found <{root.tag}>')
+    depth = 1
+    for event, element in events:
+        if event == 'start':
+            depth += 1
             continue
 
-        compound_name = compound.findtext('name')
-        compound_filename = compound.findtext('filename')
-
-        if compound_name is None:
-            raise KeyError(f"Compound does not have a name")
-        if compound_filename is None:
-            raise KeyError(f"Compound {compound_name} does not have a filename")
-
-        # TODO The following is a hack bug fix I think
-        # Doxygen doesn't seem to include the file extension to <compound kind="file"><filename> entries
-        # If it's a 'file' type, check if it _does_ have an extension, if not append '.html'
-        if compound_kind in ('file', 'page') and not os.path.splitext(compound_filename)[1]:
-            compound_filename = compound_filename + '.html'
-
-        # If it's a compound we can simply add it
-        entries.append(Entry(compound_name, kind=compound_kind, file=compound_filename, arglist=None))
-
-        for member in compound.findall('member'):
-            # If the member doesn't have an <anchorfile> element, use the parent compounds <filename> instead
-            # This is the way it is in the qt.tag and is perhaps an artefact of old Doxygen
-            anchorfile = member.findtext('anchorfile') or compound_filename
-            member_name = member.findtext('name')
-            if member_name is None:
-                raise KeyError(f"Member of {compound_name} does not have a name")
-            member_symbol = compound_name + '::' + member_name
-            member_kind = member.get('kind')
-            arglist = member.findtext('./arglist')  # If it has an <arglist> then we assume it's a function. Empty <arglist> returns '', not None. Things like typedefs and enums can have empty arglists
-
-            member_file = join(anchorfile, '#', member.findtext('anchor'))
-
-            if arglist and member_kind not in {'variable', 'typedef', 'enumeration', 'enumvalue'}:
-                try:
-                    # Parse arguments to do overload resolution later
-                    normalised_arglist = normalise(member_symbol + arglist)[1]
-                    entries.append(
-                        Entry(name=member_symbol, kind=member_kind, file=member_file, arglist=normalised_arglist))
-                except ParseException as e:
-                    message = f'Skipping {member_kind} {member_symbol}{arglist}. Error reported from parser was: {e}'
-                    should_report = True
-
-                    if parse_error_ignore_regexes:
-                        for pattern in parse_error_ignore_regexes:
-                            try:
-                                if re.search(pattern, message):
-                                    should_report = False
-                                    break
-                            except re.error:
-                                # Invalid regex pattern - ignore it
-                                continue
-
-                    if should_report:
-                        report_warning(None, message)  # Use None as env since we don't have access to it here
-                    continue
+        depth -= 1
+        if depth == 1:
+            # A direct child of <tagfile> is complete
+            if element.tag == 'compound':
+                yield element
+            # Drop everything we have seen so far so the tree never grows
+            root.clear()
+
+
+def iter_tag_file_compounds(path: str, parse_error_ignore_regexes: Optional[List[str]] = None, jobs: int = 1,
+                            known: Optional[Dict[bytes, Deque[List[Entry]]]] = None) -> Iterator[Compound]:
+    """
+    Yields the entries of a tag file grouped by ``<compound>``, each with a fingerprint of the compound.
+
+    The fingerprint is a digest of the raw bytes of the compound element, which are found
+    without parsing the XML. Compounds whose fingerprint is in ``known`` aren't parsed at all;
+    the entries recorded there are yielded instead. This is what makes :meth:`SymbolMap.update`
+    cheap when only a few compounds of a large tag file changed.
+
+    :Parameters:
+        path : str
+            Path to the tag file
+        parse_error_ignore_regexes : list of str
+            Patterns of parse errors which should not be reported
+        jobs : int
+            Number of worker processes to normalise argument lists with
+        known : dict
+            Entries of compounds parsed before, by fingerprint, as returned by :meth:`SymbolMap.known_compounds`
+
+    :return: an iterator over ``(fingerprint, entries)`` in the order of the tag file
+    """
+
+    known = known or {}
+    # Compounds which don't need parsing wait here until the ones before them have been parsed
+    order: Deque[Tuple[bytes, Optional[List[Entry]]]] = collections.deque()
+
+    def changed_compounds() -> Iterator[Optional[RawCompound]]:
+        for fingerprint, element in _iter_fingerprinted_compounds(path):
+            reusable = known.get(fingerprint)
+            if reusable:
+                order.append((fingerprint, reusable.popleft()))
             else:
-                # Put the simple things directly into the list
-                entries.append(Entry(name=member_symbol, kind=member_kind, file=member_file, arglist=None))
+                order.append((fingerprint, None))
+                yield read_compound(element())
+
+    if jobs > 1:
+        results = _parse_compounds_in_pool(changed_compounds(), parse_error_ignore_regexes, jobs)
+    else:
+        results = (_compound_entries(compound, parse_error_ignore_regexes) for compound in changed_compounds())
+
+    for entries, messages in results:
+        for message in messages:
+            report_warning(None, message)  # Use None as env since we don't have access to it here
+        while order[0][1] is not None:
+            yield order.popleft()  # type: ignore
+        yield order.popleft()[0], entries
+    yield from order  # type: ignore
+
+
+_COMPOUND_START = re.compile(rb'<compound[\s>]')
+#: What a tag file written by Doxygen has in front of its first ``<compound>`` element
+_TAG_FILE_START = re.compile(rb'(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*\?>\s*)?<tagfile(?:\s[^>]*)?>\s*')
+#: What it has after its last one
+_TAG_FILE_END = re.compile(rb'\s*</tagfile>\s*')
+#: A whole tag file without compounds
+_EMPTY_TAG_FILE = re.compile(rb'(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*\?>\s*)?<tagfile(?:\s[^>]*)?/>\s*')
+
+
+def _iter_fingerprinted_compounds(path: str) -> Iterator[Tuple[bytes, Callable[[], ET.Element]]]:
+    """
+    Yields the fingerprint of each top-level ``<compound>`` element of a tag file and a function which parses it.
 
+    The compounds are found in the raw bytes without parsing the XML, see :func:`_compound_spans`. A file
+    which isn't laid out like a tag file written by Doxygen, e.g. as its download was cut short or it is an
+    error page, is parsed as XML instead, which raises :class:`~xml.etree.ElementTree.ParseError` if it isn't
+    well-formed rather than yielding only some of its compounds.
+    """
+
+    with open(path, 'rb') as tag_file:
+        if os.fstat(tag_file.fileno()).st_size == 0:
+            raise ET.ParseError(f'{path} is empty')
+        with mmap.mmap(tag_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            spans = _compound_spans(data)
+            for start, end in spans or ():
+                chunk = data[start:end]
+                yield hashlib.blake2b(chunk, digest_size=16).digest(), functools.partial(ET.fromstring, chunk)
+    if spans is not None:
+        return
+
+    for element in _iter_compound_elements(path):
+        def parsed(element: ET.Element = element) -> ET.Element:
+            return element
+        yield hashlib.blake2b(ET.tostring(element), digest_size=16).digest(), parsed
+
+
+def _compound_spans(data: mmap.mmap) -> Optional[List[Tuple[int, int]]]:
+    """
+    Returns where each top-level ``<compound>`` element of a tag file starts and ends, or ``None`` unless
+    the file consists of a ``<tagfile>`` element with nothing but compounds in it.
+    """
+
+    spans: List[Tuple[int, int]] = []
+    previous_end = 0
+    match = _COMPOUND_START.search(data)  # type: ignore
+    while match:
+        # Compound elements don't nest and '<' is always escaped in text, so the
+        # next closing tag ends the element
+        start = match.start()
+        end = data.find(b'</compound>', start)
+        if end == -1:
+            return None
+        if spans and data[previous_end:start].strip():
+            return None  # something else is between the compounds
+        previous_end = end + len(b'</compound>')
+        spans.append((start, previous_end))
+        match = _COMPOUND_START.search(data, previous_end)  # type: ignore
+
+    head = _TAG_FILE_START.match(data, 0, spans[0][0] if spans else len(data))  # type: ignore
+    if head is None:
+        return spans if not spans and _EMPTY_TAG_FILE.fullmatch(data) else None  # type: ignore
+    if spans and head.end() != spans[0][0]:
+        return None
+    if not _TAG_FILE_END.fullmatch(data, previous_end if spans else head.end()):  # type: ignore
+        return None
+    return spans
+
+
+#: Upper bound of members sent to a worker process in one go by :func:`iter_tag_file`
+PARSE_SHARD_SIZE = 2000
+
+
+def _parse_compounds_in_pool(compounds: Iterable[Optional[RawCompound]],
+                             parse_error_ignore_regexes: Optional[List[str]],
+                             jobs: int) -> Iterator[Tuple[List[Entry], List[str]]]:
+    """
+    Normalises compounds in a process pool, yielding ``(entries, messages)`` per compound in input order.
+
+    Only a few shards per worker are in flight at any time so that the tag file is
+    still consumed incrementally.
+    """
+
+    def shards() -> Iterator[List[Optional[RawCompound]]]:
+        shard: List[Optional[RawCompound]] = []
+        size = 0
+        for compound in compounds:
+            shard.append(compound)
+            size += len(compound[3]) + 1 if compound else 1
+            if size >= PARSE_SHARD_SIZE:
+                yield shard
+                shard = []
+                size = 0
+        if shard:
+            yield shard
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque[concurrent.futures.Future] = collections.deque()
+        for shard in shards():
+            pending.append(executor.submit(_shard_entries, shard, parse_error_ignore_regexes))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _shard_entries(shard: List[Optional[RawCompound]],
+                   parse_error_ignore_regexes: Optional[List[str]]) -> List[Tuple[List[Entry], List[str]]]:
+    """Worker function of :func:`_parse_compounds_in_pool`"""
+
+    return [_compound_entries(compound, parse_error_ignore_regexes) for compound in shard]
+
+
+def parse_compound(compound: ET.Element, parse_error_ignore_regexes: Optional[List[str]]) -> List[Entry]:
+    """
+    Returns the entries for a single ``<compound>`` element of a Doxygen tag file.
+
+    Compounds of a kind which doxylink does not link to produce no entries.
+
+    :Parameters:
+        compound : xml.etree.ElementTree.Element
+            The ``<compound>`` element
+        parse_error_ignore_regexes : list of str
+            Patterns of parse errors which should not be reported
+
+    :return: a list of entries for the compound itself and all of its members
+    """
+
+    entries, messages = _compound_entries(read_compound(compound), parse_error_ignore_regexes)
+    for message in messages:
+        report_warning(None, message)  # Use None as env since we don't have access to it here
     return entries
 
 
+def read_compound(compound: ET.Element) -> Optional[RawCompound]:
+    """
+    Extracts the strings doxylink needs from a ``<compound>`` element.
+
+    The result only consists of plain tuples and strings so that it is cheap to send
+    to another process.
+
+    :Parameters:
+        compound : xml.etree.ElementTree.Element
+            The ``<compound>`` element
+
+    :return: the raw compound or None if it is of a kind that doxylink does not link to
+    """
+
+    compound_kind = compound.get('kind')
+    if compound_kind not in {'namespace', 'class', 'struct', 'file', 'define', 'group', 'page'}:
+        return None
+
+    compound_name = compound.findtext('name')
+    compound_filename = compound.findtext('filename')
+
+    if compound_name is None:
+        raise KeyError(f"Compound does not have a name")
+    if compound_filename is None:
+        raise KeyError(f"Compound {compound_name} does not have a filename")
+
+    # TODO The following is a hack bug fix I think
+    # Doxygen doesn't seem to include the file extension to <compound kind="file"><filename> entries
+    # If it's a 'file' type, check if it _does_ have an extension, if not append '.html'
+    if compound_kind in ('file', 'page') and not os.path.splitext(compound_filename)[1]:
+        compound_filename = compound_filename + '.html'
+
+    members: List[RawMember] = []
+    for member in compound.findall('member'):
+        # If the member doesn't have an <anchorfile> element, use the parent compounds <filename> instead
+        # This is the way it is in the qt.tag and is perhaps an artefact of old Doxygen
+        anchorfile = member.findtext('anchorfile') or compound_filename
+        member_name = member.findtext('name')
+        if member_name is None:
+            raise KeyError(f"Member of {compound_name} does not have a name")
+        member_symbol = compound_name + '::' + member_name
+        arglist = member.findtext('./arglist')  # If it has an <arglist> then we assume it's a function. Empty <arglist> returns '', not None. Things like typedefs and enums can have empty arglists
+        members.append((member.get('kind'), member_symbol, anchorfile, member.findtext('anchor'), arglist))
+
+    return compound_kind, compound_name, compound_filename, members
+
+
+def _compound_entries(compound: Optional[RawCompound],
+                      parse_error_ignore_regexes: Optional[List[str]]) -> Tuple[List[Entry], List[str]]:
+    """
+    Turns a raw compound into entries, normalising the argument lists of its functions.
+
+    :return: the entries and the messages of parse errors which should be reported
+    """
+
+    entries: List[Entry] = []
+    messages: List[str] = []
+    if compound is None:
+        return entries, messages
+
+    compound_kind, compound_name, compound_filename, members = compound
+
+    # If it's a compound we can simply add it
+    entries.append(Entry(compound_name, kind=compound_kind, file=compound_filename, arglist=None))
+
+    for member_kind, member_symbol, anchorfile, anchor, arglist in members:
+        if arglist and member_kind not in {'variable', 'typedef', 'enumeration', 'enumvalue'}:
+            try:
+                # Parse arguments to do overload resolution later
+                normalised_arglist = normalise(member_symbol + arglist)[1]
+                entries.append(
+                    Entry(member_symbol, member_kind, anchorfile, normalised_arglist, anchor))
+            except ParseException as e:
+                message = f'Skipping {member_kind} {member_symbol}{arglist}. Error reported from parser was: {e}'
+                should_report = True
+
+                if parse_error_ignore_regexes:
+                    for pattern in parse_error_ignore_regexes:
+                        try:
+                            if re.search(pattern, message):
+                                should_report = False
+                                break
+                        except re.error:
+                            # Invalid regex pattern - ignore it
+                            continue
+
+                if should_report:
+                    messages.append(message)
+                continue
+        else:
+            # Put the simple things directly into the list
+            entries.append(Entry(member_symbol, member_kind, anchorfile, None, anchor))
+
+    return entries, messages
+
+
 def join(*args):
     return ''.join(args)
 
 
-def create_role(app, tag_filename, rootdir, cache_name, pdf=""):
+#: Number of bytes hashed at a time by :func:`file_digest`
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """Returns a digest of the content of a file, which is hashed in chunks rather than read at once."""
+    digest = hashlib.blake2b(digest_size=20)
+    buffer = bytearray(DIGEST_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb') as file:
+        size = file.readinto(buffer)
+        while size:
+            digest.update(view[:size])
+            size = file.readinto(buffer)
+    return digest.hexdigest()
+
+
+#: Digests of tag files computed by this process, by path, with the status of the file they were computed from
+_tag_file_digests: Dict[str, Tuple[tuple, str]] = {}
+
+
+def tag_file_digest(path: str) -> str:
+    """
+    Returns :func:`file_digest` of a tag file, which is only computed again if the file changed since,
+    so that a process which builds the documentation repeatedly doesn't hash an unchanged tag file every time.
+    """
+    stat = os.stat(path)
+    status = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    full_path = os.path.abspath(path)
+    known = _tag_file_digests.get(full_path)
+    if known is not None and known[0] == status:
+        return known[1]
+    digest = file_digest(path)
+    _tag_file_digests[full_path] = (status, digest)
+    return digest
+
+
+def resolve_jobs(value: Union[int, str, None]) -> int:
+    """Turns a number of jobs from the configuration into a number of processes, where ``'auto'`` means one per CPU."""
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return max(int(value or 1), 1)
+
+
+class IndexHandle(namedtuple('_IndexHandle', ['path', 'digest', 'version'])):
+    '''
+    Refers to a symbol map saved by :func:`save_index`. Only this handle is kept in the Sphinx
+    environment, so the environment stays small and parallel reader processes map the index
+    file themselves instead of receiving the symbol map pickled.
+
+    Args:
+        path (str): path of the index file, relative to the index directory
+        digest (str): digest of the content of the index file, which is also part of its name
+        version (str): version of doxylink which wrote the index file
+    '''
+
+
+#: Symbol maps which this process saved or loaded, by the path of their index file
+_loaded_indexes: Dict[str, SymbolMap] = {}
+
+#: The index files which this process built, see :func:`register_index`
+_built_indexes: Dict[tuple, Tuple[str, str, IndexHandle]] = {}
+
+
+def register_index(tag_file: tuple, source_digest: str, directory: str, handle: IndexHandle) -> None:
+    """
+    Remembers the index file built from a tag file, so that later builds in this process, e.g. under
+    ``sphinx-autobuild``, reuse it with :func:`find_registered_index` instead of parsing the tag file again.
+
+    Args:
+        tag_file: the path of the tag file, the version of doxylink, the parse error ignore patterns and the
+            backend, which identify what the index file was built from and how
+        source_digest: digest of the content of the tag file
+        directory: the directory of the index file
+        handle: the handle of the index file
+    """
+    registered = _built_indexes.get(tag_file)
+    if registered is not None and registered[0] != source_digest:
+        # The tag file changed, so the symbol map built from the old content isn't needed any more,
+        # including where it was linked to
+        released = _loaded_indexes.pop(os.path.join(registered[1], registered[2].path), None)
+        for path, mapping in list(_loaded_indexes.items()):
+            if released is not None and mapping is released:
+                del _loaded_indexes[path]
+    _built_indexes[tag_file] = (source_digest, directory, handle)
+
+
+def find_registered_index(tag_file: tuple, source_digest: str, directory: str, name: str,
+                          replaces: Optional[IndexHandle] = None) -> Optional[IndexHandle]:
+    """
+    Returns the handle of an index file in ``directory`` with the symbol map which this process built
+    from the same content of a tag file, or ``None`` if it didn't build one. An index file in another
+    directory, or of another role, is linked into ``directory`` under ``name``.
+    The arguments are those of :func:`register_index` and :func:`save_index`.
+    """
+    from .shared import link_or_copy
+
+    registered = _built_indexes.get(tag_file)
+    if registered is None or registered[0] != source_digest:
+        return None
+    _, registered_directory, handle = registered
+    registered_path = os.path.join(registered_directory, handle.path)
+    if not os.path.exists(registered_path):
+        del _built_indexes[tag_file]
+        return None
+    # The digest of the name of an index file has no '-', unlike the name of a role may have
+    if registered_directory == directory and handle.path.rsplit('-', 1)[0] == name:
+        return handle
+
+    extension = os.path.splitext(handle.path)[1][1:]
+    linked_handle, full_path = _store_index(directory, name, extension,
+                                            lambda path: link_or_copy(registered_path, path), replaces)
+    mapping = _loaded_indexes.get(registered_path)
+    # A symbol map in memory isn't tied to its index file, unlike one which reads the file
+    if mapping is not None and not hasattr(mapping, 'path'):
+        _loaded_indexes[full_path] = mapping
+    return linked_handle
+
+
+def index_directory(app) -> str:
+    """Returns the directory the index files are saved in, which is next to the doctrees"""
+    return os.path.join(app.doctreedir, 'doxylink', 'indexes')
+
+
+def cache_state_path(app) -> str:
+    """Returns the path of the file :func:`save_doxylink_cache` writes, next to the index directory"""
+    return os.path.join(app.doctreedir, 'doxylink', 'cache.json')
+
+
+def load_doxylink_cache(app) -> None:
+    """
+    Restores ``env.doxylink_cache`` from what :func:`save_doxylink_cache` wrote at the end of the last build.
+
+    Sphinx only saves the environment when documents were read, but a symbol map is also built again
+    when its tag file changed and no document has to be read for it, which replaces the index file the
+    environment refers to. The file written at the end of every build refers to the current one.
+    """
+    try:
+        with open(cache_state_path(app)) as state_file:
+            cache = json.load(state_file)
+        for sub_cache in cache.values():
+            if sub_cache.get('index') is not None:
+                sub_cache['index'] = IndexHandle(*sub_cache['index'])
+    except (OSError, ValueError, TypeError, AttributeError):
+        return  # missing or written by another version, so the environment is all there is
+    app.env.doxylink_cache = cache
+
+
+def save_doxylink_cache(app, env) -> None:
+    """Writes ``env.doxylink_cache`` to a file of its own once the documents are read, see :func:`load_doxylink_cache`."""
+    cache = getattr(env, 'doxylink_cache', None)
+    if cache is None:
+        return
+    path = cache_state_path(app)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as state_file:
+        json.dump(cache, state_file)
+    os.replace(path + '.tmp', path)
+
+
+def _store_index(directory: str, name: str, extension: str, write: Callable[[str], None],
+                 replaces: Optional[IndexHandle]) -> Tuple[IndexHandle, str]:
+    """
+    Writes an index file with ``write``, which is given the path to write to, and returns its handle and full path.
+
+    The file is written under a temporary name and then renamed, so that other processes never
+    see a partially written index. The index file of ``replaces`` is removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = os.path.join(directory, f'{name}.{os.getpid()}.tmp')
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)  # left behind by an interrupted build
+    write(temporary_path)
+    digest = file_digest(temporary_path)
+    path = f'{name}-{digest}.{extension}'
+    full_path = os.path.join(directory, path)
+    os.replace(temporary_path, full_path)
+
+    if replaces is not None and replaces.path != path:
+        _loaded_indexes.pop(os.path.join(directory, replaces.path), None)
+        try:
+            os.remove(os.path.join(directory, replaces.path))
+        except OSError:
+            pass
+    return IndexHandle(path, digest, __version__), full_path
+
+
+def save_index(mapping: SymbolMap, directory: str, name: str, source_digest: str,
+               replaces: Optional[IndexHandle] = None) -> IndexHandle:
+    """
+    Saves a symbol map to a compiled index file in ``directory`` and returns the handle to load it with.
+
+    Args:
+        mapping: the symbol map to save
+        directory: the directory of the index files
+        name: the name of the tag file, which the name of the index file starts with
+        source_digest: digest of the tag file the symbol map was built from
+        replaces: handle of the index file of an outdated symbol map of the same tag file
+    """
+    from .compiled import write_compiled_index
+
+    def write(path: str) -> None:
+        with open(path, 'wb') as index_file:
+            write_compiled_index(mapping, index_file, __version__, source_digest)
+
+    handle, full_path = _store_index(directory, name, 'index', write, replaces)
+    # This process keeps using the symbol map it built, which is faster to query than the index file
+    _loaded_indexes[full_path] = mapping
+    return handle
+
+
+def save_database(entries: Iterable[Entry], directory: str, name: str, source_digest: str,
+                  replaces: Optional[IndexHandle] = None) -> IndexHandle:
+    """
+    Writes entries to an SQLite database in ``directory``, for the ``'sqlite'`` backend, and returns
+    the handle to load it with. The arguments are those of :func:`save_index`.
+    """
+    from .database import write_database
+
+    handle, _ = _store_index(directory, name, 'sqlite',
+                             lambda path: write_database(path, entries, __version__, source_digest), replaces)
+    return handle
+
+
+def share_index(shared_cache, source_digest: str, backend: str, directory: str, name: str,
+                build: Callable[[], IndexHandle], replaces: Optional[IndexHandle] = None) -> IndexHandle:
+    """
+    Takes the index file of a tag file from a :class:`~.shared.SharedIndexCache`, or builds it with ``build``
+    and adds it to the shared cache, and returns the handle of the index file in ``directory``.
+
+    Args:
+        shared_cache: the shared cache
+        source_digest: digest of the tag file, which together with the version of doxylink and the revisions of
+            the format of the index file identifies the index file
+        backend: the backend the index file is for
+        build: builds the symbol map, saves it to an index file in ``directory`` and returns its handle
+        directory, name, replaces: as for :func:`save_index`
+    """
+    from .compiled import FORMAT_REVISION
+    from .database import SCHEMA_REVISION
+    from .shared import link_or_copy
+
+    extension, revision = ('sqlite', SCHEMA_REVISION) if backend == 'sqlite' else ('index', FORMAT_REVISION)
+    handles: List[IndexHandle] = []
+
+    def create(path: str) -> None:
+        handles.append(build())
+        link_or_copy(os.path.join(directory, handles[0].path), path)
+
+    def use(path: str) -> bool:
+        handle, full_path = _store_index(directory, name, extension,
+                                         lambda index_path: link_or_copy(path, index_path), replaces)
+        if load_index(directory, handle) is None:
+            # Not written by this version of doxylink after all, or damaged, so it is built again
+            report_info(None, f'The symbol map for {name} in the shared cache can\'t be used, building it again')
+            os.remove(full_path)
+            return False
+        report_info(None, f'Using the symbol map for {name} from the shared cache')
+        handles.append(handle)
+        return True
+
+    shared_cache.get(f'{source_digest}-{__version__}-{CACHE_SCHEMA}-{revision}', extension, create, use)
+    return handles[0]
+
+
+def load_index(directory: str, handle: Optional[IndexHandle]) -> Optional[SymbolMap]:
+    """
+    Returns the symbol map a handle refers to, opening its index file unless this process already did.
+
+    The index file is memory-mapped rather than read, see :class:`~.compiled.CompiledSymbolMap`,
+    or queried if it is a database, see :class:`~.database.SqliteSymbolMap`.
+
+    :return: the symbol map, or ``None`` if there is no handle or its index file is missing or unusable
+    """
+    from .compiled import CompiledSymbolMap, IndexFormatError
+    from .database import SqliteSymbolMap
+
+    if handle is None or handle.version != __version__:
+        return None
+    full_path = os.path.join(directory, handle.path)
+    mapping = _loaded_indexes.get(full_path)
+    if mapping is None:
+        if not os.path.exists(full_path):
+            return None
+        try:
+            mapping = (SqliteSymbolMap if handle.path.endswith('.sqlite') else CompiledSymbolMap)(full_path)
+        except (OSError, IndexFormatError):
+            return None
+        if mapping.version != __version__:
+            return None
+        _loaded_indexes[full_path] = mapping
+    return mapping
+
+
+def _updatable_mapping(app, sub_cache: dict) -> Optional[SymbolMap]:
+    """Returns the symbol map of an outdated sub-cache if it was built by this version of doxylink and can be updated."""
+    if sub_cache.get('version') == __version__ and sub_cache.get('schema') == CACHE_SCHEMA:
+        mapping = load_index(index_directory(app), sub_cache.get('index'))
+        if mapping is None:
+            return None
+        # A memory-mapped index can't be changed, so it is read into a symbol map which can
+        if hasattr(mapping, 'to_symbol_map'):
+            return mapping.to_symbol_map()
+        if mapping._compounds is not None:
+            return mapping
+    return None
+
+
+class _DigestingReader:
+    """Wraps a binary stream and computes the digest of what is read from it, like :func:`file_digest` does for files."""
+
+    def __init__(self, stream: Readable) -> None:
+        self._stream = stream
+        self._digest = hashlib.blake2b(digest_size=20)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._digest.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def request_tag_file(app, tag_filename: str, cache_name: str, session: Optional[requests.Session] = None,
+                     conditional: bool = True) -> Optional[RemoteFile]:
+    """
+    Downloads and parses a remote tag file, unless the server reports that the cached symbol map of it is current.
+
+    The tag file is parsed while it is being downloaded, so the content of the returned file is the list of
+    its entries and the digest of its text rather than the text itself.
+
+    :return: the tag file, or ``None`` if the cached symbol map can be kept
+    """
     parse_error_ignore_regexes = getattr(app.config, 'doxylink_parse_error_ignore_regexes', [])
+    parse_jobs = resolve_jobs(getattr(app.config, 'doxylink_parse_jobs', 1))
+
+    def read_entries(stream: Readable) -> Tuple[List[Entry], str]:
+        reader = _DigestingReader(stream)
+        return list(iter_tag_file(reader, parse_error_ignore_regexes, parse_jobs)), reader.hexdigest()
+
+    # Only ask the server whether the tag file changed if there is a symbol map to keep
+    sub_cache = getattr(app.env, 'doxylink_cache', {}).get(cache_name) or {}
+    reusable = (conditional and sub_cache.get('index') is not None and sub_cache.get('version') == __version__
+                and sub_cache.get('schema') == CACHE_SCHEMA)
+    validators = (sub_cache.get('etag'), sub_cache.get('last_modified')) if reusable else (None, None)
+    return fetch_remote_file(tag_filename, *validators, session=session, timeout=app.config.doxylink_fetch_timeout,
+                             consume=read_entries)
+
+
+#: Errors of reading a tag file while its symbol map is built on first use, which leave links into it unresolved
+_TAG_FILE_ERRORS = (ET.ParseError, OSError, RuntimeError, requests.RequestException)
+
+#: The file and kind of the entry a link resolves to. Members of a tag file don't always have a kind.
+Resolution = Tuple[str, Optional[str]]
+
+
+class DoxylinkRole(Protocol):
+    """The role :func:`create_role` returns, with what the rest of the extension uses of it."""
+
+    #: Remembers what links resolved to
+    link_cache: LinkCache
+    #: Returns the symbol map of the tag file, building it if needed
+    load_mapping: Callable[[], SymbolMap]
+    #: Returns the file and kind of the entry a link resolves to, if any
+    resolve: Callable[[str], Optional[Resolution]]
+    #: Whether the tag file could be read
+    tag_file_found: bool
+    #: Whether links into the tag file may resolve differently than in the last build
+    tag_file_changed: bool
+    #: Returns what :func:`build_symbol_maps_in_pool` needs to build the symbol map in another process
+    build_task: Callable[[], Optional[tuple]]
+    #: Uses the index file which was built in another process
+    adopt_index: Callable[[IndexHandle, str], None]
+
+    def __call__(self, name, rawtext, text, lineno, inliner, options={}, content=[]): ...
+
+
+def create_role(app, tag_filename, rootdir, cache_name, pdf="",
+                fetch: Optional[Callable[[], Optional[RemoteFile]]] = None) -> DoxylinkRole:
+    """
+    Creates the role which links to the entries of one tag file.
+
+    ``fetch`` returns the remote tag file which was already requested by :func:`request_tag_file`.
+    Without it, a remote tag file is requested here.
+    """
+    parse_error_ignore_regexes = getattr(app.config, 'doxylink_parse_error_ignore_regexes', [])
+    parse_jobs = resolve_jobs(getattr(app.config, 'doxylink_parse_jobs', 1))
+    cache_invalidation = getattr(app.config, 'doxylink_cache_invalidation', 'mtime')
+    if cache_invalidation not in CACHE_INVALIDATION_MODES:
+        report_warning(app.env, f'Unknown doxylink_cache_invalidation {cache_invalidation!r}, using \'mtime\'')
+        cache_invalidation = 'mtime'
+    backends = getattr(app.config, 'doxylink_backends', {})
+    backend = backends.get(cache_name, 'memory') if isinstance(backends, dict) else 'memory'
+    if backend not in BACKENDS:
+        report_warning(app.env, f'Unknown doxylink backend {backend!r} for {cache_name}, using \'memory\'')
+        backend = 'memory'
+
+    shared_cache = None
+    shared_directory = getattr(app.config, 'doxylink_shared_cache', '')
+    if isinstance(shared_directory, str) and shared_directory:
+        from .shared import SharedIndexCache
+        shared_cache = SharedIndexCache(shared_directory, app.config.doxylink_shared_cache_max_size,
+                                        app.config.doxylink_shared_cache_max_age)
 
     if parse_error_ignore_regexes:
         report_info(app.env, f'Using parse error ignore patterns: {", ".join(parse_error_ignore_regexes)}')
@@ -327,55 +1533,226 @@ def create_role(app, tag_filename, rootdir, cache_name, pdf=""):
     if not rootdir.endswith(('/', '\\')):
         rootdir = join(rootdir, os.sep)
 
+    previous: Optional[SymbolMap] = None  # an outdated symbol map which can be updated instead of built again
+    tag_file_changed = True  # whether links into the tag file may resolve differently than in the last build
+    replaced_index: Optional[IndexHandle] = None  # the index file of an outdated symbol map
     try:
         if is_url(tag_filename):
-            hresponse = requests.head(tag_filename, allow_redirects=True)
-            if hresponse.status_code != 200:
-                raise FileNotFoundError
-            try:
-                modification_time = parsedate(hresponse.headers['last-modified']).timestamp()
-            except KeyError:  # no last-modified header from server
-                modification_time = time.time()
-            def _parse():
-                response = requests.get(tag_filename, allow_redirects=True)
-                if response.status_code != 200:
-                    raise FileNotFoundError
-                return ET.fromstring(response.text)
+            remote_file = fetch() if fetch else request_tag_file(app, tag_filename, cache_name)
+            if remote_file is None:
+                # 304 Not Modified, the cached symbol map is current
+                sub_cache = app.env.doxylink_cache[cache_name]
+                modification_time = sub_cache['mtime']
+                validators = {'etag': sub_cache.get('etag'), 'last_modified': sub_cache.get('last_modified')}
+            else:
+                if remote_file.last_modified:
+                    modification_time = parsedate(remote_file.last_modified).timestamp()
+                else:  # no last-modified header from server
+                    modification_time = time.time()
+                validators = {'etag': remote_file.etag, 'last_modified': remote_file.last_modified}
+            check = 'ETag/Last-Modified'
+            if remote_file is not None and not (remote_file.etag or remote_file.last_modified):
+                # Without validators only the content tells whether the tag file changed
+                _, validators['digest'] = remote_file.content
+                check = 'content digest'
+            def _read_entries() -> Tuple[Iterable[Entry], str]:
+                nonlocal remote_file
+                if remote_file is None:
+                    remote_file = request_tag_file(app, tag_filename, cache_name, conditional=False)
+                if remote_file is None:  # only answers to conditional requests leave the tag file out
+                    raise requests.RequestException(f'The server did not send {tag_filename}')
+                # Only the symbol map holds on to the entries once it has been built
+                content, remote_file = remote_file.content, None
+                return content
+            def _build_mapping() -> Tuple[SymbolMap, str]:
+                entries, source_digest = _read_entries()
+                return SymbolMap(entries), source_digest
         else:
             modification_time = os.path.getmtime(tag_filename)
-            def _parse():
-                return ET.parse(tag_filename)
-
+            if cache_invalidation == 'digest':
+                # Keep the modification time current too, in case the mode is switched back
+                validators = {'mtime': modification_time, 'digest': tag_file_digest(tag_filename)}
+                check = 'content digest'
+            else:
+                validators = {}
+                check = 'modification time'
+            def _read_entries() -> Tuple[Iterable[Entry], str]:
+                source_digest = validators.get('digest') or tag_file_digest(tag_filename)
+                return iter_tag_file(tag_filename, parse_error_ignore_regexes, parse_jobs), source_digest
+            def _build_mapping() -> Tuple[SymbolMap, str]:
+                nonlocal previous
+                source_digest = validators.get('digest') or tag_file_digest(tag_filename)
+                if previous is None:
+                    return SymbolMap.from_compounds(
+                        iter_tag_file_compounds(tag_filename, parse_error_ignore_regexes, parse_jobs)), source_digest
+                # Only parse the compounds which changed since the previous symbol map was built
+                mapping, previous = previous, None
+                compounds = iter_tag_file_compounds(tag_filename, parse_error_ignore_regexes, parse_jobs,
+                                                    mapping.known_compounds())
+                if mapping.update(compounds):
+                    report_info(app.env, 'Updated the changed compounds of the symbol map in place')
+                return mapping, source_digest
+
+        # Only decide here whether the cached symbol map can be used. Parsing the tag file is left
+        # to the first link which needs it, so builds which don't use this role don't pay for it.
+        pending = dict({'index': None, 'mtime': modification_time, 'version': __version__, 'schema': CACHE_SCHEMA,
+                        'backend': backend, 'tag_file': tag_filename}, **validators)
+        updatable = backend == 'memory'  # only in-memory symbol maps can be updated instead of built again
+        digest = validators.get('digest')
+        replaced_index = (getattr(app.env, 'doxylink_cache', {}).get(cache_name) or {}).get('index')
         report_info(app.env, bold('Checking tag file cache for %s: ' % cache_name))
         if not hasattr(app.env, 'doxylink_cache'):
             # no cache present at all, initialise it
-            report_info(app.env, 'No cache at all, rebuilding...')
-            mapping = SymbolMap(_parse(), parse_error_ignore_regexes)
-            app.env.doxylink_cache = {cache_name: {'mapping': mapping, 'mtime': modification_time, 'version': __version__}}
+            report_info(app.env, 'No cache at all, rebuilding on first use...')
+            app.env.doxylink_cache = {cache_name: pending}
         elif not app.env.doxylink_cache.get(cache_name):
             # Main cache is there but the specific sub-cache for this tag file is not
-            report_info(app.env, 'Sub cache is missing, rebuilding...')
-            mapping = SymbolMap(_parse(), parse_error_ignore_regexes)
-            app.env.doxylink_cache[cache_name] = {'mapping': mapping, 'mtime': modification_time, 'version': __version__}
-        elif app.env.doxylink_cache[cache_name]['mtime'] < modification_time:
+            report_info(app.env, 'Sub cache is missing, rebuilding on first use...')
+            app.env.doxylink_cache[cache_name] = pending
+        elif digest is not None and app.env.doxylink_cache[cache_name].get('digest') != digest:
+            # content of the tag file differs from the one the sub-cache was created from
+            report_info(app.env, f'Sub-cache is out of date (decided by {check}), rebuilding on first use...')
+            previous = _updatable_mapping(app, app.env.doxylink_cache[cache_name]) if updatable else None
+            app.env.doxylink_cache[cache_name] = pending
+        elif digest is None and app.env.doxylink_cache[cache_name]['mtime'] < modification_time:
             # tag file has been modified since sub-cache creation
-            report_info(app.env, 'Sub-cache is out of date, rebuilding...')
-            mapping = SymbolMap(_parse(), parse_error_ignore_regexes)
-            app.env.doxylink_cache[cache_name] = {'mapping': mapping, 'mtime': modification_time}
-        elif not app.env.doxylink_cache[cache_name].get('version') or app.env.doxylink_cache[cache_name].get('version') != __version__:
-            # sub-cache doesn't have a version or the version doesn't match
-            report_info(app.env, 'Sub-cache schema version doesn\'t match, rebuilding...')
-            mapping = SymbolMap(_parse(), parse_error_ignore_regexes)
-            app.env.doxylink_cache[cache_name] = {'mapping': mapping, 'mtime': modification_time, 'version': __version__}
+            report_info(app.env, f'Sub-cache is out of date (decided by {check}), rebuilding on first use...')
+            previous = _updatable_mapping(app, app.env.doxylink_cache[cache_name]) if updatable else None
+            app.env.doxylink_cache[cache_name] = pending
+        elif (not app.env.doxylink_cache[cache_name].get('version') or app.env.doxylink_cache[cache_name].get('version') != __version__
+              or app.env.doxylink_cache[cache_name].get('schema') != CACHE_SCHEMA):
+            # sub-cache doesn't have a version or the version or the layout of the cached data doesn't match
+            report_info(app.env, 'Sub-cache schema version doesn\'t match, rebuilding on first use...')
+            app.env.doxylink_cache[cache_name] = pending
+        elif app.env.doxylink_cache[cache_name].get('tag_file', tag_filename) != tag_filename:
+            # the role was configured with another tag file
+            report_info(app.env, 'Sub-cache was built from another tag file, rebuilding on first use...')
+            app.env.doxylink_cache[cache_name] = pending
+        elif app.env.doxylink_cache[cache_name].get('backend', 'memory') != backend:
+            # the symbol map is configured to be kept by another backend
+            report_info(app.env, f'Sub-cache was built for another backend than {backend!r}, rebuilding on first use...')
+            app.env.doxylink_cache[cache_name] = pending
+        elif app.env.doxylink_cache[cache_name].get('index') is None:
+            # An earlier build decided to rebuild the sub-cache but never used the role or failed to build it
+            report_info(app.env, 'Sub-cache has not been built yet, building on first use...')
+            app.env.doxylink_cache[cache_name].pop('missing', None)
+        elif app.env.doxylink_cache[cache_name].pop('missing', False):
+            # The links of the last build didn't resolve, as the tag file wasn't there
+            report_info(app.env, f'Sub-cache is up-to-date (decided by {check}), but the tag file was missing in the last build')
+            remote_file = None
         else:
             # The cache is up to date
-            report_info(app.env, 'Sub-cache is up-to-date')
-    except FileNotFoundError:
+            report_info(app.env, f'Sub-cache is up-to-date (decided by {check})')
+            tag_file_changed = False
+            remote_file = None  # the entries of a tag file which was downloaded anyway aren't needed
+        app.env.doxylink_cache[cache_name].update(validators)
+    except (FileNotFoundError, requests.RequestException):
         tag_file_found = False
+        if getattr(app.env, 'doxylink_cache', {}).get(cache_name):
+            # Links recorded in this build don't resolve, whether or not the tag file changes until the next one
+            app.env.doxylink_cache[cache_name]['missing'] = True
         report_warning(app.env, standout('Could not find tag file %s. Make sure your `doxylink` config variable is set correctly.' % tag_filename))
     else:
         tag_file_found = True
 
+    link_cache = LinkCache()
+    write_time_urls = getattr(app.config, 'doxylink_write_time_urls', False) is True
+
+    # Identifies how the symbol map of a local tag file is built, for later builds in this process to reuse it
+    registry_key = (os.path.abspath(tag_filename), __version__, tuple(parse_error_ignore_regexes or ()), backend)
+
+    # Held while the symbol map is built, so that a link waits for a warm-up which is building it
+    building = threading.Lock()
+
+    def load_mapping() -> SymbolMap:
+        """Returns the symbol map of the tag file, parsing the tag file if this is the first time it is needed."""
+        with building:
+            return _load_mapping()
+
+    unreadable = False  # whether building the symbol map failed, which is only reported once
+
+    def mapping_or_none() -> Optional[SymbolMap]:
+        """Returns the symbol map like :func:`load_mapping`, or ``None`` if the tag file turns out to be unreadable."""
+        nonlocal unreadable
+        if unreadable:
+            return None
+        try:
+            return load_mapping()
+        except _TAG_FILE_ERRORS as error:
+            unreadable = True
+            # Links recorded in this build don't resolve, like when the tag file is missing
+            app.env.doxylink_cache[cache_name]['missing'] = True
+            report_warning(app.env, standout(f'Could not read tag file {tag_filename}: {error}. '
+                                             'Links into it are left unresolved.'))
+            return None
+
+    def _load_mapping() -> SymbolMap:
+        sub_cache = app.env.doxylink_cache[cache_name]
+        mapping = load_index(index_directory(app), sub_cache['index'])
+        if mapping is None:
+            sub_cache['index'] = _build_index() if is_url(tag_filename) else _local_index()
+            mapping = load_index(index_directory(app), sub_cache['index'])
+            if mapping is None:
+                raise RuntimeError(f'The symbol map for {cache_name} was saved to '
+                                   f'{os.path.join(index_directory(app), sub_cache["index"].path)}, '
+                                   f'but it can\'t be read')
+        return mapping
+
+    def _local_index() -> IndexHandle:
+        source_digest = validators.get('digest') or tag_file_digest(tag_filename)
+        handle = find_registered_index(registry_key, source_digest, index_directory(app), cache_name, replaced_index)
+        if handle is not None:
+            report_info(app.env, f'Reusing the symbol map for {cache_name} built earlier in this process')
+            return handle
+        if shared_cache is not None:
+            handle = share_index(shared_cache, source_digest, backend, index_directory(app), cache_name, _build_index,
+                                 replaced_index)
+        else:
+            handle = _build_index()
+        register_index(registry_key, source_digest, index_directory(app), handle)
+        return handle
+
+    def _build_index() -> IndexHandle:
+        report_info(app.env, bold('Building symbol map for %s' % cache_name))
+        if backend == 'sqlite':
+            entries, source_digest = _read_entries()
+            return save_database(entries, index_directory(app), cache_name, source_digest, replaces=replaced_index)
+        mapping, source_digest = _build_mapping()
+        return save_index(mapping, index_directory(app), cache_name, source_digest, replaces=replaced_index)
+
+    def build_task() -> Optional[tuple]:
+        """
+        Returns the arguments of :func:`_build_index_file` if the symbol map of a local tag file has to be built
+        from scratch, or ``None`` if it is current, is updated from the previous one, comes from a download or
+        was built earlier in this process.
+        """
+        if not tag_file_found or is_url(tag_filename) or previous is not None:
+            return None
+        sub_cache = app.env.doxylink_cache[cache_name]
+        if load_index(index_directory(app), sub_cache['index']) is not None:
+            return None
+        source_digest = validators.get('digest') or tag_file_digest(tag_filename)
+        if _built_indexes.get(registry_key, ('',))[0] == source_digest:
+            return None
+        return (tag_filename, parse_error_ignore_regexes, backend, index_directory(app), cache_name,
+                source_digest, replaced_index, shared_cache)
+
+    def adopt_index(handle: IndexHandle, source_digest: str) -> None:
+        """Uses the index file built for :func:`build_task` in another process."""
+        app.env.doxylink_cache[cache_name]['index'] = handle
+        register_index(registry_key, source_digest, index_directory(app), handle)
+
+    def resolve(target: str) -> Optional[Resolution]:
+        """Returns the file and kind of the entry a link to ``target`` resolves to, or ``None`` if it doesn't."""
+        mapping = mapping_or_none() if tag_file_found else None
+        if mapping is None:
+            return None
+        try:
+            entry = link_cache.lookup(mapping, target)
+        except (LookupError, ParseException):
+            return None
+        return entry.file, entry.kind
+
     def find_doxygen_link(name, rawtext, text, lineno, inliner, options={}, content=[]):
         # from :name:`title <part>`
         has_explicit_title, title, part = split_explicit_title(text)
@@ -383,39 +1760,252 @@ def create_role(app, tag_filename, rootdir, cache_name, pdf=""):
         warning_messages = []
         if not tag_file_found:
             warning_messages.append('Could not find match for `%s` because tag file not found' % part)
+            record_link(app.env, cache_name, part, None)
+            return [nodes.inline(title, title)], []
+
+        mapping = mapping_or_none()
+        warm_up = getattr(app, 'doxylink_warm_up', None)
+        if warm_up is not None:
+            warm_up.report()
+        if mapping is None:
+            record_link(app.env, cache_name, part, None)
             return [nodes.inline(title, title)], []
 
         try:
-            url = app.env.doxylink_cache[cache_name]['mapping'][part]
+            url = link_cache.lookup(mapping, part)
         except LookupError as error:
+            record_link(app.env, cache_name, part, None)
             inliner.reporter.warning(f'Could not find match for `{part}` in `{tag_filename}` tag file. Error reported was {error}', line=lineno)
             return [nodes.inline(title, title)], []
         except ParseException as error:
+            record_link(app.env, cache_name, part, None)
             inliner.reporter.warning('Error while parsing `%s`. Is not a well-formed C++ function call or symbol.'
                                      'If this is not the case, it is a doxylink bug so please report it.'
                                      'Error reported was: %s' % (part, error), line=lineno)
             return [nodes.inline(title, title)], []
-
-        if pdf and app.builder.format == 'latex':
-            full_url = join(pdf, '#', url.file)
-            full_url = full_url.replace('.html#', '_')  # for links to variables and functions
-            full_url = full_url.replace('.html', '')  # for links to files
-        # If it's an absolute path then the link will work regardless of the document directory
-        # Also check if it is a URL (i.e. it has a 'scheme' like 'http' or 'file')
-        elif os.path.isabs(rootdir) or urllib.parse.urlparse(rootdir).scheme:
-            full_url = join(rootdir, url.file)
-        # But otherwise we need to add the relative path of the current document to the root source directory to the link
-        else:
-            relative_path_to_docsrc = os.path.relpath(app.env.srcdir, os.path.dirname(inliner.document.attributes['source']))
-            full_url = join(relative_path_to_docsrc, '/', rootdir, url.file)  # We always use the '/' here rather than os.sep since this is a web link avoids problems like documentation/.\../library/doc/ (mixed slashes)
+        record_link(app.env, cache_name, part, (url.file, url.kind))
 
         if url.kind == 'function' and app.config.add_function_parentheses and normalise(title)[1] == '' and not has_explicit_title:
             title = join(title, '()')
 
+        if write_time_urls:
+            # The URL is only computed by ResolveDoxylinkReferences, so that the doctree doesn't depend on it
+            return [pending_doxylink(title, title, doxylink_role=cache_name, doxylink_file=url.file)], []
+
+        def relative_path_to_docsrc() -> str:
+            return os.path.relpath(app.env.srcdir, os.path.dirname(inliner.document.attributes['source']))
+
+        full_url = link_url(link_base(app, rootdir, pdf), url.file, relative_path_to_docsrc)
         pnode = nodes.reference(title, title, internal=False, refuri=full_url)
         return [pnode], []
 
-    return find_doxygen_link
+    role = cast(DoxylinkRole, find_doxygen_link)
+    role.link_cache = link_cache
+    role.load_mapping = load_mapping
+    role.resolve = resolve
+    role.tag_file_found = tag_file_found
+    role.tag_file_changed = tag_file_changed
+    role.build_task = build_task
+    role.adopt_index = adopt_index
+    return role
+
+
+def link_url(base: Tuple[str, str], file: str, relative_path_to_docsrc: Callable[[], str]) -> str:
+    """
+    Returns the URL of a link to ``file`` of the Doxygen documentation, from the ``base`` which :func:`link_base`
+    returns. ``relative_path_to_docsrc`` returns the path from the directory of the document to the source
+    directory, which a relative root directory is relative to.
+    """
+    kind, location = base
+    if kind == 'pdf':
+        full_url = join(location, '#', file)
+        full_url = full_url.replace('.html#', '_')  # for links to variables and functions
+        full_url = full_url.replace('.html', '')  # for links to files
+    # If it's an absolute path then the link will work regardless of the document directory
+    # Also check if it is a URL (i.e. it has a 'scheme' like 'http' or 'file')
+    elif os.path.isabs(location) or urllib.parse.urlparse(location).scheme:
+        full_url = join(location, file)
+    # But otherwise we need to add the relative path of the current document to the root source directory to the link
+    else:
+        full_url = join(relative_path_to_docsrc(), '/', location, file)  # We always use the '/' here rather than os.sep since this is a web link avoids problems like documentation/.\../library/doc/ (mixed slashes)
+    return full_url
+
+
+def link_base(app, rootdir: str, pdf: str) -> Tuple[str, str]:
+    """Returns what :func:`link_url` computes the URLs of a role from in this build: the pdf file or the root directory."""
+    if pdf and app.builder.format == 'latex':
+        return 'pdf', pdf
+    # Tidy up the root directory path
+    if not rootdir.endswith(('/', '\\')):
+        rootdir = join(rootdir, os.sep)
+    return 'rootdir', rootdir
+
+
+def url_base(app, rootdir: str, pdf: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns what the URLs of a role in the doctrees are computed from, or ``None`` with ``doxylink_write_time_urls``,
+    as the URLs aren't part of the doctrees then. Documents are read again when it changes, see
+    :func:`find_outdated_documents`.
+    """
+    if getattr(app.config, 'doxylink_write_time_urls', False) is True:
+        return None
+    return link_base(app, rootdir, pdf)
+
+
+class pending_doxylink(nodes.Inline, nodes.TextElement):
+    """
+    A link into a tag file whose URL is computed when the document is written, by
+    :class:`ResolveDoxylinkReferences`. It holds the name of the role and the file of the
+    Doxygen documentation which the target resolved to.
+    """
+
+
+class ResolveDoxylinkReferences(SphinxPostTransform):
+    """
+    Replaces the :class:`pending_doxylink` nodes of a document with references, using the root
+    directories and pdf files of the roles for the builder of the current build.
+    """
+
+    default_priority = 5
+
+    def run(self, **kwargs) -> None:
+        bases = getattr(self.env, 'doxylink_link_bases', {})
+        relative_path_to_docsrc: List[str] = []
+
+        def relative_path() -> str:
+            # The same for every link of the document, so only computed once
+            if not relative_path_to_docsrc:
+                relative_path_to_docsrc.append(
+                    os.path.relpath(self.env.srcdir, os.path.dirname(self.document['source'])))
+            return relative_path_to_docsrc[0]
+
+        pending = self.document.findall(pending_doxylink) if hasattr(self.document, 'findall') \
+            else self.document.traverse(pending_doxylink)
+        for node in list(pending):
+            title = node.astext()
+            base = bases.get(node['doxylink_role'])
+            if base is None:
+                # The role was removed from the configuration since the document was read
+                node.replace_self(nodes.inline(title, title))
+                continue
+            full_url = link_url(base, node['doxylink_file'], relative_path)
+            node.replace_self(nodes.reference(title, title, internal=False, refuri=full_url))
+
+
+def record_link(env, name: str, target: str, resolution: Optional[Resolution]) -> None:
+    """
+    Records what a link of the role ``name`` to ``target`` in the document being read resolved to,
+    for :func:`find_outdated_documents`. ``resolution`` is what :func:`create_role`'s ``resolve`` returns.
+    """
+    docname = getattr(env, 'temp_data', {}).get('docname')
+    if docname is None:
+        return
+    if not hasattr(env, 'doxylink_links'):
+        env.doxylink_links = {}
+    env.doxylink_links.setdefault(docname, {})[(name, target)] = resolution
+
+
+class WarmUp:
+    """
+    Builds the symbol maps of roles in a background thread while Sphinx reads the sources.
+
+    A role which needs a symbol map that is still being built waits for it; one that the thread
+    hasn't got to yet is built by the role itself, and the thread then finds it built. What the
+    thread reports is held back and reported from the main thread by :meth:`report`, with the
+    same messages as if the symbol maps had been built there.
+
+    Args:
+        load_mappings: the ``load_mapping`` functions of the roles, in the order to build them in
+    """
+
+    def __init__(self, load_mappings: List[Callable[[], SymbolMap]]) -> None:
+        self._load_mappings = load_mappings
+        self._messages: List[tuple] = []
+        self._reported = 0
+        self._thread = threading.Thread(target=self._run, name='doxylink-warm-up', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        _deferred.messages = self._messages
+        try:
+            for load_mapping in self._load_mappings:
+                try:
+                    load_mapping()
+                except Exception:  # pylint: disable=broad-except
+                    # The role fails the same way when it builds the symbol map itself, which reports it
+                    pass
+        finally:
+            _deferred.messages = None
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def report(self) -> None:
+        """Reports what the thread reported since the last call. Must be called from the main thread."""
+        messages = self._messages[self._reported:len(self._messages)]
+        self._reported += len(messages)
+        for report, env, msg, docname, lineno in messages:
+            report(env, msg, docname, lineno)
+
+    def wait(self) -> None:
+        """Waits until all the symbol maps are built and reports what the thread reported."""
+        self._thread.join()
+        self.report()
+
+
+def build_symbol_maps_in_pool(app, roles: Dict[str, DoxylinkRole], jobs: int) -> None:
+    """
+    Builds the symbol maps of all the roles whose local tag file changed, each in a process of a pool.
+
+    A worker saves the symbol map to an index file and only sends back the handle of it and what it
+    reported. The reports are replayed in the order of the configuration, so that the output is the
+    same however the builds are scheduled.
+    """
+    tasks = {name: task for name, task in ((name, role.build_task()) for name, role in roles.items())
+             if task is not None}
+    if not tasks:
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        futures = {name: executor.submit(_build_index_file, *task) for name, task in tasks.items()}
+        for name, future in futures.items():
+            try:
+                handle, source_digest, messages = future.result()
+            except Exception:  # pylint: disable=broad-except
+                # The role builds the symbol map itself on first use, which fails and reports it the same way
+                continue
+            for report, msg, docname, lineno in messages:
+                report(app.env, msg, docname, lineno)
+            roles[name].adopt_index(handle, source_digest)
+
+
+def _build_index_file(tag_filename: str, parse_error_ignore_regexes: Optional[List[str]], backend: str,
+                      directory: str, name: str, source_digest: str, replaces: Optional[IndexHandle],
+                      shared_cache) -> Tuple[IndexHandle, str, List[tuple]]:
+    """Worker function of :func:`build_symbol_maps_in_pool`"""
+
+    def build() -> IndexHandle:
+        report_info(None, bold('Building symbol map for %s' % name))
+        if backend == 'sqlite':
+            return save_database(iter_tag_file(tag_filename, parse_error_ignore_regexes), directory, name,
+                                 source_digest, replaces=replaces)
+        mapping = SymbolMap.from_compounds(iter_tag_file_compounds(tag_filename, parse_error_ignore_regexes))
+        return save_index(mapping, directory, name, source_digest, replaces=replaces)
+
+    messages: List[tuple] = []
+    _deferred.messages = messages
+    try:
+        if shared_cache is not None:
+            handle = share_index(shared_cache, source_digest, backend, directory, name, build, replaces)
+        else:
+            handle = build()
+    finally:
+        _deferred.messages = None
+    # The environment stays behind, the main process reports with its own
+    return handle, source_digest, [(report, msg, docname, lineno) for report, _, msg, docname, lineno in messages]
 
 
 def extract_configuration(values):
@@ -435,36 +2025,45 @@ def extract_configuration(values):
     return tag_filename, rootdir, pdf_filename
 
 
-def fetch_file(app, source, output_path):
-    """Fetches file and puts it in the desired location if it does not exist yet.
+def fetch_file(app, source, output_path, session=None):
+    """Fetches file and puts it in the desired location unless an up-to-date copy is there already.
 
-    Local files will be copied and remote files will be downloaded.
+    Local files will be copied when their size or modification time differ from the copy.
+    Remote files will be streamed to disk, resuming an interrupted download where possible, and are
+    downloaded again when the copy is incomplete or the server reports a newer version.
     Directories in the ``output_path`` get created if needed.
 
     Args:
         app: Sphinx' application instance
         source (str): Path to local file or URL to remote file
         output_path (str): Path with filename to copy/download the source to, relative to Sphinx' output directory
+        session (requests.Session): Session to download with, so that connections are reused
     """
     if not os.path.isabs(output_path):
         output_path = os.path.join(app.outdir, output_path)
-    if os.path.exists(output_path):
-        return
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     if is_url(source):
-        response = requests.get(source, allow_redirects=True)
-        if response.status_code != 200:
+        # What was downloaded is recorded with the rest of the build state, not in the output directory
+        state_name = hashlib.sha1(output_path.encode()).hexdigest() + '.json'
+        state_path = os.path.join(app.doctreedir, 'doxylink', 'downloads', state_name)
+        try:
+            download_file(source, output_path, state_path, session, timeout=app.config.doxylink_fetch_timeout)
+        except FileNotFoundError:
             report_warning(app.env,
                         standout("Could not find file %r. Make sure your `doxylink_pdf_files` config variable is "
                                  "set correctly." % source))
-            return
-        with open(output_path, 'wb') as file:
-            file.write(response.content)
+        except requests.RequestException as error:
+            report_warning(app.env, standout("Could not download file %r: %s" % (source, error)))
     else:
         if not os.path.isabs(source):
             source = os.path.join(app.outdir, source)
         if os.path.exists(source):
-            shutil.copy(source, output_path)
+            if os.path.exists(output_path):
+                source_stat, output_stat = os.stat(source), os.stat(output_path)
+                if (source_stat.st_size, source_stat.st_mtime_ns) == (output_stat.st_size, output_stat.st_mtime_ns):
+                    return
+            shutil.copy2(source, output_path + '.part')
+            os.replace(output_path + '.part', output_path)
         else:
             report_warning(app.env,
                         standout("Expected a URL or a path that exists as value for `doxylink_pdf_files` "
@@ -475,12 +2074,16 @@ def process_configuration(app, tag_filename, rootdir, pdf_filename):
     """Processes the configured values for ``doxylink`` and ``doxylink_pdf_files`` and warns about potential issues.
 
     The type of builder decides which values shall be used.
+    Pdf files are not fetched here but returned, so that they can be fetched together with remote tag files.
 
     Args:
         app: Sphinx' application instance
         tag_filename (str): Path to the Doxygen tag file
         rootdir (str): Path to the root directory of Doxygen HTML documentation
         pdf_filename (str): Path to the pdf file; may be empty when LaTeX builder is not used
+
+    Returns:
+        str: the source of the pdf file which has to be fetched, if any
     """
     if app.builder.format == 'latex':
         if not pdf_filename:
@@ -495,16 +2098,192 @@ def process_configuration(app, tag_filename, rootdir, pdf_filename):
                                "Consider linking to a Doxygen pdf file instead as third element of the tuple in the "
                                "`doxylink` config variable." % rootdir)
         elif pdf_filename in app.config.doxylink_pdf_files:
-            source = app.config.doxylink_pdf_files[pdf_filename]
-            fetch_file(app, source, pdf_filename)
+            return app.config.doxylink_pdf_files[pdf_filename]
     elif pdf_filename and not rootdir:
         report_warning(app.env,
                        "Linking from HTML to Doxygen pdf (%r) is not supported. Consider setting "
                        "the root directory of Doxygen's HTML output as value instead." % pdf_filename)
+    return None
 
 
 def setup_doxylink_roles(app):
+    set_normalise_cache_size(app.config.doxylink_normalise_cache_size)
+    load_doxylink_cache(app)
+    configurations = {}
+    pdf_sources = {}
     for name, values in app.config.doxylink.items():
         tag_filename, rootdir, pdf_filename = extract_configuration(values)
-        process_configuration(app, tag_filename, rootdir, pdf_filename)
-        app.add_role(name, create_role(app, tag_filename, rootdir, name, pdf=pdf_filename))
+        configurations[name] = tag_filename, rootdir, pdf_filename
+        pdf_source = process_configuration(app, tag_filename, rootdir, pdf_filename)
+        if pdf_source:
+            pdf_sources[pdf_filename] = pdf_source
+
+    # Fetch all the remote tag files and pdf files at once, before any role needs them
+    tag_files = {}
+    with create_session(app.config.doxylink_fetch_retries) as session, \
+            concurrent.futures.ThreadPoolExecutor(MAX_CONCURRENT_FETCHES) as pool:
+        for name, (tag_filename, rootdir, pdf_filename) in configurations.items():
+            if is_url(tag_filename):
+                tag_files[name] = pool.submit(request_tag_file, app, tag_filename, name, session)
+        pdf_files = [pool.submit(fetch_file, app, source, pdf_filename, session)
+                     for pdf_filename, source in pdf_sources.items()]
+    for future in pdf_files:
+        future.result()
+
+    app.doxylink_link_caches = {}
+    roles = app.doxylink_roles = {}
+    load_mappings = []
+    for name, (tag_filename, rootdir, pdf_filename) in configurations.items():
+        fetch = tag_files[name].result if name in tag_files else None
+        role = create_role(app, tag_filename, rootdir, name, pdf=pdf_filename, fetch=fetch)
+        app.doxylink_link_caches[name] = role.link_cache
+        roles[name] = role
+        load_mappings.append(role.load_mapping)
+        app.add_role(name, role)
+
+    # What the URLs in the doctrees and in the output of the last build were computed from, see
+    # find_outdated_documents and find_documents_to_rewrite
+    app.doxylink_previous_url_bases = getattr(app.env, 'doxylink_url_bases', None)
+    app.doxylink_previous_link_bases = getattr(app.env, 'doxylink_link_bases', None)
+    app.env.doxylink_url_bases = {name: url_base(app, rootdir, pdf_filename)
+                                  for name, (tag_filename, rootdir, pdf_filename) in configurations.items()}
+    app.env.doxylink_link_bases = {name: link_base(app, rootdir, pdf_filename)
+                                   for name, (tag_filename, rootdir, pdf_filename) in configurations.items()}
+
+    build_jobs = resolve_jobs(getattr(app.config, 'doxylink_build_jobs', 1))
+    if build_jobs > 1:
+        build_symbol_maps_in_pool(app, roles, build_jobs)
+
+    app.doxylink_warm_up = None
+    if getattr(app.config, 'doxylink_warm_up', False) is True and load_mappings:
+        app.doxylink_warm_up = WarmUp(load_mappings)
+        app.doxylink_warm_up.start()
+
+
+def build_symbol_maps_before_forking(app, env, docnames):
+    """
+    Builds the symbol maps before Sphinx forks parallel reader processes, which then share them instead
+    of each building them on first use. With ``doxylink_warm_up`` the warm-up is waited for instead, as
+    the processes mustn't inherit a lock held by its thread either.
+    """
+    if app.parallel <= 1 or not docnames:
+        return
+    warm_up = getattr(app, 'doxylink_warm_up', None)
+    if warm_up is not None:
+        warm_up.wait()
+        return
+    for role in getattr(app, 'doxylink_roles', {}).values():
+        if not role.tag_file_found:
+            continue
+        try:
+            role.load_mapping()
+        except Exception:  # pylint: disable=broad-except
+            # The role fails the same way when it builds the symbol map itself, which reports it
+            pass
+
+
+def finish_warm_up(app, env):
+    """Waits for the warm-up once all sources are read, so that everything it reported is reported."""
+    warm_up = getattr(app, 'doxylink_warm_up', None)
+    if warm_up is not None:
+        warm_up.wait()
+
+
+def merge_doxylink_cache(app, env, docnames, other):
+    """Keeps the handles of the symbol maps which were first needed, and so built, by a parallel reader process."""
+    for name, sub_cache in getattr(other, 'doxylink_cache', {}).items():
+        if sub_cache.get('index') is None or not hasattr(env, 'doxylink_cache'):
+            continue
+        current = env.doxylink_cache.get(name)
+        if current is not None and current.get('index') is None and current['mtime'] == sub_cache['mtime']:
+            env.doxylink_cache[name] = sub_cache
+
+
+def merge_doxylink_links(app, env, docnames, other):
+    """Takes the links recorded by a parallel reader process."""
+    links = getattr(other, 'doxylink_links', {})
+    if not hasattr(env, 'doxylink_links'):
+        env.doxylink_links = {}
+    for docname in docnames:
+        if docname in links:
+            env.doxylink_links[docname] = links[docname]
+
+
+def purge_doxylink_links(app, env, docname):
+    """Forgets the links of a document which is read again or was removed."""
+    getattr(env, 'doxylink_links', {}).pop(docname, None)
+
+
+def find_outdated_documents(app, env, added, changed, removed):
+    """
+    Returns the documents which have to be read again because of a change to doxylink's configuration
+    or to a tag file, so that Sphinx doesn't read every document again:
+
+    - documents which link with a role whose URLs are computed differently, e.g. as its root directory
+      changed, unless the URLs are only computed when writing with ``doxylink_write_time_urls``
+    - documents which link with a role that was removed, and all documents if a role was added
+    - documents with a link which resolves differently since a tag file changed
+    """
+    links = getattr(env, 'doxylink_links', {})
+    bases = getattr(env, 'doxylink_url_bases', {})
+    previous_bases = getattr(app, 'doxylink_previous_url_bases', None)
+    if previous_bases is None:
+        # The documents were read before the URL bases were recorded, if there are any yet
+        return sorted(env.found_docs - added - changed - removed)
+    if set(bases) - set(previous_bases):
+        # Documents which used a role before it was configured weren't recorded
+        report_info(env, 'doxylink: roles were added, so all documents are read again')
+        return sorted(env.found_docs - added - changed - removed)
+    rebased = {name for name, base in previous_bases.items() if bases.get(name, ()) != base}
+    roles = {name: role for name, role in getattr(app, 'doxylink_roles', {}).items() if role.tag_file_changed}
+    if not links or not (roles or rebased):
+        return []
+
+    resolutions: Dict[Tuple[str, str], Optional[Resolution]] = {}
+    outdated = []
+    for docname, resolved in links.items():
+        if docname in changed or docname in removed:
+            continue
+        for link, resolution in resolved.items():
+            if link[0] in rebased:
+                outdated.append(docname)
+                break
+            role = roles.get(link[0])
+            if role is None:
+                continue
+            if link not in resolutions:
+                resolutions[link] = role.resolve(link[1])
+            if resolutions[link] != resolution:
+                outdated.append(docname)
+                break
+    changed_roles = ', '.join(sorted(rebased | set(roles)))
+    report_info(env, f'doxylink: {len(outdated)} documents have links which changed in {changed_roles}')
+    return outdated
+
+
+def find_documents_to_rewrite(app, env):
+    """
+    Returns the documents which link with a role whose URLs changed, e.g. as its root directory changed,
+    so that the builder writes them again. With ``doxylink_write_time_urls`` they aren't read again
+    for that, as their doctrees don't contain the URLs.
+    """
+    previous_bases = getattr(app, 'doxylink_previous_link_bases', None)
+    if previous_bases is None or getattr(app.config, 'doxylink_write_time_urls', False) is not True:
+        return []
+    bases = getattr(env, 'doxylink_link_bases', {})
+    rebased = {name for name, base in bases.items() if previous_bases.get(name) != base}
+    return sorted(docname for docname, resolved in getattr(env, 'doxylink_links', {}).items()
+                  if any(name in rebased for name, _ in resolved))
+
+
+def report_cache_statistics(app, exception):
+    """Reports how well the link and signature caches did at the end of the build."""
+    for name, link_cache in getattr(app, 'doxylink_link_caches', {}).items():
+        if link_cache.hits or link_cache.misses:
+            report_info(app.env, f'doxylink: {name}: resolved {link_cache.hits + link_cache.misses} links, '
+                                 f'{link_cache.hits} from the link cache ({link_cache.hit_rate:.0%}), '
+                                 f'{link_cache.failures} unresolvable targets')
+    info = normalise_cache_info()
+    if info.hits or info.misses:
+        report_info(app.env, f'doxylink: normalised signatures: {info.hits} hits, {info.misses} misses, '
+                             f'{info.evictions} evictions')
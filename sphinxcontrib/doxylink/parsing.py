@@ -1,4 +1,7 @@
-from typing import Tuple
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Hashable, List, Optional, Tuple
 
 from pyparsing import Word, Literal, nums, alphanums, OneOrMore, Opt, \
     SkipTo, ParseException, Group, Combine, delimitedList, quotedString, \
@@ -69,6 +72,91 @@ argument = Group(argument_type('argument_type') + Opt(input_name) + Opt(default_
 arglist = LPAR + delimitedList(argument)('arg_list') + Opt(COMMA + '...')('var_args') + RPAR
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """
+    A thread-safe mapping which keeps at most ``maxsize`` items, evicting the least recently used ones.
+
+    It counts hits, misses and evictions, which :meth:`info` reports. A ``maxsize``
+    of zero disables caching.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value for ``key`` or None"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Caches ``value`` for ``key``, evicting the least recently used item if the cache is full"""
+        with self._lock:
+            if self._maxsize <= 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        """Changes the maximum number of items, evicting items if there are now too many"""
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Removes all items and resets the counters"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Returns the counters and the current and maximum size"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._data))
+
+    def _evict(self) -> None:
+        while len(self._data) > max(self._maxsize, 0):
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+
+#: Default number of normalised argument lists :func:`normalise` remembers
+DEFAULT_NORMALISE_CACHE_SIZE = 8192
+
+# Normalised argument lists keyed by the raw argument list, so that they are shared between functions
+_arglist_cache = LRUCache(DEFAULT_NORMALISE_CACHE_SIZE)
+
+
+def normalise_cache_info() -> CacheInfo:
+    """Returns the hit, miss and eviction counters of the cache used by :func:`normalise`"""
+    return _arglist_cache.info()
+
+
+def set_normalise_cache_size(maxsize: int) -> None:
+    """Sets how many normalised argument lists :func:`normalise` remembers. Zero disables the cache."""
+    _arglist_cache.resize(maxsize)
+
+
+def clear_normalise_cache() -> None:
+    """Empties the cache used by :func:`normalise` and resets its counters"""
+    _arglist_cache.clear()
+
+
 def normalise(symbol: str) -> Tuple[str, str]:
     """
     Takes a c++ symbol or function and splits it into symbol and a normalised argument list.
@@ -95,6 +183,28 @@ def normalise(symbol: str) -> Tuple[str, str]:
         # If there's no brackets, then there's no function signature. This means the passed in symbol is just a type name
         return symbol, ''
 
+    normalised_arg_list_string = _arglist_cache.get(arglist_input_string)
+    if normalised_arg_list_string is None:
+        normalised_arg_list_string = normalise_arglist(arglist_input_string)
+        _arglist_cache.put(arglist_input_string, normalised_arg_list_string)
+
+    return function_name, normalised_arg_list_string
+
+
+def normalise_arglist(arglist_input_string: str) -> str:
+    """
+    Normalises the argument list part of a function signature, i.e. everything from the opening bracket on.
+
+    Unlike :func:`normalise` this does not use the cache.
+
+    :Parameters:
+        arglist_input_string : string
+            An argument list like ``( const QString & text ) const``
+
+    :return:
+        the normalised argument list, e.g. ``(const QString&) const``
+    """
+
     # This is a very common signature so we'll make a special case for it. It requires no parsing anyway
     if arglist_input_string.startswith('()'):
         arglist_input_string_no_spaces = arglist_input_string
@@ -106,7 +216,7 @@ def normalise(symbol: str) -> Tuple[str, str]:
         if exception_qualifier != -1:
             # Remove everything starting with the exception keyword
             arglist_input_string_no_spaces = arglist_input_string_no_spaces[:exception_qualifier]
-        return function_name, arglist_input_string_no_spaces.replace('const', ' const')
+        return arglist_input_string_no_spaces.replace('const', ' const')
 
     # By now we're left with something like "(blah, blah)", "(blah, blah) const" or "(blah, blah) const =0"
     try:
@@ -118,46 +228,300 @@ def normalise(symbol: str) -> Tuple[str, str]:
         print('Could not find closing bracket in %s' % arglist_input_string)
         raise
 
-    try:
-        result = arglist.parseString(arglist_input_string)
-    except ParseException:
-        raise
-    else:
-        # Will be a list or normalised string arguments
-        # e.g. ['OBMol&', 'vector< int >&', 'OBBitVec&', 'OBBitVec&', 'int', 'int']
-        normalised_arg_list = []
+    normalised_arg_list_string = canonicalise_arglist(arglist_input_string)
+    if normalised_arg_list_string is None:
+        # Not one of the common shapes, so let the full grammar deal with it
+        normalised_arg_list_string = parse_arglist(arglist_input_string)
+
+    # Add a const onto the end
+    if 'const' in arglist_suffix:
+        normalised_arg_list_string += ' const'
+
+    return normalised_arg_list_string
+
+
+def parse_arglist(arglist_input_string: str) -> str:
+    """
+    Normalises an argument list like ``(const QString & text, bool redraw = true)`` using the pyparsing grammar.
+
+    :Parameters:
+        arglist_input_string : string
+            The argument list, from the opening to the closing bracket
+
+    :return:
+        the normalised argument list, e.g. ``(const QString&, bool)``
+    """
+
+    result = arglist.parseString(arglist_input_string)
 
-        # Cycle through all the matched arguments
-        for arg in result.arg_list:
-            # Here is where we build up our normalised form of the argument
-            argument_string_list = ['']
-            if arg.qualifier1:
-                argument_string_list.append(''.join((arg.qualifier1, ' ')))
-            if arg.qualifier2:
-                argument_string_list.append(''.join((arg.qualifier2, ' ')))
-            argument_string_list.append(arg.input_type)
+    # Will be a list or normalised string arguments
+    # e.g. ['OBMol&', 'vector< int >&', 'OBBitVec&', 'OBBitVec&', 'int', 'int']
+    normalised_arg_list = []
 
-            # Functions can have a funny combination of *, & and const between the type and the name so build up a list of those here:
-            argument_string_list.extend(''.join(arg.pointer_or_references))
+    # Cycle through all the matched arguments
+    for arg in result.arg_list:
+        # Here is where we build up our normalised form of the argument
+        argument_string_list = ['']
+        if arg.qualifier1:
+            argument_string_list.append(''.join((arg.qualifier1, ' ')))
+        if arg.qualifier2:
+            argument_string_list.append(''.join((arg.qualifier2, ' ')))
+        argument_string_list.append(arg.input_type)
 
-            # Add template parameter pack
-            argument_string_list.append(arg.parameter_pack)
+        # Functions can have a funny combination of *, & and const between the type and the name so build up a list of those here:
+        argument_string_list.extend(''.join(arg.pointer_or_references))
 
-            # Finally we join our argument string and add it to our list
-            normalised_arg_list.append(''.join(argument_string_list))
+        # Add template parameter pack
+        argument_string_list.append(arg.parameter_pack)
 
-        # If the function contains a variable number of arguments (int foo, ...) then add them on.
-        if result.var_args:
-            normalised_arg_list.append('...')
+        # Finally we join our argument string and add it to our list
+        normalised_arg_list.append(''.join(argument_string_list))
 
-        # Combine all the arguments and put parentheses around it
-        normalised_arg_list_string = ''.join(['(', ', '.join(normalised_arg_list), ')'])
+    # If the function contains a variable number of arguments (int foo, ...) then add them on.
+    if result.var_args:
+        normalised_arg_list.append('...')
 
-        # Add a const onto the end
-        if 'const' in arglist_suffix:
-            normalised_arg_list_string += ' const'
+    # Combine all the arguments and put parentheses around it
+    return ''.join(['(', ', '.join(normalised_arg_list), ')'])
 
-        return function_name, normalised_arg_list_string
 
-    # TODO Maybe this should raise an exception?
-    return None
+QUALIFIERS = frozenset(('const', 'volatile', 'typename', 'struct', 'enum'))
+FUNDAMENTAL_TYPES = frozenset(('bool', 'short', 'int', 'long', 'signed', 'unsigned', 'char', 'float', 'double'))
+
+# Tokens understood by canonicalise_arglist(). Anything else sends the argument list to the full grammar.
+_fast_token = re.compile(r"""
+    (?P<space>[ \t\r\n]+)
+    |(?P<word>[A-Za-z0-9_:]+)
+    |(?P<ellipsis>\.\.\.)
+    |(?P<string>"[^"\\\r\n]*"|'[^'\\\r\n]*')
+    |(?P<punct>[()<>\[\]{},*&=|^.-])
+    """, re.VERBOSE)
+# A keyword immediately followed by '::' is split up by the grammar but not by the tokenizer
+_keyword_and_colon = re.compile('(?:%s):' % '|'.join(sorted(QUALIFIERS | FUNDAMENTAL_TYPES)))
+_template_whitespace = re.compile(r'[ \t\r\n]+')
+
+
+class _Unsupported(Exception):
+    """Raised internally when canonicalise_arglist() meets something only the full grammar can handle."""
+
+
+def canonicalise_arglist(arglist_input_string: str) -> Optional[str]:
+    """
+    Normalises an argument list with a single-pass tokenizer instead of the pyparsing grammar.
+
+    It understands the common shapes of arguments: fundamental and qualified type names,
+    templates without nesting, ``const``/``volatile``/``typename`` qualifiers, pointers
+    and references, parameter packs, argument names, array suffixes and default values.
+    For those, the result is identical to :func:`parse_arglist`.
+
+    :Parameters:
+        arglist_input_string : string
+            The argument list, from the opening to the closing bracket
+
+    :return:
+        the normalised argument list or None if the argument list needs the full grammar
+    """
+
+    tokens: List[Tuple[str, str, int, int]] = []
+    position = 0
+    length = len(arglist_input_string)
+    while position < length:
+        match = _fast_token.match(arglist_input_string, position)
+        if match is None:
+            return None
+        kind = match.lastgroup
+        if kind is None:  # every alternative of the pattern is a named group, so this doesn't happen
+            return None
+        if kind != 'space':
+            text = match.group()
+            if kind == 'word' and _keyword_and_colon.match(text):
+                return None
+            tokens.append((kind, text, position, match.end()))
+        position = match.end()
+
+    try:
+        return _ArglistCanonicaliser(arglist_input_string, tokens).arglist()
+    except _Unsupported:
+        return None
+
+
+class _ArglistCanonicaliser:
+    """Recursive descent over the tokens of an argument list, mirroring the ``arglist`` grammar."""
+
+    def __init__(self, string: str, tokens: List[Tuple[str, str, int, int]]) -> None:
+        self.string = string
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str, int, int]:
+        index = self.index + offset
+        if index >= len(self.tokens):
+            raise _Unsupported
+        return self.tokens[index]
+
+    def take(self) -> Tuple[str, str, int, int]:
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def at(self, text: str) -> bool:
+        return self.index < len(self.tokens) and self.tokens[self.index][1] == text
+
+    def adjacent(self) -> bool:
+        """Whether the next token directly follows the previous one without whitespace"""
+        return self.index < len(self.tokens) and self.tokens[self.index][2] == self.tokens[self.index - 1][3]
+
+    def skip_to(self, closer: str) -> None:
+        """Skips to just past the next ``closer`` like ``SkipTo`` does, giving up on anything that could confuse it"""
+        opener = self.take()[1]
+        while True:
+            kind, text, _, _ = self.take()
+            if text == closer:
+                return
+            if text == opener or kind == 'string':
+                raise _Unsupported
+
+    def arglist(self) -> str:
+        if not self.at('('):
+            raise _Unsupported
+        self.index += 1
+
+        arguments = [self.argument()]
+        while self.at(','):
+            self.index += 1
+            if self.peek()[0] == 'ellipsis':
+                self.index += 1
+                arguments.append('...')
+                break
+            arguments.append(self.argument())
+
+        # The closing bracket has to be the very last token
+        if not self.at(')') or self.index != len(self.tokens) - 1:
+            raise _Unsupported
+        return ''.join(['(', ', '.join(arguments), ')'])
+
+    def qualifiers(self) -> str:
+        words = []
+        while self.at_word(QUALIFIERS):
+            words.append(self.take()[1])
+        return ' '.join(words)
+
+    def at_word(self, words: frozenset) -> bool:
+        return self.index < len(self.tokens) and self.tokens[self.index][1] in words
+
+    def argument(self) -> str:
+        qualifier1 = self.qualifiers()
+        input_type = self.input_type()
+        qualifier2 = self.qualifiers()
+
+        argument_string_list = []
+        if qualifier1:
+            argument_string_list.append(qualifier1 + ' ')
+        if qualifier2:
+            argument_string_list.append(qualifier2 + ' ')
+        argument_string_list.append(input_type)
+
+        # Pointers and references, each pointer optionally being const or volatile
+        while self.at('*') or self.at('&'):
+            argument_string_list.append(self.take()[1])
+            if argument_string_list[-1] == '*' and self.peek()[0] == 'word':
+                word = self.peek()[1]
+                if word in ('const', 'volatile'):
+                    argument_string_list.append(self.take()[1])
+                elif word.startswith(('const', 'volatile')):
+                    raise _Unsupported
+
+        # Template parameter pack
+        if self.peek()[0] == 'ellipsis':
+            self.index += 1
+            argument_string_list.append('...')
+
+        self.input_name()
+        if self.at('='):
+            self.default_value()
+
+        if not (self.at(',') or self.at(')')):
+            raise _Unsupported
+        return ''.join(argument_string_list)
+
+    def input_type(self) -> str:
+        kind, text, _, _ = self.take()
+        if kind != 'word' or text in QUALIFIERS:
+            raise _Unsupported
+
+        if text in FUNDAMENTAL_TYPES:
+            words = [text]
+            while self.at_word(FUNDAMENTAL_TYPES):
+                words.append(self.take()[1])
+            if self.at('<'):
+                raise _Unsupported
+            return ' '.join(words)
+
+        if not (self.at('<') and self.adjacent()):
+            if self.at('<'):
+                raise _Unsupported
+            return text
+
+        # A template without nesting, rendered the way normalise_templates() does it
+        start = self.take()[3]
+        while True:
+            token_kind, token_text, token_start, token_end = self.take()
+            if token_text == '>':
+                break
+            if token_text == '<' or token_kind == 'string':
+                raise _Unsupported
+        template_arguments = _template_whitespace.split(self.string[start:token_start].strip(' \t\r\n'))
+        rendered = [text, '<']
+        rendered.extend(' ' + argument for argument in template_arguments if argument)
+        rendered.append(' >')
+
+        # A nested name such as ``Q3ValueList<T>::size_type``
+        if self.index < len(self.tokens) and self.peek()[0] == 'word' and self.adjacent():
+            rendered.append(self.take()[1])
+        if self.at('<'):
+            raise _Unsupported
+        return ''.join(rendered)
+
+    def input_name(self) -> None:
+        if self.index < len(self.tokens) and self.peek()[0] == 'word':
+            name = self.take()[1]
+            if ':' in name or name in QUALIFIERS or name in FUNDAMENTAL_TYPES:
+                raise _Unsupported
+        while self.at('['):
+            self.skip_to(']')
+        if self.peek()[0] == 'word' or self.at('(') or self.at('<'):
+            raise _Unsupported
+
+    def default_value(self) -> None:
+        self.index += 1  # the '='
+        elements = 0
+        while not (self.at(',') or self.at(')')):
+            kind, text, _, _ = self.peek()
+            if kind in ('word', 'ellipsis', 'string') or text in ('-', '.', '|', '&', '^'):
+                self.index += 1
+            elif text == '(':
+                self.skip_to(')')
+            elif text == '[':
+                self.skip_to(']')
+            elif text == '{':
+                self.skip_to('}')
+            elif text == '<':
+                self.skip_angle_brackets()
+            else:
+                raise _Unsupported
+            elements += 1
+        if not elements:
+            raise _Unsupported
+
+    def skip_angle_brackets(self) -> None:
+        depth = 0
+        while True:
+            kind, text, _, _ = self.take()
+            if kind == 'string':
+                raise _Unsupported
+            if text == '<':
+                depth += 1
+            elif text == '>':
+                depth -= 1
+                if not depth:
+                    return
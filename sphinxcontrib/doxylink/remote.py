@@ -0,0 +1,235 @@
+"""
+Fetching of tag files and pdf files from web servers.
+
+Tag files of large projects are big, so they are only downloaded when they changed since the
+last build. The validators sent by the server (``ETag`` and ``Last-Modified``) are kept with the
+cached symbol map and sent back with the next request, which the server answers with
+``304 Not Modified`` if the cached symbol map is still current.
+
+All the files a build needs are fetched at once at the start of the build, sharing the pooled
+connections of one :class:`requests.Session`.
+
+Pdf files can be hundreds of megabytes, so :func:`download_file` streams them to disk, resumes
+interrupted downloads and records what it downloaded in a small state file, so that a later
+build can tell a complete and current copy from a truncated or outdated one.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from typing import Any, Callable, Dict, Optional, Protocol
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+#: Seconds to wait for a server to accept a connection or to send more data
+DEFAULT_FETCH_TIMEOUT = 30
+#: Number of times a request is retried after a connection error or a temporary server error
+DEFAULT_FETCH_RETRIES = 3
+#: Number of files which are downloaded at the same time
+MAX_CONCURRENT_FETCHES = 8
+#: Number of bytes which are read from the network and written to disk at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def create_session(retries: int = DEFAULT_FETCH_RETRIES, pool_size: int = MAX_CONCURRENT_FETCHES) -> requests.Session:
+    """
+    Creates a session whose connections are reused by concurrent requests.
+
+    Requests which fail to connect, time out or get a temporary error status (429 and 5xx) are
+    retried up to ``retries`` times, waiting exponentially longer between the attempts.
+    """
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class Readable(Protocol):
+    """A binary stream, like the body of a response while it is downloaded, of which only ``read`` is used"""
+
+    def read(self, __size: int = ...) -> bytes: ...
+
+
+class RemoteFile(namedtuple('_RemoteFile', ['content', 'etag', 'last_modified'])):
+    '''
+    A file downloaded from a web server.
+
+    Args:
+        content: body of the response, with any ``gzip`` encoding undone, or what was read from it
+        etag (Optional[str]): value of the ``ETag`` header
+        last_modified (Optional[str]): value of the ``Last-Modified`` header
+    '''
+
+
+def fetch_remote_file(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                      session: Optional[requests.Session] = None, timeout: float = DEFAULT_FETCH_TIMEOUT,
+                      consume: Optional[Callable[[Readable], Any]] = None) -> Optional[RemoteFile]:
+    """
+    Downloads ``url`` with a single GET, unless it didn't change since it was last downloaded.
+
+    Args:
+        url: address of the file
+        etag: ``ETag`` of the copy which was last downloaded, if any
+        last_modified: ``Last-Modified`` of the copy which was last downloaded, if any
+        session: session to send the request with, so that connections are reused
+        timeout: seconds to wait for the server to accept the connection or to send more data
+        consume: reads the body from a stream while it is being downloaded, e.g. with an incremental
+            parser. What it returns becomes the content of the file instead of the body itself.
+
+    Returns:
+        the downloaded file, or ``None`` if the server reports that the file wasn't modified
+
+    Raises:
+        FileNotFoundError: if the server doesn't respond with the file
+        requests.RequestException: if the server can't be reached or the download is interrupted
+    """
+    headers = {'Accept-Encoding': 'gzip'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    with (session or requests).get(url, headers=headers, allow_redirects=True, stream=True, timeout=timeout) as response:
+        if response.status_code == 304 and (etag or last_modified):
+            return None
+        if response.status_code != 200:
+            raise FileNotFoundError(url)
+        remote_etag, remote_last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        # Some servers ignore conditional requests, but the validators still tell that the file is the same.
+        # An ETag decides over Last-Modified, which only has a resolution of seconds.
+        if etag and remote_etag:
+            unchanged = etag == remote_etag
+        else:
+            unchanged = bool(last_modified) and last_modified == remote_last_modified
+        if unchanged:
+            return None
+        if consume is None:
+            content = response.content
+        else:
+            response.raw.decode_content = True
+            # A body which ends early is an error rather than the end of the file, like with urllib3 2
+            response.raw.enforce_content_length = True
+            # Reading the stream directly bypasses requests, which would turn these into its own errors
+            try:
+                content = consume(response.raw)
+            except (ProtocolError, ReadTimeoutError) as error:
+                raise requests.ConnectionError(error, response=response) from error
+            except DecodeError as error:
+                raise requests.exceptions.ContentDecodingError(error, response=response) from error
+    return RemoteFile(content, remote_etag, remote_last_modified)
+
+
+def download_file(url: str, output_path: str, state_path: str, session: Optional[requests.Session] = None,
+                  timeout: float = DEFAULT_FETCH_TIMEOUT) -> bool:
+    """
+    Streams ``url`` to ``output_path``, unless the file there is a complete copy which is still current.
+
+    The file is downloaded to ``output_path + '.part'`` and only renamed to ``output_path`` once it is
+    complete. If a partial download is found, the rest of it is requested with a ``Range`` header. If
+    the server can't send the rest, the partial download is discarded and the whole file downloaded
+    again. What was downloaded (validators, size and checksum) is recorded in the JSON file at
+    ``state_path``.
+
+    Returns:
+        ``True`` if the file was downloaded, ``False`` if the existing copy was kept
+
+    Raises:
+        FileNotFoundError: if the server doesn't respond with the file
+        requests.RequestException: if the server can't be reached or the download is interrupted
+    """
+    state = _read_state(state_path)
+    headers = {'Accept-Encoding': 'identity'}  # byte ranges of encoded bodies can't be resumed
+    intact = _is_intact(output_path, state)
+    if intact:
+        if not (state.get('etag') or state.get('last_modified')):
+            return False  # nothing to ask the server with, so keep the file as before
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+    partial_path = output_path + '.part'
+    partial = state.get('partial') or {}
+    offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+    if offset and not intact and (partial.get('etag') or partial.get('last_modified')):
+        headers['Range'] = 'bytes=%d-' % offset
+        headers['If-Range'] = partial.get('etag') or partial['last_modified']
+
+    with (session or requests).get(url, headers=headers, allow_redirects=True, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return False
+        if 'Range' in headers and response.status_code != 200 and not _resumes_at(response, offset):
+            # E.g. 416 Range Not Satisfiable for a partial download which is complete, as a build
+            # stopped before renaming it
+            response.close()
+            os.remove(partial_path)
+            _write_state(state_path, {})
+            return download_file(url, output_path, state_path, session, timeout)
+        checksum = hashlib.sha256()
+        if response.status_code == 206 and 'Range' in headers:
+            with open(partial_path, 'rb') as partial_file:
+                for chunk in iter(lambda: partial_file.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    checksum.update(chunk)
+            mode = 'ab'
+        elif response.status_code == 200:
+            mode = 'wb'
+        else:
+            raise FileNotFoundError(url)
+
+        validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        _write_state(state_path, {'partial': validators})
+        with open(partial_path, mode) as output_file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                output_file.write(chunk)
+                checksum.update(chunk)
+
+    os.replace(partial_path, output_path)
+    stat = os.stat(output_path)
+    _write_state(state_path, dict(validators, size=stat.st_size, mtime=stat.st_mtime_ns, sha256=checksum.hexdigest()))
+    return True
+
+
+def _resumes_at(response: requests.Response, offset: int) -> bool:
+    """Checks that ``response`` is the rest of a file from ``offset`` on"""
+    match = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+    return response.status_code == 206 and match is not None and int(match.group(1)) == offset
+
+
+def _is_intact(path: str, state: Dict[str, Any]) -> bool:
+    """Checks that the file at ``path`` is the complete file described by ``state``"""
+    if 'sha256' not in state or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != state['size']:
+        return False
+    if stat.st_mtime_ns == state['mtime']:
+        return True
+    # The file was touched since it was downloaded, so check that its content is still the same
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest() == state['sha256']
+
+
+def _read_state(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(path: str, state: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as state_file:
+        json.dump(state, state_file)
+    os.replace(path + '.tmp', path)
@@ -0,0 +1,181 @@
+"""
+A cache of index files which is shared by all the Sphinx projects on a machine.
+
+Projects which link against the same tag files would otherwise each parse them and build the
+same symbol maps. With ``doxylink_shared_cache`` set, an index file is looked up in the shared
+directory by the digest of the content of its tag file, the version of doxylink and the revision
+of the format of the index file, and the first build which needs it builds it and adds it there.
+A project links (or copies) the shared file into its own index directory, so a project never
+depends on a file which the shared cache evicts.
+
+Builds running at the same time on the same machine coordinate through a lock file per index:
+the first one builds the index file while the others wait for it and then use it. Files are only
+ever added under a temporary name and then renamed, so a reader never sees a partial file even
+if the locks don't work, e.g. on some network file systems.
+
+Index files which weren't used for longer than a maximum age are evicted, and then the least
+recently used ones until the cache is smaller than its maximum size. Their lock files go with them.
+"""
+
+import contextlib
+import os
+import shutil
+import time
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+#: Default of the total size of the index files in the shared cache, in bytes
+DEFAULT_MAX_SIZE = 2 * 1024 ** 3
+#: Default of the number of days an index file is kept in the shared cache after it was last used
+DEFAULT_MAX_AGE = 30
+
+_EXTENSIONS = ('.index', '.sqlite')
+
+
+class SharedIndexCache:
+    """
+    A directory of index files shared between projects.
+
+    Args:
+        directory: the directory, which is created if it doesn't exist
+        max_size: bytes the index files may take up together before the least recently used are evicted
+        max_age: days after which an index file which wasn't used is evicted
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE, max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def get(self, key: str, extension: str, create: Callable[[str], None],
+            use: Callable[[str], Optional[bool]]) -> bool:
+        """
+        Calls ``use`` with the path of the index file for ``key`` if the cache has it, and otherwise
+        ``create`` with the path to write it to. Returns whether the index file was created.
+
+        Both are called while the index file is locked, so other processes asking for it wait until
+        it is written, and it isn't evicted while it is being used. ``use`` may return ``False`` if it
+        can't use the index file, which is then created again.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{key}.{extension}')
+        with _file_lock(os.path.join(self.directory, f'{key}.lock')):
+            if os.path.exists(path):
+                # The modification time is when the file was last used, which eviction goes by
+                os.utime(path)
+                if use(path) is not False:
+                    return False
+                os.remove(path)
+            temporary_path = f'{path}.{os.getpid()}.tmp'
+            try:
+                create(temporary_path)
+                os.replace(temporary_path, path)
+            finally:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """
+        Removes the index files which are too old, and then the least recently used ones until the cache is small
+        enough, each together with its lock file. Lock files left behind by builds which failed are removed too.
+        """
+        with _file_lock(os.path.join(self.directory, 'evict.lock'), blocking=False) as locked:
+            if not locked:
+                return  # another process is evicting
+            oldest = time.time() - self.max_age * 24 * 60 * 60
+            files, lock_files = self._files()
+            files.sort()
+            size = sum(file_size for _, file_size, _ in files)
+            for mtime, file_size, path in files:
+                if mtime >= oldest and size <= self.max_size:
+                    break
+                # A process which is using the file holds its lock
+                lock_path = os.path.splitext(path)[0] + '.lock'
+                with _file_lock(lock_path):
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+                        size -= file_size
+                    _remove_lock_file(lock_path)
+
+            keys = {os.path.splitext(path)[0] for _, _, path in files if os.path.exists(path)}
+            for lock_path in lock_files:
+                if os.path.splitext(lock_path)[0] not in keys:
+                    # An index file is being built unless the lock is free
+                    with _file_lock(lock_path, blocking=False) as unused:
+                        if unused:
+                            _remove_lock_file(lock_path)
+
+    def _files(self) -> Tuple[List[Tuple[float, int, str]], List[str]]:
+        """Returns the modification time, size and path of each index file, and the paths of the lock files"""
+        files = []
+        lock_files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_EXTENSIONS) and entry.is_file():
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith('.lock') and entry.name != 'evict.lock':
+                lock_files.append(entry.path)
+        return files, lock_files
+
+
+def link_or_copy(source: str, destination: str) -> None:
+    """Hard links ``source`` to ``destination``, or copies it if they are on different file systems"""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _remove_lock_file(path: str) -> None:
+    """Removes a lock file, which must be locked. Processes waiting for the lock notice and lock a new one."""
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Holds an exclusive lock on the file at ``path`` and yields whether it could be acquired"""
+    while True:
+        with open(path, 'a+b') as lock_file:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                else:
+                    lock_file.seek(0)
+                    while True:
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            if not blocking:
+                                raise
+                            time.sleep(0.1)
+            except OSError:
+                yield False
+                return
+            try:
+                # The lock is only held if the file wasn't removed by the process which held it before
+                if _is_same_file(lock_file, path):
+                    yield True
+                    return
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _is_same_file(file: IO[bytes], path: str) -> bool:
+    try:
+        return os.path.samestat(os.fstat(file.fileno()), os.stat(path))
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def roles_app():
+    """
+    Returns a function which creates an app for :func:`doxylink.create_role` and
+    :func:`doxylink.setup_doxylink_roles`, whose doctrees are in ``directory`` and which has roles
+    for ``tag_files`` by their names. The configuration is the default unless given as keywords.
+    """
+
+    def create(directory, tag_files=None, **config):
+        app = MagicMock()
+        app.env = SimpleNamespace()
+        app.doctreedir = str(directory)
+        app.builder.format = 'html'
+        app.config.doxylink = {name: (tag_file, 'https://example.com') for name, tag_file in (tag_files or {}).items()}
+        app.config.doxylink_pdf_files = {}
+        app.config.doxylink_parse_error_ignore_regexes = []
+        app.config.doxylink_parse_jobs = 1
+        app.config.doxylink_cache_invalidation = 'mtime'
+        app.config.doxylink_backends = {}
+        app.config.doxylink_warm_up = False
+        app.config.doxylink_build_jobs = 1
+        app.config.doxylink_shared_cache = ''
+        app.config.doxylink_write_time_urls = False
+        app.config.doxylink_normalise_cache_size = 16
+        app.config.doxylink_fetch_timeout = 5
+        app.config.doxylink_fetch_retries = 0
+        for key, value in config.items():
+            setattr(app.config, key, value)
+        return app
+
+    return create
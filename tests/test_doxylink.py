@@ -2,14 +2,19 @@ import datetime
 import glob
 import os
 import os.path
+import pickle
+import re
 import subprocess
 import xml.etree.ElementTree as ET
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
 from testfixtures import LogCapture
 
-from sphinxcontrib.doxylink import doxylink
+from sphinxcontrib.doxylink import __version__, doxylink
+from sphinxcontrib.doxylink.compiled import CompiledSymbolMap, IndexFormatError, write_compiled_index
+from sphinxcontrib.doxylink.database import SqliteSymbolMap, write_database
 
 
 @pytest.fixture
@@ -47,7 +52,15 @@ def examples_tag_file():
     return tagfile
 
 
-@pytest.mark.parametrize('symbol, file', [
+@pytest.fixture(autouse=True)
+def forget_built_indexes():
+    """Each test builds like a new process, which hasn't built any symbol maps yet"""
+    doxylink._built_indexes.clear()
+    yield
+    doxylink._built_indexes.clear()
+
+
+FILE_HTML_CASES = [
     ('my_func', 'my__lib_8h.html'),
     ('my_func()', 'my__lib_8h.html'),
     ('my_namespace::my_func', 'namespacemy__namespace.html'),
@@ -58,7 +71,10 @@ def examples_tag_file():
     ('my_lib.h::MY_MACRO', 'my__lib_8h.html'),
     ('my_namespace::MyClass::my_method', 'classmy__namespace_1_1MyClass.html'),
     ('ClassesGroup', 'group__ClassesGroup.html'),
-])
+]
+
+
+@pytest.mark.parametrize('symbol, file', FILE_HTML_CASES)
 def test_file_html(examples_tag_file, symbol, file):
     tag_file = ET.parse(examples_tag_file)
     mapping = doxylink.SymbolMap(tag_file)
@@ -66,9 +82,12 @@ def test_file_html(examples_tag_file, symbol, file):
     assert mapping[symbol].file.startswith(file)
 
 
-@pytest.mark.parametrize('symbol1, symbol2', [
+FILE_EQUIVALENT_CASES = [
     ('my_func', 'my_lib.h::my_func'),
-])
+]
+
+
+@pytest.mark.parametrize('symbol1, symbol2', FILE_EQUIVALENT_CASES)
 def test_file_equivalent(examples_tag_file, symbol1, symbol2):
     tag_file = ET.parse(examples_tag_file)
     mapping = doxylink.SymbolMap(tag_file)
@@ -76,11 +95,14 @@ def test_file_equivalent(examples_tag_file, symbol1, symbol2):
     assert mapping[symbol1].file == mapping[symbol2].file
 
 
-@pytest.mark.parametrize('symbol1, symbol2', [
+FILE_DIFFERENT_CASES = [
     ('my_func', 'my_namespace::my_func'),
     ('my_func()', 'my_func(int)'),
     ('my_func(float)', 'my_func(int)'),
-])
+]
+
+
+@pytest.mark.parametrize('symbol1, symbol2', FILE_DIFFERENT_CASES)
 def test_file_different(examples_tag_file, symbol1, symbol2):
     tag_file = ET.parse(examples_tag_file)
     mapping = doxylink.SymbolMap(tag_file)
@@ -107,7 +129,20 @@ def test_parse_tag_file(examples_tag_file):
     assert has_entry('ClassesGroup')
 
 
-@pytest.mark.parametrize('symbol, expected_matches', [
+def test_iter_tag_file(examples_tag_file):
+    streamed = list(doxylink.iter_tag_file(examples_tag_file))
+
+    assert streamed == doxylink.parse_tag_file(ET.parse(examples_tag_file), None)
+
+
+def test_symbol_map_from_entries(examples_tag_file):
+    mapping = doxylink.SymbolMap(doxylink.iter_tag_file(examples_tag_file))
+
+    assert mapping['my_namespace::MyClass'].file.startswith('classmy__namespace_1_1MyClass.html')
+    assert mapping['my_func(int)'].file != mapping['my_func(float)'].file
+
+
+FIND_URL_PIECEWISE_CASES = [
     ('my_namespace', {'my_namespace'}),
     ('my_namespace::MyClass', {'my_namespace::MyClass'}),
     ('MyClass', {'my_namespace::MyClass', 'my_namespace::MyClass::MyClass', 'MyClass', 'MyClass::MyClass'}),
@@ -118,7 +153,10 @@ def test_parse_tag_file(examples_tag_file):
     ('ClassesGroup', {'ClassesGroup'}),
     ('lassesGroup', set()),
     ('yClass::my_method', set()),
-])
+]
+
+
+@pytest.mark.parametrize('symbol, expected_matches', FIND_URL_PIECEWISE_CASES)
 def test_find_url_piecewise(examples_tag_file, symbol, expected_matches):
     tag_file = ET.parse(examples_tag_file)
     mapping = doxylink.SymbolMap(tag_file)
@@ -130,6 +168,108 @@ def test_find_url_piecewise(examples_tag_file, symbol, expected_matches):
     assert set(matches).issubset(set(mapping._entries))
 
 
+SUFFIX_ENTRIES = [
+    doxylink.Entry('ns', 'namespace', 'namespacens.html', None),
+    doxylink.Entry('ns::foo', 'class', 'classns_1_1foo.html', None),
+    doxylink.Entry('ns::foo::bar', 'function', 'classns_1_1foo.html#a1', '()'),
+    doxylink.Entry('ns::foo::bar', 'function', 'classns_1_1foo.html#a2', '(int)'),
+    doxylink.Entry('other::foo::bar', 'function', 'classother_1_1foo.html#a1', '()'),
+    doxylink.Entry('ns::do_bar', 'function', 'namespacens.html#a1', '()'),
+    doxylink.Entry('ns::Array< 1, T >::operator[]', 'function', 'classns_1_1Array.html#a1', '(int)'),
+    doxylink.Entry('ns::Array::operator[]', 'function', 'classns_1_1Array.html#a2', '(int)'),
+    doxylink.Entry('ns::Array::operator()', 'function', 'classns_1_1Array.html#a3', '()'),
+    doxylink.Entry('my_lib.h', 'file', 'my__lib_8h.html', None),
+    doxylink.Entry('my_lib.h::my_func', 'function', 'my__lib_8h.html#a1', '()'),
+    doxylink.Entry('ns::Größe', 'variable', 'namespacens.html#a2', None),
+    doxylink.Entry('ns::Große', 'variable', 'namespacens.html#a3', None),
+]
+
+
+@pytest.mark.parametrize('sub_bucket_threshold', [doxylink.SUB_BUCKET_THRESHOLD, 0])
+@pytest.mark.parametrize('symbol', sorted({entry.name[start:] for entry in SUFFIX_ENTRIES
+                                           for start in range(len(entry.name))} | {'', 'baz', 'ß'}))
+def test_find_entries_matches_linear_scan(symbol, sub_bucket_threshold, monkeypatch):
+    monkeypatch.setattr(doxylink, 'SUB_BUCKET_THRESHOLD', sub_bucket_threshold)
+    mapping = doxylink.SymbolMap(SUFFIX_ENTRIES)
+
+    # The reference implementation: scan every entry in reverse name order
+    expected = [entry for entry in sorted(SUFFIX_ENTRIES) if entry.matches(symbol, None, None)]
+    assert mapping._find_entries(symbol, None, None) == expected
+
+
+@pytest.mark.parametrize('symbol', sorted({entry.name[start:] for entry in SUFFIX_ENTRIES
+                                           for start in range(len(entry.name))
+                                           if '(' not in entry.name[start:]}))
+def test_resolved_symbols_match_disambiguation(symbol):
+    mapping = doxylink.SymbolMap(SUFFIX_ENTRIES)
+
+    try:
+        expected = mapping._disambiguate(symbol, mapping._find_entries(symbol, None, None))
+    except LookupError as error:
+        with pytest.raises(LookupError, match=re.escape(str(error))):
+            mapping[symbol]
+    else:
+        assert mapping[symbol] is expected
+
+
+def test_resolved_symbols(examples_tag_file):
+    mapping = doxylink.SymbolMap(doxylink.iter_tag_file(examples_tag_file))
+
+    # A class and its constructor
+    assert mapping._resolved['MyClass'].name == 'MyClass'
+    # Overloads
+    assert mapping._resolved['my_lib.h::my_func'].name == 'my_lib.h::my_func'
+    # Unambiguous names don't need to be resolved up front
+    assert 'my_namespace::MyClass' not in mapping._resolved
+
+
+def test_resolved_symbols_without_match():
+    mapping = doxylink.SymbolMap([
+        doxylink.Entry('Array< 1 >::get', 'function', 'classArray.html#a1', '()'),
+        doxylink.Entry('Array< 2 >::get', 'function', 'classArray.html#a2', '()'),
+    ])
+
+    assert mapping._resolved['get'] is None
+    with pytest.raises(LookupError, match='Could not find a match'):
+        mapping['get']
+
+def test_overload_index(examples_tag_file):
+    mapping = doxylink.SymbolMap(doxylink.iter_tag_file(examples_tag_file))
+
+    functions = [entry for entry in mapping._entries if entry.kind == 'function' and entry.arglist]
+    assert functions
+    for entry in functions:
+        expected = mapping._disambiguate(entry.name, mapping._find_entries(entry.name, 'function', entry.arglist))
+        assert mapping._overloads[(entry.name, entry.arglist)] is expected
+        assert mapping[entry.name + entry.arglist] is expected
+
+    # Not fully qualified, so not in the index
+    assert ('my_func', '(int)') not in mapping._overloads
+    assert mapping['my_func(int)'] is mapping['my_lib.h::my_func(int)']
+
+@pytest.mark.parametrize('name, expected', [
+    ('bar', 'bar'),
+    ('ns::foo::bar', 'bar'),
+    ('my_lib.h', 'h'),
+    ('ns::Array::operator[]', ']'),
+    ('ns::Größe', 'Größe'),
+    ('', ''),
+])
+def test_last_component(name, expected):
+    assert doxylink.last_component(name) == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('bar', ''),
+    ('ns::foo::bar', 'foo'),
+    (':bar', ''),
+    ('my_lib.h', 'my_lib'),
+    ('ns::Array< 1, T >::operator[]', 'operator'),
+    ('ns::Größe::bar', 'Größe'),
+])
+def test_previous_word(name, expected):
+    assert doxylink.previous_word(name) == expected
+
 @pytest.mark.parametrize('str_to_validate, expected', [
     ('http://example.com', True),
     ('https://example.com/sub', True),
@@ -254,3 +394,698 @@ def test_parse_error_ignore_regexes():
     finally:
         if os.path.exists(test_tag_file):
             os.unlink(test_tag_file)
+
+
+def test_parallel_parse_matches_serial(examples_tag_file, monkeypatch):
+    # Use tiny shards so that every worker gets some compounds
+    monkeypatch.setattr(doxylink, 'PARSE_SHARD_SIZE', 3)
+    with LogCapture() as serial_log:
+        serial = list(doxylink.iter_tag_file(examples_tag_file))
+    with LogCapture() as parallel_log:
+        parallel = list(doxylink.iter_tag_file(examples_tag_file, jobs=2))
+
+    assert parallel == serial
+    assert serial_log.records
+    assert [r.getMessage() for r in parallel_log.records] == [r.getMessage() for r in serial_log.records]
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1, 1),
+    ('3', 3),
+    (0, 1),
+    (None, 1),
+])
+def test_resolve_jobs(value, expected):
+    assert doxylink.resolve_jobs(value) == expected
+
+
+def test_link_cache():
+    mapping = doxylink.SymbolMap(SUFFIX_ENTRIES)
+    link_cache = doxylink.LinkCache()
+    target = SUFFIX_ENTRIES[0].name
+
+    assert link_cache.lookup(mapping, target) == mapping[target]
+    assert link_cache.lookup(mapping, target) == mapping[target]
+    assert (link_cache.hits, link_cache.misses) == (1, 1)
+
+    # Failed lookups are cached too and raise the same error every time
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            link_cache.lookup(mapping, 'does_not_exist')
+    assert (link_cache.hits, link_cache.misses) == (2, 2)
+    assert link_cache.failures == 1
+    assert link_cache.hit_rate == 0.5
+
+
+def test_entry_shares_files_and_joins_anchors_lazily():
+    first = doxylink.Entry('ns::foo::a', 'function', 'classns_1_1foo.html', '()', 'a1')
+    second = doxylink.Entry('ns::foo::b', ''.join(['func', 'tion']), ''.join(['classns_1_1foo', '.html']), '()', 'a2')
+
+    assert first.file == 'classns_1_1foo.html#a1'
+    assert first.kind is second.kind
+    assert first.anchorfile is second.anchorfile
+
+    # An anchor passed as part of the file is split off so that both spellings are equal
+    assert doxylink.Entry('ns::foo::a', 'function', 'classns_1_1foo.html#a1', '()') == first
+    assert doxylink.Entry('ns', 'namespace', 'namespacens.html').file == 'namespacens.html'
+
+    name, kind, file, arglist = first
+    assert (name, kind, file, arglist) == ('ns::foo::a', 'function', 'classns_1_1foo.html#a1', '()')
+    assert pickle.loads(pickle.dumps(first)) == first
+
+
+def test_symbol_map_is_built_on_first_use(examples_tag_file, roles_app, tmp_path):
+    app = roles_app(tmp_path)
+
+    role = doxylink.create_role(app, examples_tag_file, 'https://example.com', 'my_lib')
+    assert app.env.doxylink_cache['my_lib']['index'] is None
+
+    mapping = role.load_mapping()
+    assert mapping['my_lib.h::my_func'].name == 'my_lib.h::my_func'
+    assert role.load_mapping() is mapping
+
+    # Only a handle to the index file is kept in the environment
+    handle = app.env.doxylink_cache['my_lib']['index']
+    assert isinstance(handle, doxylink.IndexHandle)
+    assert os.path.exists(os.path.join(doxylink.index_directory(app), handle.path))
+
+    # A parallel reader which built the map hands its handle to the main process
+    main_env = SimpleNamespace(doxylink_cache={'my_lib': dict(app.env.doxylink_cache['my_lib'], index=None)})
+    doxylink.merge_doxylink_cache(app, main_env, [], app.env)
+    assert main_env.doxylink_cache['my_lib']['index'] == handle
+
+
+def test_index_files(examples_tag_file, tmp_path):
+    mapping = doxylink.SymbolMap.from_compounds(doxylink.iter_tag_file_compounds(examples_tag_file))
+    handle = doxylink.save_index(mapping, str(tmp_path), 'my_lib', doxylink.file_digest(examples_tag_file))
+    assert doxylink.load_index(str(tmp_path), handle) is mapping
+
+    # Another process maps the file
+    doxylink._loaded_indexes.clear()
+    loaded = doxylink.load_index(str(tmp_path), handle)
+    assert loaded is not mapping
+    assert loaded.source_digest == doxylink.file_digest(examples_tag_file)
+    assert loaded['my_func(int)'] == mapping['my_func(int)']
+
+    assert doxylink.load_index(str(tmp_path), handle._replace(version='0.0.0')) is None
+    assert doxylink.load_index(str(tmp_path), handle._replace(path='missing.index')) is None
+
+    # Saving an updated map removes the index file it replaces
+    newer = doxylink.save_index(doxylink.SymbolMap([]), str(tmp_path), 'my_lib', '', replaces=handle)
+    assert os.listdir(str(tmp_path)) == [newer.path]
+
+
+def test_digest_cache_invalidation(examples_tag_file, roles_app, tmp_path):
+    tag_file = tmp_path / 'my_lib.tag'
+    tag_file.write_bytes(open(examples_tag_file, 'rb').read())
+    app = roles_app(tmp_path / 'doctrees', doxylink_cache_invalidation='digest')
+
+    mapping = doxylink.create_role(app, str(tag_file), 'https://example.com', 'my_lib').load_mapping()
+
+    # A tag file which is written again with the same content keeps the symbol map
+    os.utime(tag_file, (2e9, 2e9))
+    with LogCapture() as log:
+        role = doxylink.create_role(app, str(tag_file), 'https://example.com', 'my_lib')
+    assert role.load_mapping() is mapping
+    assert 'Sub-cache is up-to-date (decided by content digest)' in [r.getMessage() for r in log.records]
+    assert app.env.doxylink_cache['my_lib']['mtime'] == 2e9
+
+    tag_file.write_bytes(tag_file.read_bytes().replace(b'my_func', b'my_function'))
+    role = doxylink.create_role(app, str(tag_file), 'https://example.com', 'my_lib')
+    assert role.load_mapping()['my_function'].name == 'my_lib.h::my_function'
+
+
+def test_incremental_update_matches_full_build(examples_tag_file, tmp_path):
+    mapping = doxylink.SymbolMap.from_compounds(doxylink.iter_tag_file_compounds(examples_tag_file))
+
+    changed = tmp_path / 'my_lib.tag'
+    changed.write_bytes(open(examples_tag_file, 'rb').read()
+                        .replace(b'<name>my_func</name>', b'<name>my_other_func</name>')
+                        .replace(b'<name>MyClass</name>', b'<name>MyRenamedClass</name>'))
+    known = mapping.known_compounds()
+    compounds = list(doxylink.iter_tag_file_compounds(str(changed), known=known))
+    reused = sum(1 for fingerprint, entries in compounds if fingerprint in known)
+    assert 0 < reused < len(compounds)
+
+    assert mapping.update(compounds)
+    fresh = doxylink.SymbolMap(doxylink.iter_tag_file(str(changed)))
+    assert mapping._entries == fresh._entries
+    assert mapping._buckets == fresh._buckets
+    assert mapping._sub_buckets == fresh._sub_buckets
+    assert mapping._overloads == fresh._overloads
+    assert mapping._resolved == fresh._resolved
+
+
+def test_compounds_of_tag_files_in_another_layout_are_parsed_as_xml(examples_tag_file, tmp_path):
+    content = open(examples_tag_file, 'rb').read()
+    expected = list(doxylink.iter_tag_file(examples_tag_file))
+    assert [entry for _, entries in doxylink.iter_tag_file_compounds(examples_tag_file)
+            for entry in entries] == expected
+
+    # Well-formed, but with something other than compounds in the tag file
+    commented = tmp_path / 'commented.tag'
+    commented.write_bytes(content.replace(b'</compound>', b'</compound><!-- note -->', 1))
+    assert [entry for _, entries in doxylink.iter_tag_file_compounds(str(commented))
+            for entry in entries] == expected
+
+    # A truncated download or an error page must not turn into a partial symbol map
+    truncated = tmp_path / 'truncated.tag'
+    truncated.write_bytes(content[:content.rindex(b'</compound>') + len(b'</compound>')])
+    error_page = tmp_path / 'error.tag'
+    error_page.write_bytes(b'<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head><body>Not Found</body></html>')
+    html = tmp_path / 'page.tag'
+    html.write_bytes(b'<html><body><compound>Not Found</compound></body></html>')
+    for path in (truncated, error_page, html):
+        with pytest.raises(ET.ParseError):
+            list(doxylink.iter_tag_file_compounds(str(path)))
+
+    empty = tmp_path / 'empty.tag'
+    empty.write_bytes(b"<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>\n<tagfile />\n")
+    assert list(doxylink.iter_tag_file_compounds(str(empty))) == []
+
+
+def test_incremental_update_keeps_order_of_equal_names():
+    first = (b'1', [doxylink.Entry('util.h::f', 'function', 'a.html#1', '()')])
+    second = (b'2', [doxylink.Entry('util.h::f', 'function', 'b.html#1', '()')])
+    mapping = doxylink.SymbolMap.from_compounds([second])
+
+    # The new entry has the same name as one from another compound and has to come first
+    assert not mapping.update([first, second])
+    assert mapping['util.h::f()'].file == 'a.html#1'
+
+
+def compile_index(mapping, tmp_path):
+    path = str(tmp_path / 'symbols.index')
+    with open(path, 'wb') as index_file:
+        write_compiled_index(mapping, index_file, __version__, 'digest')
+    return CompiledSymbolMap(path)
+
+
+SYMBOLS = sorted({entry.name[start:] for entry in SUFFIX_ENTRIES for start in range(len(entry.name))}
+                 | {'', 'baz', 'ß', 'ns::foo::bar(int)', 'bar()', 'ns::Array::operator[](int)'})
+
+
+@pytest.mark.parametrize('sub_bucket_threshold', [doxylink.SUB_BUCKET_THRESHOLD, 0])
+def test_compiled_index_answers_like_symbol_map(sub_bucket_threshold, tmp_path, monkeypatch):
+    monkeypatch.setattr(doxylink, 'SUB_BUCKET_THRESHOLD', sub_bucket_threshold)
+    mapping = doxylink.SymbolMap(SUFFIX_ENTRIES)
+    compiled = compile_index(mapping, tmp_path)
+
+    assert (compiled.version, compiled.source_digest) == (__version__, 'digest')
+    for symbol in SYMBOLS:
+        assert compiled._find_entries(symbol, None, None) == mapping._find_entries(symbol, None, None)
+        try:
+            expected = mapping[symbol]
+        except LookupError as error:
+            with pytest.raises(LookupError, match=re.escape(str(error))):
+                compiled[symbol]
+        else:
+            assert compiled[symbol] == expected
+
+
+def test_compiled_index_only_creates_the_entries_it_looks_at(examples_tag_file, tmp_path):
+    mapping = doxylink.SymbolMap.from_compounds(doxylink.iter_tag_file_compounds(examples_tag_file))
+    compiled = compile_index(mapping, tmp_path)
+
+    assert compiled['my_namespace::MyClass'] == mapping['my_namespace::MyClass']
+    assert 0 < len(compiled._materialised) < len(compiled)
+    # The same entry is returned by later lookups
+    assert compiled['my_namespace::MyClass'] is compiled['my_namespace::MyClass']
+
+    # Other processes map the same file
+    assert pickle.loads(pickle.dumps(compiled)).path == compiled.path
+
+
+def test_compiled_index_reads_back_into_symbol_map(examples_tag_file, tmp_path):
+    mapping = doxylink.SymbolMap.from_compounds(doxylink.iter_tag_file_compounds(examples_tag_file))
+    restored = compile_index(mapping, tmp_path).to_symbol_map()
+
+    assert restored._entries == mapping._entries
+    assert restored._buckets == mapping._buckets
+    assert restored._sub_buckets == mapping._sub_buckets
+    assert restored._overloads == mapping._overloads
+    assert restored._resolved == mapping._resolved
+    assert restored._compounds == mapping._compounds
+    # Entries are shared between the tables like in the original, so it can be updated in place
+    assert restored.update(restored._compounds[1:] + restored._compounds[:1]) is False
+    assert restored['my_func(int)'] == mapping['my_func(int)']
+
+
+@pytest.mark.parametrize('content', [b'', b'DXLINDEX', b'not an index at all, but long enough to have a header'])
+def test_compiled_index_rejects_other_files(content, tmp_path):
+    path = tmp_path / 'symbols.index'
+    path.write_bytes(content)
+    with pytest.raises(IndexFormatError):
+        CompiledSymbolMap(str(path))
+
+
+def sqlite_map(entries, tmp_path):
+    path = str(tmp_path / 'symbols.sqlite')
+    write_database(path, entries, __version__, 'digest')
+    return SqliteSymbolMap(path)
+
+
+@pytest.fixture
+def examples_sqlite_map(examples_tag_file, tmp_path):
+    return sqlite_map(doxylink.iter_tag_file(examples_tag_file), tmp_path)
+
+
+def test_sqlite_backend_lookups(examples_sqlite_map):
+    for symbol, file in FILE_HTML_CASES:
+        assert examples_sqlite_map[symbol].file.startswith(file)
+    for symbol1, symbol2 in FILE_EQUIVALENT_CASES:
+        assert examples_sqlite_map[symbol1].file == examples_sqlite_map[symbol2].file
+    for symbol1, symbol2 in FILE_DIFFERENT_CASES:
+        assert examples_sqlite_map[symbol1].file != examples_sqlite_map[symbol2].file
+    for symbol, expected_matches in FIND_URL_PIECEWISE_CASES:
+        assert {entry.name for entry in examples_sqlite_map._find_entries(symbol, None, None)} == expected_matches
+
+
+def test_sqlite_backend_answers_like_symbol_map(examples_tag_file, tmp_path):
+    entries = list(doxylink.iter_tag_file(examples_tag_file))
+    mapping = doxylink.SymbolMap(entries)
+    database = sqlite_map(entries, tmp_path)
+
+    assert database._entries == mapping._entries
+    for symbol, resolved in mapping._resolved.items():
+        assert symbol in database._resolved
+        assert database._resolved[symbol] == resolved
+    for entry in mapping._entries:
+        if entry.kind == 'function' and entry.arglist:
+            assert database[entry.name + entry.arglist] == mapping[entry.name + entry.arglist]
+
+
+@pytest.mark.parametrize('sub_bucket_threshold', [doxylink.SUB_BUCKET_THRESHOLD, 0])
+def test_sqlite_backend_matches_suffix_lookups(sub_bucket_threshold, tmp_path, monkeypatch):
+    monkeypatch.setattr(doxylink, 'SUB_BUCKET_THRESHOLD', sub_bucket_threshold)
+    mapping = doxylink.SymbolMap(SUFFIX_ENTRIES)
+    database = sqlite_map(SUFFIX_ENTRIES, tmp_path)
+
+    for symbol in SYMBOLS:
+        assert database._find_entries(symbol, None, None) == mapping._find_entries(symbol, None, None)
+        try:
+            expected = mapping[symbol]
+        except LookupError as error:
+            with pytest.raises(LookupError, match=re.escape(str(error))):
+                database[symbol]
+        else:
+            assert database[symbol] == expected
+
+
+def test_sqlite_backend_is_selected_per_tag_file(examples_tag_file, roles_app, tmp_path):
+    app = roles_app(tmp_path, doxylink_backends={'my_lib': 'sqlite'})
+
+    mapping = doxylink.create_role(app, examples_tag_file, 'https://example.com', 'my_lib').load_mapping()
+    assert isinstance(mapping, SqliteSymbolMap)
+    assert app.env.doxylink_cache['my_lib']['index'].path.endswith('.sqlite')
+    assert mapping['my_namespace::MyClass'].file.startswith('classmy__namespace_1_1MyClass.html')
+
+    # Switching back to the default backend builds the symbol map again
+    app.config.doxylink_backends = {}
+    with LogCapture() as log:
+        role = doxylink.create_role(app, examples_tag_file, 'https://example.com', 'my_lib')
+    assert any('another backend' in record.getMessage() for record in log.records)
+    assert not isinstance(role.load_mapping(), SqliteSymbolMap)
+    assert os.listdir(doxylink.index_directory(app)) == [app.env.doxylink_cache['my_lib']['index'].path]
+
+
+def test_warm_up_builds_symbol_maps_in_background(examples_tag_file, roles_app, tmp_path):
+    app = roles_app(tmp_path, {'my_lib': examples_tag_file}, doxylink_warm_up=True)
+
+    with LogCapture() as log:
+        doxylink.setup_doxylink_roles(app)
+        app.doxylink_warm_up._thread.join()
+        # What the thread reported is held back until the main thread reports it
+        assert not any('Building symbol map for my_lib' in record.getMessage() for record in log.records)
+        doxylink.finish_warm_up(app, app.env)
+    messages = [record.getMessage() for record in log.records]
+    assert any('Building symbol map for my_lib' in message for message in messages)
+    assert any(message.startswith('Skipping function my_lib.h::DEFINE_bool') for message in messages)
+
+    # The role finds the symbol map built
+    role = app.add_role.call_args.args[1]
+    with LogCapture() as log:
+        assert role.load_mapping()['my_namespace::MyClass'].name == 'my_namespace::MyClass'
+    assert not log.records
+
+
+def test_symbol_maps_are_built_in_pool(examples_tag_file, roles_app, tmp_path):
+    tag_files = {'my_lib': examples_tag_file, 'my_sqlite_lib': examples_tag_file, 'other_lib': examples_tag_file}
+    app = roles_app(tmp_path, tag_files, doxylink_build_jobs=2, doxylink_backends={'my_sqlite_lib': 'sqlite'})
+
+    with LogCapture() as log:
+        doxylink.setup_doxylink_roles(app)
+    # Reported in the order of the configuration, each with the parse errors of its tag file
+    messages = [record.getMessage() for record in log.records]
+    building = [next(index for index, message in enumerate(messages) if f'Building symbol map for {name}' in message)
+                for name in tag_files]
+    assert building == sorted(building)
+    for start, end in zip(building, building[1:] + [len(messages)]):
+        assert any(message.startswith('Skipping function my_lib.h::DEFINE_bool') for message in messages[start:end])
+
+    # The roles use the index files the workers saved
+    for name in tag_files:
+        assert app.env.doxylink_cache[name]['index'] is not None
+        role = app.add_role.call_args_list[list(tag_files).index(name)].args[1]
+        with LogCapture() as log:
+            assert role.load_mapping()['my_namespace::MyClass'].name == 'my_namespace::MyClass'
+        assert not log.records
+    assert isinstance(doxylink.load_index(doxylink.index_directory(app), app.env.doxylink_cache['my_lib']['index']),
+                      CompiledSymbolMap)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_shared_cache_is_used_by_other_projects(backend, examples_tag_file, roles_app, tmp_path):
+    shared_directory = str(tmp_path / 'shared')
+    projects = []
+    for project in ['first', 'second']:
+        doxylink._built_indexes.clear()  # as if the projects were built by separate processes
+        app = roles_app(tmp_path / project, {'my_lib': examples_tag_file}, doxylink_shared_cache=shared_directory,
+                        doxylink_shared_cache_max_size=2 ** 30, doxylink_shared_cache_max_age=30,
+                        doxylink_backends={'my_lib': backend})
+        with LogCapture() as log:
+            mapping = doxylink.create_role(app, examples_tag_file, 'https://example.com', 'my_lib').load_mapping()
+        assert mapping['my_namespace::MyClass'].name == 'my_namespace::MyClass'
+        projects.append((app, [record.getMessage() for record in log.records]))
+
+    (first, first_messages), (second, second_messages) = projects
+    assert any('Building symbol map for my_lib' in message for message in first_messages)
+    assert not any('Building symbol map' in message for message in second_messages)
+    assert 'Using the symbol map for my_lib from the shared cache' in second_messages
+    # Each project has its own index file, which outlives the shared one
+    assert first.env.doxylink_cache['my_lib']['index'] == second.env.doxylink_cache['my_lib']['index']
+    for app in (first, second):
+        assert os.path.exists(os.path.join(doxylink.index_directory(app), app.env.doxylink_cache['my_lib']['index'].path))
+
+
+def test_unusable_index_file_in_shared_cache_is_built_again(examples_tag_file, roles_app, tmp_path):
+    from sphinxcontrib.doxylink.compiled import FORMAT_REVISION
+
+    shared_directory = tmp_path / 'shared'
+    shared_directory.mkdir()
+    # E.g. written by a development version which has the same version number
+    key = f'{doxylink.file_digest(examples_tag_file)}-{__version__}-{doxylink.CACHE_SCHEMA}-{FORMAT_REVISION}'
+    (shared_directory / f'{key}.index').write_bytes(b'DXLINDEX in another format')
+
+    app = roles_app(tmp_path / 'project', {'my_lib': examples_tag_file}, doxylink_shared_cache=str(shared_directory),
+                    doxylink_shared_cache_max_size=2 ** 30, doxylink_shared_cache_max_age=30)
+    with LogCapture() as log:
+        mapping = doxylink.create_role(app, examples_tag_file, 'https://example.com', 'my_lib').load_mapping()
+    messages = [record.getMessage() for record in log.records]
+    assert "The symbol map for my_lib in the shared cache can't be used, building it again" in messages
+    assert any('Building symbol map for my_lib' in message for message in messages)
+    assert mapping['my_namespace::MyClass'].name == 'my_namespace::MyClass'
+    assert isinstance(CompiledSymbolMap(str(shared_directory / f'{key}.index')), CompiledSymbolMap)
+    assert os.listdir(doxylink.index_directory(app)) == [app.env.doxylink_cache['my_lib']['index'].path]
+
+
+def test_symbol_maps_are_reused_by_later_builds_in_process(examples_tag_file, roles_app, tmp_path):
+    tag_file = str(tmp_path / 'my_lib.tag')
+    with open(examples_tag_file, 'rb') as source, open(tag_file, 'wb') as copy:
+        copy.write(source.read())
+
+    def build(project, messages):
+        app = roles_app(tmp_path / project, {'my_lib': tag_file}, doxylink_cache_invalidation='digest')
+        with LogCapture() as log:
+            mapping = doxylink.create_role(app, tag_file, 'https://example.com', 'my_lib').load_mapping()
+        messages.extend(record.getMessage() for record in log.records)
+        return app, mapping
+
+    first_messages, second_messages, third_messages = [], [], []
+    first, first_mapping = build('first', first_messages)
+    assert any('Building symbol map for my_lib' in message for message in first_messages)
+
+    # A build with a fresh environment gets the same symbol map back
+    second, second_mapping = build('second', second_messages)
+    assert 'Reusing the symbol map for my_lib built earlier in this process' in second_messages
+    assert not any('Building symbol map' in message for message in second_messages)
+    assert second_mapping is first_mapping
+    assert os.path.exists(os.path.join(doxylink.index_directory(second), second.env.doxylink_cache['my_lib']['index'].path))
+
+    # Changing the tag file releases the symbol map built from it
+    with open(tag_file, 'ab') as copy:
+        copy.write(b'\n')
+    third, third_mapping = build('third', third_messages)
+    assert any('Building symbol map for my_lib' in message for message in third_messages)
+    assert third_mapping is not first_mapping
+    assert first_mapping not in doxylink._loaded_indexes.values()
+
+
+def test_roles_whose_names_share_a_prefix_keep_their_own_index_files(examples_tag_file, roles_app, tmp_path):
+    app = roles_app(tmp_path, {'qt-core': examples_tag_file, 'qt': examples_tag_file})
+    with LogCapture():
+        for name in ['qt-core', 'qt']:
+            doxylink.create_role(app, examples_tag_file, 'https://example.com', name).load_mapping()
+    handles = {name: app.env.doxylink_cache[name]['index'] for name in ['qt-core', 'qt']}
+    assert handles['qt'].path.rsplit('-', 1)[0] == 'qt'
+    assert handles['qt-core'].path.rsplit('-', 1)[0] == 'qt-core'
+    for handle in handles.values():
+        assert os.path.exists(os.path.join(doxylink.index_directory(app), handle.path))
+
+
+def test_only_documents_with_changed_links_are_outdated(examples_tag_file, roles_app, tmp_path):
+    tag_file = str(tmp_path / 'my_lib.tag')
+    with open(examples_tag_file) as source:
+        content = source.read()
+    with open(tag_file, 'w') as copy:
+        copy.write(content)
+
+    def build(env):
+        app = roles_app(tmp_path / 'project', {'my_lib': tag_file}, doxylink_cache_invalidation='digest')
+        app.env = env
+        with LogCapture():
+            doxylink.setup_doxylink_roles(app)
+        return app, app.add_role.call_args.args[1]
+
+    env = SimpleNamespace(temp_data={})
+    app, role = build(env)
+    for docname, target in [('class', 'my_namespace::MyClass'), ('header', 'my_lib.h'), ('missing', 'NoSuchClass')]:
+        env.temp_data['docname'] = docname
+        with LogCapture():
+            role('my_lib', '', target, 1, MagicMock())
+    del env.temp_data['docname']
+    assert env.doxylink_links['class'] == {('my_lib', 'my_namespace::MyClass'): ('classmy__namespace_1_1MyClass.html', 'class')}
+    assert env.doxylink_links['missing'] == {('my_lib', 'NoSuchClass'): None}
+    # Nothing is outdated while the tag file is unchanged
+    assert doxylink.find_outdated_documents(build(env)[0], env, set(), set(), set()) == []
+
+    # Moving the class to another file only affects the document which links to it
+    doxylink._built_indexes.clear()
+    with open(tag_file, 'w') as copy:
+        copy.write(content.replace('classmy__namespace_1_1MyClass.html', 'classmy__namespace_1_1MyClass_moved.html'))
+    app, role = build(env)
+    with LogCapture() as log:
+        assert doxylink.find_outdated_documents(app, env, set(), set(), set()) == ['class']
+    assert 'doxylink: 1 documents have links which changed in my_lib' in [record.getMessage() for record in log.records]
+    assert doxylink.find_outdated_documents(app, env, set(), {'class'}, set()) == []
+
+    doxylink.purge_doxylink_links(app, env, 'class')
+    assert 'class' not in env.doxylink_links
+
+
+def test_tag_file_which_cant_be_read_on_first_use_leaves_links_unresolved(examples_tag_file, roles_app, tmp_path):
+    tag_file = tmp_path / 'my_lib.tag'
+    tag_file.write_text('<tagfile>\n  <compound kind="class">\n    <name>my_namespace::MyClass')
+    app = roles_app(tmp_path / 'project', {'my_lib': str(tag_file)})
+    app.env.temp_data = {'docname': 'class'}
+
+    with LogCapture() as log:
+        role = doxylink.create_role(app, str(tag_file), 'https://example.com', 'my_lib')
+        for _ in range(2):
+            (node,), _ = role('my_lib', '', 'my_namespace::MyClass', 1, MagicMock())
+            assert node.tagname == 'inline'
+        assert role.resolve('my_namespace::MyClass') is None
+    warnings = [record.getMessage() for record in log.records if record.levelname == 'WARNING']
+    assert len(warnings) == 1 and f'Could not read tag file {tag_file}' in warnings[0]
+    assert app.env.doxylink_links['class'] == {('my_lib', 'my_namespace::MyClass'): None}
+    assert app.env.doxylink_cache['my_lib']['missing']
+
+    # Once the tag file can be read, the link resolves
+    tag_file.write_bytes(open(examples_tag_file, 'rb').read())
+    with LogCapture():
+        role = doxylink.create_role(app, str(tag_file), 'https://example.com', 'my_lib')
+        assert role.resolve('my_namespace::MyClass') == ('classmy__namespace_1_1MyClass.html', 'class')
+    assert 'missing' not in app.env.doxylink_cache['my_lib']
+
+
+def test_documents_read_while_tag_file_was_missing_are_outdated(examples_tag_file, roles_app, tmp_path):
+    tag_file = str(tmp_path / 'my_lib.tag')
+    with open(examples_tag_file, 'rb') as source, open(tag_file, 'wb') as copy:
+        copy.write(source.read())
+
+    def build(env):
+        app = roles_app(tmp_path / 'project', {'my_lib': tag_file})
+        app.env = env
+        with LogCapture():
+            doxylink.setup_doxylink_roles(app)
+        return app, app.add_role.call_args.args[1]
+
+    def read(role, env):
+        env.temp_data['docname'] = 'class'
+        with LogCapture():
+            role('my_lib', '', 'my_namespace::MyClass', 1, MagicMock())
+        del env.temp_data['docname']
+
+    env = SimpleNamespace(temp_data={})
+    app, role = build(env)
+    read(role, env)
+
+    # The document is read while the tag file is missing, so its link doesn't resolve
+    os.rename(tag_file, tag_file + '.away')
+    app, role = build(env)
+    read(role, env)
+    assert env.doxylink_links['class'] == {('my_lib', 'my_namespace::MyClass'): None}
+
+    # The tag file comes back unchanged, and the link resolves again
+    os.rename(tag_file + '.away', tag_file)
+    app, role = build(env)
+    assert doxylink.find_outdated_documents(app, env, set(), set(), set()) == ['class']
+    read(role, env)
+    app, role = build(env)
+    assert doxylink.find_outdated_documents(app, env, set(), set(), set()) == []
+
+
+def read_links(roles_app, tag_file, tmp_path, docnames, **config):
+    """Sets up the roles of a build and reads ``docnames``, each with a link to ``my_namespace::MyClass``"""
+    env = SimpleNamespace(temp_data={}, found_docs=set(docnames), srcdir=str(tmp_path))
+    app = roles_app(tmp_path / 'project', {'my_lib': tag_file}, **config)
+    app.env = env
+    with LogCapture():
+        doxylink.setup_doxylink_roles(app)
+    role = app.add_role.call_args.args[1]
+    nodes = {}
+    for docname in docnames:
+        env.temp_data['docname'] = docname
+        inliner = MagicMock()
+        inliner.document.attributes = {'source': str(tmp_path / 'sub' / f'{docname}.rst')}
+        nodes[docname] = role('my_lib', '', 'my_namespace::MyClass', 1, inliner)[0][0]
+    del env.temp_data['docname']
+    return app, nodes
+
+
+def next_build(roles_app, app, doxylink_config, **config):
+    """Sets up the roles of the next build of ``app`` with another configuration"""
+    next_app = roles_app(app.doctreedir, {}, **config)
+    next_app.config.doxylink = doxylink_config
+    next_app.env = app.env
+    with LogCapture():
+        doxylink.setup_doxylink_roles(next_app)
+    return next_app
+
+
+def test_write_time_urls_are_computed_by_post_transform(examples_tag_file, roles_app, tmp_path):
+    from docutils.frontend import get_default_settings
+    from docutils.parsers.rst import Parser
+    from docutils.utils import new_document
+
+    app, nodes = read_links(roles_app, examples_tag_file, tmp_path, ['first', 'second'], doxylink_write_time_urls=True)
+    assert isinstance(nodes['first'], doxylink.pending_doxylink)
+    assert nodes['first']['doxylink_file'] == 'classmy__namespace_1_1MyClass.html'
+
+    def write(node, base):
+        document = new_document(str(tmp_path / 'sub' / 'first.rst'), get_default_settings(Parser))
+        document.settings.env = SimpleNamespace(doxylink_link_bases={'my_lib': base}, srcdir=str(tmp_path))
+        document += node.deepcopy()
+        doxylink.ResolveDoxylinkReferences(document).apply()
+        reference, = document.children
+        return reference.get('refuri')
+
+    assert write(nodes['first'], ('rootdir', 'https://example.com/')) == 'https://example.com/classmy__namespace_1_1MyClass.html'
+    assert write(nodes['first'], ('rootdir', 'doxygen/')) == '../doxygen/classmy__namespace_1_1MyClass.html'
+    assert write(nodes['first'], ('pdf', 'my_lib.pdf')) == 'my_lib.pdf#classmy__namespace_1_1MyClass'
+    assert app.env.doxylink_link_bases == {'my_lib': ('rootdir', 'https://example.com/')}
+    # A role which was removed leaves the title
+    assert write(nodes['first'], None) is None
+
+
+def test_root_directory_changes_read_or_write_linking_documents_again(examples_tag_file, roles_app, tmp_path):
+    app, nodes = read_links(roles_app, examples_tag_file, tmp_path, ['first'])
+    app.env.found_docs.add('unlinked')
+    assert nodes['first']['refuri'] == 'https://example.com/classmy__namespace_1_1MyClass.html'
+
+    # The URLs are part of the doctrees, so the documents which link with the role are read again
+    moved = next_build(roles_app, app, {'my_lib': (examples_tag_file, 'https://moved.example.com')})
+    assert doxylink.find_outdated_documents(moved, app.env, set(), set(), set()) == ['first']
+    assert doxylink.find_documents_to_rewrite(moved, app.env) == []
+
+    # With write time URLs, they are only written again
+    app, _ = read_links(roles_app, examples_tag_file, tmp_path, ['first'], doxylink_write_time_urls=True)
+    app.env.found_docs.add('unlinked')
+    moved = next_build(roles_app, app, {'my_lib': (examples_tag_file, 'https://moved.example.com')}, doxylink_write_time_urls=True)
+    assert doxylink.find_outdated_documents(moved, app.env, set(), set(), set()) == []
+    assert doxylink.find_documents_to_rewrite(moved, app.env) == ['first']
+
+    # Documents may have used a role which is added before it was configured
+    added = next_build(roles_app, moved, {'my_lib': (examples_tag_file, 'https://moved.example.com'),
+                               'other_lib': (examples_tag_file, 'https://example.com')}, doxylink_write_time_urls=True)
+    assert doxylink.find_outdated_documents(added, app.env, set(), set(), set()) == ['first', 'unlinked']
+
+
+def sphinx_project(tmp_path, tag_file, docnames):
+    """Writes a Sphinx project with documents which link to ``my_namespace::MyClass`` and returns its source directory"""
+    source_directory = tmp_path / 'source'
+    source_directory.mkdir()
+    (source_directory / 'conf.py').write_text(
+        f"extensions = ['sphinxcontrib.doxylink']\n"
+        f"doxylink = {{'my_lib': ({str(tag_file)!r}, 'https://example.com')}}\n")
+    (source_directory / 'index.rst').write_text('Index\n=====\n\n.. toctree::\n\n' +
+                                                ''.join(f'   {docname}\n' for docname in docnames))
+    for docname in docnames:
+        (source_directory / f'{docname}.rst').write_text(f'{docname}\n=====\n\n:my_lib:`my_namespace::MyClass`\n')
+    return source_directory
+
+
+def sphinx_build(source_directory, monkeypatch, parallel=1):
+    """Builds the HTML of a project like ``sphinx-build`` does and returns what it logged and warned about"""
+    import io
+    import logging
+    from sphinx.application import Sphinx
+
+    # Sphinx sets up its logger for the build, which the other tests capture the records of
+    sphinx_logger = logging.getLogger('sphinx')
+    for attribute in ('propagate', 'level'):
+        monkeypatch.setattr(sphinx_logger, attribute, getattr(sphinx_logger, attribute))
+    monkeypatch.setattr(sphinx_logger, 'handlers', list(sphinx_logger.handlers))
+
+    status, warning = io.StringIO(), io.StringIO()
+    build_directory = source_directory.parent / 'build'
+    app = Sphinx(str(source_directory), str(source_directory), str(build_directory / 'html'),
+                 str(build_directory / 'doctrees'), 'html', status=status, warning=warning, parallel=parallel)
+    app.build()
+    return status.getvalue(), warning.getvalue()
+
+
+def test_parallel_build_builds_symbol_map_once(examples_tag_file, tmp_path, monkeypatch):
+    from sphinx.util.parallel import parallel_available
+
+    if not parallel_available:
+        pytest.skip('Sphinx reads in parallel only where processes can be forked')
+    source_directory = sphinx_project(tmp_path, examples_tag_file, [f'doc{number}' for number in range(8)])
+
+    status, warning = sphinx_build(source_directory, monkeypatch, parallel=4)
+    assert status.count('Building symbol map for my_lib') == 1
+    assert warning.count('Skipping function my_lib.h::DEFINE_bool') == 1
+    assert 'classmy__namespace_1_1MyClass.html' in (tmp_path / 'build' / 'html' / 'doc7.html').read_text()
+
+
+def test_symbol_map_built_without_reading_documents_is_kept(examples_tag_file, tmp_path, monkeypatch):
+    tag_file = tmp_path / 'my_lib.tag'
+    content = open(examples_tag_file).read()
+    tag_file.write_text(content)
+    source_directory = sphinx_project(tmp_path, tag_file, ['doc'])
+    sphinx_build(source_directory, monkeypatch)
+
+    # A compound which no document links to, so none is read again and Sphinx doesn't save the environment
+    tag_file.write_text(content.replace('</tagfile>', '  <compound kind="class">\n    <name>Unused</name>\n'
+                                                      '    <filename>class_unused.html</filename>\n  </compound>\n'
+                                                      '</tagfile>'))
+    doxylink._built_indexes.clear()  # as if each build ran in a new process
+    status, _ = sphinx_build(source_directory, monkeypatch)
+    assert 'Building symbol map for my_lib' in status
+    assert 'pickling environment' not in status
+
+    for _ in range(2):
+        doxylink._built_indexes.clear()
+        status, _ = sphinx_build(source_directory, monkeypatch)
+        assert 'Sub-cache is up-to-date (decided by modification time)' in status
+        assert 'Building symbol map' not in status
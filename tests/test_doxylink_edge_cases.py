@@ -45,3 +45,38 @@ def test_doxylink_wont_crash_on_self_friend_template_classes():
     except RuntimeError as exc:
         assert False, f"template class with self friend definition raises a Runtime Error: {exc}"
 
+
+
+MEMBER_WITHOUT_KIND = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<tagfile>
+  <compound kind="class">
+    <name>Widget</name>
+    <filename>class_widget.html</filename>
+    <member>
+      <type>int</type>
+      <name>size</name>
+      <anchorfile>class_widget.html</anchorfile>
+      <anchor>a1b2c3</anchor>
+      <arglist></arglist>
+    </member>
+  </compound>
+</tagfile>
+"""
+
+def test_doxylink_accepts_members_without_kind(tmp_path):
+    from sphinxcontrib.doxylink.compiled import CompiledSymbolMap, write_compiled_index
+    from sphinxcontrib.doxylink.database import SqliteSymbolMap, write_database
+
+    tag_file = ET.ElementTree(ET.fromstring(MEMBER_WITHOUT_KIND))
+    mapping = doxylink.SymbolMap(tag_file)
+    entry = mapping['Widget::size']
+    assert (entry.kind, entry.file) == (None, 'class_widget.html#a1b2c3')
+
+    with open(tmp_path / 'widget.index', 'wb') as index_file:
+        write_compiled_index(mapping, index_file, 'version', 'digest')
+    compiled = CompiledSymbolMap(str(tmp_path / 'widget.index'))
+    assert compiled['Widget::size'] == entry
+    assert compiled.to_symbol_map()['Widget::size'] == entry
+
+    write_database(str(tmp_path / 'widget.sqlite'), mapping._entries, 'version', 'digest')
+    assert SqliteSymbolMap(str(tmp_path / 'widget.sqlite'))['Widget::size'] == entry
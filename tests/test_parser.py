@@ -133,6 +133,93 @@ keywords_almost_in_typenames = [
 ]
 
 
+# Argument lists which canonicalise_arglist() must either normalise exactly like the
+# pyparsing grammar or hand over to it by returning None
+differential_corpus = [
+    '(Foo<T> x)',
+    '(Foo <T> x)',
+    '(Foo< T >x)',
+    '(Foo<  a   b,c >::bar y)',
+    '(Foo<T> ::x y)',
+    '(Foo<>)',
+    '(A<B<C>> x)',
+    '(Foo<"x">)',
+    '(std::map<int,int> m)',
+    '(int *constant)',
+    '(int & const)',
+    '(int volatile * const p)',
+    '(const)',
+    '(const::x a)',
+    '(struct stat *buf)',
+    '(enum class X)',
+    '(long long_var)',
+    '(unsigned MyType x)',
+    '(a b c)',
+    '(0)',
+    '(int\tx)',
+    '(...)',
+    '( )',
+    '(int,...)',
+    '(int a...)',
+    '(T args...)',
+    '(int x[3][4])',
+    '(int x[])',
+    '(int (*f)(int))',
+    '(int a=)',
+    '(int a = b + c)',
+    '(int a = -1)',
+    '(int a = 0x10)',
+    '(int a = 1.5e-3)',
+    '(int a = {1, 2})',
+    '(int a = [1, 2])',
+    '(int a = f(x, y), int b)',
+    '(int a = ((b)), int c)',
+    '(int a = "a,b", int b)',
+    "(char c = ',')",
+    '(int a = Foo<int, 3>(), int b)',
+    '(int a = Foo<A<B>, C>(), int b)',
+    '(int a = x<y)',
+    '(Flags f = A | B ^ C & D)',
+]
+
+# Common shapes which must not need the pyparsing grammar
+fast_path_arglists = [
+    '(int x)',
+    '(const QString &s)',
+    '(QWidget *parent=0)',
+    '(unsigned long long int n)',
+    '(const std::vector<int> &v)',
+    '(Q3ValueList<T>::size_type i)',
+    '(Args&& ... args)',
+    '(const char *format, ...)',
+    '(const QUrl &url = QUrl(), bool redraw = true)',
+]
+
+
+def _arglist_part(symbol):
+    return symbol[symbol.index('('):symbol.rindex(')') + 1]
+
+
+all_arglists = [_arglist_part(test_input) for test_input, _ in
+                arglists + varargs + multiple_qualifiers + fundamental_types + numbers_for_defaults +
+                flags_in_defaults + multiple_namespaces + keywords_almost_in_typenames
+                if not _arglist_part(test_input).startswith('()')]
+
+
+@pytest.mark.parametrize('test_input', all_arglists + differential_corpus + fast_path_arglists)
+def test_canonicaliser_matches_grammar(test_input):
+    fast = parsing.canonicalise_arglist(test_input)
+    if fast is None:
+        return
+
+    assert fast == parsing.parse_arglist(test_input)
+
+
+@pytest.mark.parametrize('test_input', fast_path_arglists)
+def test_canonicaliser_fast_path(test_input):
+    assert parsing.canonicalise_arglist(test_input) is not None
+
+
 @pytest.mark.parametrize('test_input, expected', functions)
 def test_split_function(test_input, expected):
     assert parsing.normalise(test_input) == expected
@@ -185,6 +272,35 @@ def test_false_signatures():
         parsing.normalise('("center")')
 
 
+@pytest.fixture
+def small_normalise_cache():
+    parsing.clear_normalise_cache()
+    parsing.set_normalise_cache_size(2)
+    yield
+    parsing.set_normalise_cache_size(parsing.DEFAULT_NORMALISE_CACHE_SIZE)
+    parsing.clear_normalise_cache()
+
+
+def test_normalise_cache(small_normalise_cache):
+    assert parsing.normalise('foo(const QString &s)') == ('foo', '(const QString&)')
+    # Shared between different functions with the same argument list
+    assert parsing.normalise('bar(const QString &s)') == ('bar', '(const QString&)')
+    parsing.normalise('foo(int)')
+    parsing.normalise('foo(float)')
+    assert parsing.normalise_cache_info() == parsing.CacheInfo(hits=1, misses=3, evictions=1, maxsize=2, currsize=2)
+
+    # The least recently used argument list was evicted
+    assert parsing.normalise('foo(const QString &s)') == ('foo', '(const QString&)')
+    assert parsing.normalise_cache_info().misses == 4
+
+
+def test_normalise_cache_disabled(small_normalise_cache):
+    parsing.set_normalise_cache_size(0)
+    parsing.normalise('foo(int)')
+    parsing.normalise('foo(int)')
+    assert parsing.normalise_cache_info() == parsing.CacheInfo(hits=0, misses=2, evictions=0, maxsize=0, currsize=0)
+
+
 if __name__ == "__main__":
     try:
         import cProfile as profile
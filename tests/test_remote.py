@@ -0,0 +1,293 @@
+import gzip
+import http.server
+import os
+import threading
+
+import pytest
+import requests
+from testfixtures import LogCapture
+
+from sphinxcontrib.doxylink import doxylink
+from sphinxcontrib.doxylink.remote import create_session, download_file, fetch_remote_file
+
+TAG_FILE = os.path.join(os.path.dirname(__file__), '../examples/my_lib.tag')
+
+
+class TagFileHandler(http.server.BaseHTTPRequestHandler):
+    """Serves one file with an ETag, honouring conditional requests and gzip"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.path != '/my_lib.tag':
+            self.send_error(404)
+            return
+        if server.failures:
+            server.failures -= 1
+            self.send_error(503)
+            return
+        if server.etag and self.headers.get('If-None-Match') == server.etag and not server.ignore_conditional:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.content
+        if self.headers.get('Range') and self.headers.get('If-Range') == server.etag:
+            start = int(self.headers['Range'][len('bytes='):-1])
+            if start >= len(body):
+                self.send_error(416)
+                return
+            start = 0 if server.ignore_range_start else start
+            body = body[start:]
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, len(server.content) - 1, len(server.content)))
+        else:
+            self.send_response(200)
+        if server.etag:
+            self.send_header('ETag', server.etag)
+        if server.last_modified:
+            self.send_header('Last-Modified', server.last_modified)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if server.truncate:
+            # The connection drops in the middle of the body
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    with open(TAG_FILE, 'rb') as tag_file:
+        content = tag_file.read()
+    httpd = http.server.HTTPServer(('127.0.0.1', 0), TagFileHandler)
+    httpd.content = content
+    httpd.etag = '"1"'
+    httpd.last_modified = None
+    httpd.requests = []
+    httpd.failures = 0
+    httpd.ignore_conditional = False
+    httpd.truncate = False
+    httpd.ignore_range_start = False
+    httpd.url = 'http://127.0.0.1:%d/my_lib.tag' % httpd.server_address[1]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_remote_file(server):
+    remote_file = fetch_remote_file(server.url)
+    assert remote_file.content == server.content
+    assert remote_file.etag == '"1"'
+    assert 'gzip' in server.requests[0]['Accept-Encoding']
+
+    assert fetch_remote_file(server.url, etag='"1"') is None
+    assert server.requests[1]['If-None-Match'] == '"1"'
+
+    server.etag = '"2"'
+    assert fetch_remote_file(server.url, etag='"1"').etag == '"2"'
+
+
+def test_fetch_remote_file_while_reading_it(server):
+    chunks = []
+
+    def consume(stream):
+        for chunk in iter(lambda: stream.read(100), b''):
+            chunks.append(chunk)
+        return len(chunks)
+
+    remote_file = fetch_remote_file(server.url, consume=consume)
+    assert b''.join(chunks) == server.content
+    assert remote_file.content == len(chunks) > 1
+
+    # The validators show that the file didn't change even if the server ignores them
+    server.ignore_conditional = True
+    assert fetch_remote_file(server.url, etag='"1"', consume=consume) is None
+
+
+def test_etag_decides_over_last_modified(server):
+    server.ignore_conditional = True
+    server.last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert fetch_remote_file(server.url, etag='"1"', last_modified=server.last_modified) is None
+
+    # Changed within the same second, which only the ETag tells
+    server.etag = '"2"'
+    remote_file = fetch_remote_file(server.url, etag='"1"', last_modified=server.last_modified)
+    assert remote_file.content == server.content
+    assert remote_file.etag == '"2"'
+
+    # Without an ETag the modification time is all there is to go by
+    server.etag = None
+    assert fetch_remote_file(server.url, etag='"1"', last_modified=server.last_modified) is None
+
+
+def test_interrupted_remote_tag_file_is_reported(server, roles_app, tmp_path):
+    server.truncate = True
+    with pytest.raises(requests.ConnectionError):
+        fetch_remote_file(server.url, consume=lambda stream: list(doxylink.iter_tag_file(stream)))
+
+    app = roles_app(tmp_path)
+    with LogCapture() as log:
+        role = doxylink.create_role(app, server.url, 'https://example.com', 'my_lib')
+    assert 'Could not find tag file' in str(log)
+    assert role.resolve('my_lib.h') is None
+
+
+def test_fetch_missing_remote_file(server):
+    with pytest.raises(FileNotFoundError):
+        fetch_remote_file(server.url.replace('my_lib.tag', 'missing.tag'))
+
+
+def test_fetch_retries_temporary_errors(server):
+    server.failures = 2
+    with create_session(retries=2) as session:
+        session.adapters['http://'].max_retries.backoff_factor = 0
+        assert fetch_remote_file(server.url, session=session).content == server.content
+    assert len(server.requests) == 3
+
+    server.failures = 2
+    with create_session(retries=1) as session, pytest.raises(FileNotFoundError):
+        session.adapters['http://'].max_retries.backoff_factor = 0
+        fetch_remote_file(server.url, session=session)
+
+
+def test_download_file(server, tmp_path):
+    output_path = str(tmp_path / 'my_lib.pdf')
+    state_path = str(tmp_path / 'state' / 'my_lib.json')
+
+    assert download_file(server.url, output_path, state_path)
+    with open(output_path, 'rb') as output_file:
+        assert output_file.read() == server.content
+    assert not os.path.exists(output_path + '.part')
+    assert server.requests[-1]['Accept-Encoding'] == 'identity'
+
+    # A complete copy is kept if the server reports it unchanged, even if it was touched
+    assert not download_file(server.url, output_path, state_path)
+    assert server.requests[-1]['If-None-Match'] == '"1"'
+    os.utime(output_path, (0, 0))
+    assert not download_file(server.url, output_path, state_path)
+
+    # A truncated copy is downloaded again
+    with open(output_path, 'r+b') as output_file:
+        output_file.truncate(10)
+    assert download_file(server.url, output_path, state_path)
+    assert os.path.getsize(output_path) == len(server.content)
+
+
+def test_download_file_resumes(server, tmp_path):
+    output_path = str(tmp_path / 'my_lib.pdf')
+    state_path = str(tmp_path / 'my_lib.json')
+    with open(output_path + '.part', 'wb') as partial_file:
+        partial_file.write(server.content[:100])
+    with open(state_path, 'w') as state_file:
+        state_file.write('{"partial": {"etag": "\\"1\\"", "last_modified": null}}')
+
+    assert download_file(server.url, output_path, state_path)
+    assert server.requests[-1]['Range'] == 'bytes=100-'
+    with open(output_path, 'rb') as output_file:
+        assert output_file.read() == server.content
+
+    # The checksum covers the resumed part as well, so touching the file keeps it
+    os.utime(output_path, (0, 0))
+    assert not download_file(server.url, output_path, state_path)
+
+
+def test_download_file_restarts_what_cant_be_resumed(server, tmp_path):
+    output_path = str(tmp_path / 'my_lib.pdf')
+    state_path = str(tmp_path / 'my_lib.json')
+
+    # A build stopped after the last chunk was downloaded but before the file was renamed
+    with open(output_path + '.part', 'wb') as partial_file:
+        partial_file.write(server.content)
+    with open(state_path, 'w') as state_file:
+        state_file.write('{"partial": {"etag": "\\"1\\"", "last_modified": null}}')
+    assert download_file(server.url, output_path, state_path)
+    assert server.requests[-2]['Range'] == 'bytes=%d-' % len(server.content)
+    assert 'Range' not in server.requests[-1]
+    with open(output_path, 'rb') as output_file:
+        assert output_file.read() == server.content
+    assert not os.path.exists(output_path + '.part')
+    assert not download_file(server.url, output_path, state_path)
+
+    # The rest of the file is sent from another position than the one asked for
+    os.remove(output_path)
+    server.ignore_range_start = True
+    with open(output_path + '.part', 'wb') as partial_file:
+        partial_file.write(server.content[:100])
+    with open(state_path, 'w') as state_file:
+        state_file.write('{"partial": {"etag": "\\"1\\"", "last_modified": null}}')
+    assert download_file(server.url, output_path, state_path)
+    with open(output_path, 'rb') as output_file:
+        assert output_file.read() == server.content
+
+
+def test_unmodified_remote_tag_file_is_not_parsed_again(server, monkeypatch, roles_app, tmp_path):
+    app = roles_app(tmp_path)
+
+    role = doxylink.create_role(app, server.url, 'https://example.com', 'my_lib')
+    mapping = role.load_mapping()
+    assert app.env.doxylink_cache['my_lib']['etag'] == '"1"'
+
+    def fail(*args, **kwargs):
+        raise AssertionError('tag file parsed again')
+    monkeypatch.setattr(doxylink, 'iter_tag_file', fail)
+
+    # The next build only gets a 304 back and keeps the symbol map
+    role = doxylink.create_role(app, server.url, 'https://example.com', 'my_lib')
+    assert role.load_mapping() is mapping
+    assert len(server.requests) == 2
+
+
+def test_remote_tag_file_without_validators_is_compared_by_content(server, roles_app, tmp_path):
+    server.etag = None
+    app = roles_app(tmp_path)
+
+    def build():
+        with LogCapture() as log:
+            role = doxylink.create_role(app, server.url, 'https://example.com', 'my_lib')
+            role.load_mapping()
+        return role, [record.getMessage() for record in log.records]
+
+    build()
+    modification_time = app.env.doxylink_cache['my_lib']['mtime']
+    for _ in range(2):
+        role, messages = build()
+        assert 'Sub-cache is up-to-date (decided by content digest)' in messages
+        assert not any('Building symbol map' in message for message in messages)
+        assert not role.tag_file_changed
+        assert app.env.doxylink_cache['my_lib']['mtime'] == modification_time
+
+    server.content = server.content.replace(b'my_func', b'my_other_func')
+    role, messages = build()
+    assert 'Sub-cache is out of date (decided by content digest), rebuilding on first use...' in messages
+    assert any('Building symbol map' in message for message in messages)
+    assert role.tag_file_changed
+
+
+def test_roles_are_created_after_fetching(server, roles_app, tmp_path):
+    app = roles_app(
+        tmp_path / '.doctrees',
+        doxylink={
+            'first': (server.url, 'html', 'first.pdf'),
+            'second': (server.url, 'html', 'second.pdf'),
+        },
+        doxylink_pdf_files={'first.pdf': server.url, 'second.pdf': server.url},
+    )
+    app.outdir = str(tmp_path)
+    app.builder.format = 'latex'
+
+    doxylink.setup_doxylink_roles(app)
+
+    assert len(server.requests) == 4
+    assert [call.args[0] for call in app.add_role.call_args_list] == ['first', 'second']
+    for pdf in ['first.pdf', 'second.pdf']:
+        assert (tmp_path / pdf).read_bytes() == server.content
+    assert app.env.doxylink_cache['second']['index'] is None
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+
+from sphinxcontrib.doxylink.shared import SharedIndexCache
+
+
+def write(content):
+    def create(path):
+        with open(path, 'wb') as index_file:
+            index_file.write(content)
+    return create
+
+
+def test_index_file_is_created_once(tmp_path):
+    cache = SharedIndexCache(str(tmp_path))
+    used = []
+
+    assert cache.get('digest-1.0', 'index', write(b'index'), used.append)
+    assert not used
+    assert not cache.get('digest-1.0', 'index', write(b'other'), used.append)
+    assert used == [os.path.join(str(tmp_path), 'digest-1.0.index')]
+    with open(used[0], 'rb') as index_file:
+        assert index_file.read() == b'index'
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith('.tmp')]
+
+
+def test_concurrent_builds_create_index_file_once(tmp_path):
+    cache = SharedIndexCache(str(tmp_path))
+    created = []
+    used = []
+
+    def create(path):
+        created.append(path)
+        time.sleep(0.2)
+        write(b'index')(path)
+
+    threads = [threading.Thread(target=cache.get, args=('digest-1.0', 'index', create, used.append)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert len(used) == 2
+
+
+def test_failed_build_leaves_nothing_behind(tmp_path):
+    cache = SharedIndexCache(str(tmp_path))
+
+    def create(path):
+        write(b'partial')(path)
+        raise RuntimeError('interrupted')
+
+    try:
+        cache.get('digest-1.0', 'index', create, print)
+    except RuntimeError:
+        pass
+    assert sorted(os.listdir(str(tmp_path))) == ['digest-1.0.lock']
+    assert cache.get('digest-1.0', 'index', write(b'index'), print)
+
+
+def test_least_recently_used_index_files_are_evicted(tmp_path):
+    cache = SharedIndexCache(str(tmp_path), max_size=10)
+    an_hour_ago = time.time() - 60 * 60
+    for name in ['a', 'b']:
+        cache.get(name, 'index', write(b'1234'), print)
+        os.utime(os.path.join(str(tmp_path), f'{name}.index'), (an_hour_ago, an_hour_ago))
+        an_hour_ago += 60
+
+    # Using an index file makes it the most recently used
+    cache.get('a', 'index', write(b''), lambda path: None)
+    cache.get('c', 'sqlite', write(b'1234'), print)
+    assert sorted(name for name in os.listdir(str(tmp_path)) if name != 'evict.lock') == \
+        ['a.index', 'a.lock', 'c.lock', 'c.sqlite']
+
+
+def test_old_index_files_are_evicted(tmp_path):
+    cache = SharedIndexCache(str(tmp_path), max_age=7)
+    cache.get('old', 'index', write(b'index'), print)
+    eight_days_ago = time.time() - 8 * 24 * 60 * 60
+    os.utime(os.path.join(str(tmp_path), 'old.index'), (eight_days_ago, eight_days_ago))
+
+    cache.get('new', 'index', write(b'index'), print)
+    assert not os.path.exists(os.path.join(str(tmp_path), 'old.index'))
+    assert os.path.exists(os.path.join(str(tmp_path), 'new.index'))
+
+
+def test_lock_files_of_failed_builds_are_evicted(tmp_path):
+    cache = SharedIndexCache(str(tmp_path))
+
+    def create(path):
+        raise RuntimeError('interrupted')
+
+    try:
+        cache.get('failed', 'index', create, print)
+    except RuntimeError:
+        pass
+    cache.get('built', 'index', write(b'index'), print)
+    assert sorted(name for name in os.listdir(str(tmp_path)) if name != 'evict.lock') == ['built.index', 'built.lock']
+
+
+def test_unusable_index_file_is_created_again(tmp_path):
+    cache = SharedIndexCache(str(tmp_path))
+    cache.get('digest-1.0', 'index', write(b'damaged'), print)
+
+    assert cache.get('digest-1.0', 'index', write(b'index'), lambda path: False)
+    with open(os.path.join(str(tmp_path), 'digest-1.0.index'), 'rb') as index_file:
+        assert index_file.read() == b'index'